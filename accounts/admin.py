@@ -1,3 +1,15 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import QueuedEmail
+
+
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = (
+        '__str__', 'status', 'attempts',
+        'next_attempt_time', 'sending_time'
+    )
+    list_filter = ('status',)
+    readonly_fields = ('creation_time', 'sending_time')
+
+
+admin.site.register(QueuedEmail, QueuedEmailAdmin)
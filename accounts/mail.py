@@ -0,0 +1,172 @@
+"""Queue of emails sent by worker instead of request
+
+QueuedEmailBackend saves messages to QueuedEmail. Worker command
+send_queued_emails sends them by QUEUED_EMAIL_BACKEND with one
+connection per batch and retries failed messages with growing delay.
+Batch is claimed by short transaction, so rows aren't locked while SMTP
+server answers.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+
+EMAIL_BATCH_SIZE = 50
+
+# Fields of EmailMessage saved to queue
+MESSAGE_FIELDS = (
+    'subject', 'body', 'from_email', 'to', 'cc', 'bcc', 'reply_to',
+    'extra_headers',
+)
+
+
+def serialize_message(message):
+    """Dict with fields of EmailMessage for JSON"""
+
+    if message.attachments:
+        raise ValueError('Письма с вложениями не ставятся в очередь')
+
+    data = {field: getattr(message, field) for field in MESSAGE_FIELDS}
+    data['alternatives'] = [
+        list(alternative)
+        for alternative in getattr(message, 'alternatives', [])
+    ]
+
+    return data
+
+
+def deserialize_message(data, connection=None):
+    """EmailMultiAlternatives from dict of serialize_message()"""
+
+    return EmailMultiAlternatives(
+        subject=data['subject'],
+        body=data['body'],
+        from_email=data['from_email'],
+        to=data['to'],
+        cc=data['cc'],
+        bcc=data['bcc'],
+        reply_to=data['reply_to'],
+        headers=data['extra_headers'],
+        alternatives=[
+            tuple(alternative) for alternative in data['alternatives']
+        ],
+        connection=connection,
+    )
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Email backend saving messages to queue of worker"""
+
+    def send_messages(self, email_messages):
+        QueuedEmail.objects.bulk_create(
+            QueuedEmail(message=serialize_message(message))
+            for message in email_messages
+        )
+
+        return len(email_messages)
+
+
+def get_retry_delay(attempts):
+    """Delay before next attempt, it doubles after every attempt"""
+
+    return timedelta(
+        seconds=settings.EMAIL_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def claim_queued_emails(batch_size, now):
+    """Mark batch of due emails as sending and return them
+
+    Emails locked by another worker are skipped. Email of worker which
+    stopped while sending is claimed again after EMAIL_SENDING_TIMEOUT.
+    """
+
+    with transaction.atomic():
+        emails = list(
+            QueuedEmail.objects.select_for_update(skip_locked=True).filter(
+                status__in=[QueuedEmail.PENDING, QueuedEmail.SENDING],
+                next_attempt_time__lte=now,
+            ).order_by('next_attempt_time')[:batch_size]
+        )
+
+        QueuedEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(
+            status=QueuedEmail.SENDING,
+            attempts=F('attempts') + 1,
+            next_attempt_time=now + timedelta(
+                seconds=settings.EMAIL_SENDING_TIMEOUT
+            ),
+        )
+
+    for email in emails:
+        email.attempts += 1
+
+    return emails
+
+
+def send_queued_emails(batch_size=EMAIL_BATCH_SIZE):
+    """Send batch of due emails by one connection
+
+    Return amounts of sent emails and emails left for retry or failed.
+    Every email is marked as sent or failed right after it's attempt.
+    """
+
+    now = timezone.now()
+    sent_amount = 0
+    emails = claim_queued_emails(batch_size, now)
+
+    if not emails:
+        return 0, 0
+
+    try:
+        connection = get_connection(settings.QUEUED_EMAIL_BACKEND)
+        connection.open()
+    except Exception as error:
+        connection, connection_error = None, error
+
+    for email in emails:
+        try:
+            if connection is None:
+                raise connection_error
+
+            deserialize_message(email.message, connection).send()
+        except Exception as error:
+            email.last_error = repr(error)
+
+            if email.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+                email.status = QueuedEmail.FAILED
+            else:
+                email.status = QueuedEmail.PENDING
+                email.next_attempt_time = now + get_retry_delay(
+                    email.attempts
+                )
+        else:
+            email.status = QueuedEmail.SENT
+            email.sending_time = timezone.now()
+            sent_amount += 1
+
+        email.save(update_fields=[
+            'status', 'next_attempt_time', 'last_error', 'sending_time',
+        ])
+
+    if connection is not None:
+        connection.close()
+
+    return sent_amount, len(emails) - sent_amount
+
+
+def prune_sent_emails(before):
+    """Delete emails sent before the time, return their amount"""
+
+    return QueuedEmail.objects.filter(
+        status=QueuedEmail.SENT, sending_time__lt=before
+    ).delete()[0]
@@ -0,0 +1,74 @@
+"""Command for sending emails from queue"""
+
+from datetime import timedelta
+from time import monotonic, sleep
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.mail import (
+    EMAIL_BATCH_SIZE, prune_sent_emails, send_queued_emails
+)
+
+
+# Seconds between deletions of old sent emails by worker
+PRUNE_INTERVAL = 60 * 60
+
+
+class Command(BaseCommand):
+    """Send due emails from queue once or as worker in loop
+
+    Sent emails older than EMAIL_KEEP_DAYS are deleted at start and then
+    every PRUNE_INTERVAL.
+    """
+
+    help = 'Send emails from queue by batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=EMAIL_BATCH_SIZE,
+            help='Amount of emails sent by one connection'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Work until interrupted, checking queue every interval'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds between checks of empty queue'
+        )
+
+    def prune(self):
+        pruned_amount = prune_sent_emails(
+            timezone.now() - timedelta(days=settings.EMAIL_KEEP_DAYS)
+        )
+
+        if pruned_amount:
+            self.stdout.write(f'Deleted old sent emails: {pruned_amount}')
+
+    def handle(self, *args, **options):
+        self.prune()
+        prune_time = monotonic()
+
+        while True:
+            if monotonic() - prune_time > PRUNE_INTERVAL:
+                self.prune()
+                prune_time = monotonic()
+
+            sent_amount, failed_amount = send_queued_emails(
+                options['batch_size']
+            )
+
+            if sent_amount or failed_amount:
+                self.stdout.write(
+                    f'Sent emails: {sent_amount}, '
+                    f'not sent: {failed_amount}'
+                )
+
+            if not options['loop']:
+                return
+
+            # Next batch is sent at once while queue isn't empty
+            if sent_amount + failed_amount < options['batch_size']:
+                sleep(options['interval'])
@@ -1,3 +1,69 @@
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class QueuedEmail(models.Model):
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    STATUSES = [
+        (PENDING, 'Ожидает отправки'),
+        (SENDING, 'Отправляется'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    ]
+
+    message = models.JSONField(
+        'Письмо',
+        help_text='Поля EmailMessage',
+    )
+
+    status = models.CharField(
+        'Статус',
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+    )
+
+    attempts = models.PositiveSmallIntegerField(
+        'Число попыток отправки',
+        default=0,
+    )
+
+    next_attempt_time = models.DateTimeField(
+        'Время следующей попытки',
+        default=timezone.now,
+    )
+
+    last_error = models.TextField(
+        'Последняя ошибка',
+        blank=True,
+    )
+
+    creation_time = models.DateTimeField(
+        'Время создания',
+        auto_now_add=True,
+    )
+
+    sending_time = models.DateTimeField(
+        'Время отправки',
+        null=True,
+        blank=True,
+    )
+
+    def __str__(self):
+        return f"{self.message['subject']} - {', '.join(self.message['to'])}"
+
+    class Meta:
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Письма в очереди'
+        ordering = ['next_attempt_time']
+        indexes = [
+            # Pending emails which are ready to be sent
+            models.Index(
+                fields=['status', 'next_attempt_time'],
+                name='queued_email_status_time_idx',
+            ),
+        ]
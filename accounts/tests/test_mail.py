@@ -0,0 +1,213 @@
+"""Tests for queue of emails"""
+
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPException
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.mail import prune_sent_emails, send_queued_emails
+from accounts.models import QueuedEmail
+
+
+class CountingEmailBackend(EmailBackend):
+    """Locmem backend counting opened connections"""
+
+    opened_connections = 0
+
+    def open(self):
+        CountingEmailBackend.opened_connections += 1
+
+
+class FailingEmailBackend(EmailBackend):
+    """Backend which can't send messages"""
+
+    def send_messages(self, messages):
+        raise SMTPException('Сервер недоступен')
+
+
+class StatusesEmailBackend(EmailBackend):
+    """Locmem backend saving statuses of queue at every sending"""
+
+    statuses = []
+
+    def send_messages(self, messages):
+        StatusesEmailBackend.statuses.append(list(
+            QueuedEmail.objects.order_by('pk').values_list(
+                'status', flat=True
+            )
+        ))
+
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='accounts.mail.QueuedEmailBackend',
+    QUEUED_EMAIL_BACKEND='accounts.tests.test_mail.CountingEmailBackend',
+    EMAIL_MAX_ATTEMPTS=3,
+    EMAIL_RETRY_DELAY=60,
+    EMAIL_SENDING_TIMEOUT=600,
+    EMAIL_KEEP_DAYS=30,
+)
+class QueuedEmailTests(TestCase):
+    """Test class for queue of emails"""
+
+    def setUp(self):
+        CountingEmailBackend.opened_connections = 0
+
+    def queue_emails(self, amount):
+        for index in range(amount):
+            message = EmailMultiAlternatives(
+                f'Письмо №{index}', 'Текст', 'station@example.com',
+                [f'user{index}@example.com'],
+            )
+            message.attach_alternative('<b>Текст</b>', 'text/html')
+            message.send()
+
+    def make_emails_due(self):
+        QueuedEmail.objects.update(
+            next_attempt_time=timezone.now() - timedelta(seconds=1)
+        )
+
+    def test_password_reset_is_queued(self):
+        """Test that password reset email is sent by worker"""
+
+        User.objects.create_user(
+            'user', email='user@example.com', password='password'
+        )
+
+        response = self.client.post(
+            '/accounts/password_reset/', {'email': 'user@example.com'}
+        )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(QueuedEmail.objects.count(), 1)
+
+        self.assertEqual(send_queued_emails(), (1, 0))
+        self.assertEqual(mail.outbox[0].to, ['user@example.com'])
+        self.assertEqual(
+            QueuedEmail.objects.get().status, QueuedEmail.SENT
+        )
+
+    def test_batch_uses_one_connection(self):
+        """Test that every batch of emails is sent by one connection"""
+
+        self.queue_emails(5)
+
+        self.assertEqual(send_queued_emails(batch_size=3), (3, 0))
+        self.assertEqual(send_queued_emails(batch_size=3), (2, 0))
+        self.assertEqual(send_queued_emails(batch_size=3), (0, 0))
+
+        self.assertEqual(CountingEmailBackend.opened_connections, 2)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(
+            mail.outbox[0].alternatives, [('<b>Текст</b>', 'text/html')]
+        )
+
+    @override_settings(
+        QUEUED_EMAIL_BACKEND='accounts.tests.test_mail.FailingEmailBackend'
+    )
+    def test_retries_with_backoff(self):
+        """Test that failed email is retried with doubled delay"""
+
+        self.queue_emails(1)
+
+        self.assertEqual(send_queued_emails(), (0, 1))
+        email = QueuedEmail.objects.get()
+        self.assertEqual(email.status, QueuedEmail.PENDING)
+        self.assertIn('Сервер недоступен', email.last_error)
+        first_delay = email.next_attempt_time - timezone.now()
+
+        # Email isn't sent before it's next attempt
+        self.assertEqual(send_queued_emails(), (0, 0))
+
+        self.make_emails_due()
+        send_queued_emails()
+        second_delay = QueuedEmail.objects.get().next_attempt_time - \
+            timezone.now()
+        self.assertGreater(second_delay, first_delay + timedelta(seconds=50))
+
+        self.make_emails_due()
+        send_queued_emails()
+        email = QueuedEmail.objects.get()
+        self.assertEqual(email.status, QueuedEmail.FAILED)
+        self.assertEqual(email.attempts, 3)
+
+    @override_settings(
+        QUEUED_EMAIL_BACKEND='accounts.tests.test_mail.StatusesEmailBackend'
+    )
+    def test_emails_are_claimed_and_marked_one_by_one(self):
+        """Test that batch is claimed before sending and marked by email"""
+
+        StatusesEmailBackend.statuses = []
+        self.queue_emails(2)
+
+        self.assertEqual(send_queued_emails(), (2, 0))
+        self.assertEqual(StatusesEmailBackend.statuses, [
+            [QueuedEmail.SENDING, QueuedEmail.SENDING],
+            [QueuedEmail.SENT, QueuedEmail.SENDING],
+        ])
+
+    def test_email_of_stopped_worker_is_sent_again(self):
+        """Test that claimed email is sent again after sending timeout"""
+
+        self.queue_emails(1)
+        QueuedEmail.objects.update(
+            status=QueuedEmail.SENDING,
+            attempts=1,
+            next_attempt_time=timezone.now() + timedelta(seconds=600),
+        )
+
+        self.assertEqual(send_queued_emails(), (0, 0))
+
+        self.make_emails_due()
+        self.assertEqual(send_queued_emails(), (1, 0))
+        self.assertEqual(QueuedEmail.objects.get().attempts, 2)
+
+    def test_old_sent_emails_are_pruned(self):
+        """Test that only sent emails older than limit are deleted"""
+
+        self.queue_emails(2)
+        send_queued_emails()
+        QueuedEmail.objects.filter(
+            pk=QueuedEmail.objects.order_by('pk').first().pk
+        ).update(sending_time=timezone.now() - timedelta(days=31))
+        self.queue_emails(1)
+
+        self.assertEqual(
+            prune_sent_emails(timezone.now() - timedelta(days=30)), 1
+        )
+        self.assertEqual(QueuedEmail.objects.count(), 2)
+
+    def test_command_sends_emails(self):
+        """Test that command sends queued emails"""
+
+        self.queue_emails(2)
+        output = StringIO()
+
+        call_command('send_queued_emails', stdout=output)
+
+        self.assertIn('Sent emails: 2', output.getvalue())
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_command_prunes_sent_emails(self):
+        """Test that command deletes sent emails older than EMAIL_KEEP_DAYS"""
+
+        self.queue_emails(1)
+        send_queued_emails()
+        QueuedEmail.objects.update(
+            sending_time=timezone.now() - timedelta(days=31)
+        )
+        output = StringIO()
+
+        call_command('send_queued_emails', stdout=output)
+
+        self.assertIn('Deleted old sent emails: 1', output.getvalue())
+        self.assertFalse(QueuedEmail.objects.exists())
@@ -0,0 +1,119 @@
+"""Fast read-only serializers for lists of API
+
+They build the same data as serializers from api.serializers, but from
+rows of QuerySet.values() and without DRF fields. Absolute URLs are
+made from one reversed URL per list instead of reverse() per row.
+"""
+
+from urllib.parse import quote
+
+from django.urls import reverse
+
+from bus_stations.models import Flight
+
+
+PK_PLACEHOLDER = 'pk_placeholder'
+
+# Characters which reverse() doesn't quote
+URL_SAFE_CHARACTERS = "!$&'()*+,;=/~:@"
+
+
+class DetailUrlTemplate:
+    """Absolute URL of detail view for any primary key"""
+
+    def __init__(self, request, view_name):
+        self.prefix, self.suffix = request.build_absolute_uri(
+            reverse(view_name, kwargs={'pk': PK_PLACEHOLDER})
+        ).split(PK_PLACEHOLDER)
+
+    def __call__(self, pk):
+        return self.prefix + quote(str(pk), URL_SAFE_CHARACTERS) + \
+            self.suffix
+
+
+class FastListSerializer:
+    """Base class of serializer for rows of QuerySet.values()"""
+
+    # Fields for QuerySet.values(), 'pk' is required for pagination
+    values_fields = ('pk',)
+
+    def __init__(self, rows, request):
+        self.rows = rows
+        self.request = request
+
+    @property
+    def data(self):
+        """List of dicts with the same keys as in ModelSerializer"""
+
+        return [self.to_representation(row) for row in self.rows]
+
+    def to_representation(self, row):
+        """Dict for the row"""
+
+        raise NotImplementedError
+
+
+class FastFlightSerializer(FastListSerializer):
+    """Fast serializer like FlightSerializer"""
+
+    values_fields = (
+        'pk', 'route_id', 'route__name', 'departure_time',
+        'arrival_time', 'amount_of_free_places', 'bus_id',
+    )
+
+    def __init__(self, rows, request):
+        super().__init__(rows, request)
+        self.route_url = DetailUrlTemplate(request, 'route-detail')
+        self.flight_url = DetailUrlTemplate(request, 'flight-detail')
+        self.bus_url = DetailUrlTemplate(request, 'bus-detail')
+
+    def to_representation(self, row):
+        return {
+            'route_name': row['route__name'],
+            'route': self.route_url(row['route_id']),
+            'departure_time': row['departure_time'].isoformat(),
+            'arrival_time': row['arrival_time'].isoformat(),
+            'amount_of_free_places': row['amount_of_free_places'],
+            'url': self.flight_url(row['pk']),
+            'bus_registration_number': row['bus_id'],
+            'bus': self.bus_url(row['bus_id']),
+        }
+
+
+class FastRouteSerializer(FastListSerializer):
+    """Fast serializer like RouteSerializer"""
+
+    values_fields = (
+        'pk', 'name', 'regularity', 'departure_time', 'price',
+        'bus_station_id', 'bus_station__name',
+    )
+
+    def __init__(self, rows, request):
+        super().__init__(rows, request)
+        self.route_url = DetailUrlTemplate(request, 'route-detail')
+        self.bus_station_url = DetailUrlTemplate(
+            request, 'busstation-detail'
+        )
+
+    @property
+    def data(self):
+        # Saved labels of flights of all routes by one query
+        self.routes_flights_labels = {}
+        for route_id, label in Flight.objects.filter(
+                route__in=[row['pk'] for row in self.rows]
+        ).values_list('route_id', 'label'):
+            self.routes_flights_labels.setdefault(route_id, []).append(label)
+
+        return super().data
+
+    def to_representation(self, row):
+        return {
+            'name': row['name'],
+            'flights': self.routes_flights_labels.get(row['pk'], []),
+            'regularity': row['regularity'],
+            'departure_time': row['departure_time'],
+            'price': row['price'],
+            'bus_station_name': row['bus_station__name'],
+            'bus_station': self.bus_station_url(row['bus_station_id']),
+            'url': self.route_url(row['pk']),
+        }
@@ -0,0 +1,22 @@
+"""Pagination classes for ViewSets"""
+
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class ApiCursorPagination(CursorPagination):
+    """Cursor pagination by primary key
+
+    Page is found by indexed column instead of offset, so every page
+    costs the same.
+    """
+
+    ordering = 'pk'
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+
+class TicketCursorPagination(ApiCursorPagination):
+    """Cursor pagination from the latest registered Ticket"""
+
+    ordering = ('-registration_time', '-pk')
@@ -3,12 +3,14 @@
 from django.contrib.auth.models import User
 from rest_framework.serializers import (
     HyperlinkedModelSerializer, StringRelatedField,
-    ReadOnlyField
+    ReadOnlyField, Serializer, ListField, CharField, DateField,
+    ValidationError
 )
 
 from bus_stations.models import (
     BusStation, Route, Flight, Bus, Driver, Ticket
 )
+from bus_stations.validators import validate_not_past_date
 
 
 class UserSerializer(HyperlinkedModelSerializer):
@@ -106,10 +108,49 @@ class DriverSerializer(HyperlinkedModelSerializer):
 class TicketSerializer(HyperlinkedModelSerializer):
     """Serializer for model Ticket"""
 
+    seat_number = ReadOnlyField(source='seat.number')
+
     class Meta:
         """Choose model Ticket and it's fields"""
 
         model = Ticket
         fields = (
-            'flight', 'user', 'seller', 'registration_time'
+            'flight', 'user', 'seller', 'registration_time', 'seat_number'
         )
+
+
+class ChequeSerializer(TicketSerializer):
+    """Serializer for cheque of sold Ticket"""
+
+    flight_name = StringRelatedField(source='flight')
+
+    class Meta(TicketSerializer.Meta):
+        """Add ticket number and flight name to Ticket fields"""
+
+        fields = ('id', 'flight_name') + TicketSerializer.Meta.fields
+
+
+class GroupSaleSerializer(Serializer):
+    """Serializer for selling tickets of one Flight to group of users
+
+    Flight is taken from context, group can't be larger than it's bus.
+    """
+
+    users = ListField(
+        child=CharField(max_length=255), allow_empty=False
+    )
+    seller = CharField(max_length=255)
+    departure_date = DateField(
+        required=False, allow_null=True,
+        validators=[validate_not_past_date]
+    )
+
+    def validate_users(self, users):
+        amount_of_places = self.context['flight'].bus.amount_of_places
+
+        if len(users) > amount_of_places:
+            raise ValidationError(
+                f'В автобусе рейса только {amount_of_places} мест'
+            )
+
+        return users
@@ -0,0 +1,64 @@
+"""Tests for fast serializers of API lists"""
+
+from datetime import time
+
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from api.serializers import FlightSerializer, RouteSerializer
+from bus_stations.models import Route, Flight
+from bus_stations.tests.test_services import create_test_flight
+
+
+class FastSerializersOutputTests(TestCase):
+    """Test that fast lists are the same as lists of ModelSerializers"""
+
+    def setUp(self):
+        flight = create_test_flight(amount_of_free_places=10)
+
+        for route_index in range(3):
+            route = Route.objects.create(
+                name=f'Маршрут "{route_index}" & Ко',
+                regularity='Пн;Ср',
+                departure_time='08:00; 12:30',
+                price=150 + route_index,
+                bus_station=flight.route.bus_station
+            )
+
+            for departure_time in (time(8), time(12, 30, 15)):
+                Flight.objects.create(
+                    route=route,
+                    departure_time=departure_time,
+                    arrival_time=time(23, 59),
+                    bus=flight.bus
+                )
+
+    def assert_list_is_compatible(self, url, serializer_class, queryset):
+        """Assert that list response is rendered from serializer data"""
+
+        response = self.client.get(url)
+        expected_data = serializer_class(
+            queryset.order_by('pk'), many=True,
+            context={'request': response.wsgi_request}
+        ).data
+
+        self.assertEqual(
+            response.content,
+            JSONRenderer().render({
+                'next': None, 'previous': None, 'results': expected_data
+            })
+        )
+
+    def test_flights_list(self):
+        """Test that /api/flights/ is the same as FlightSerializer data"""
+
+        self.assert_list_is_compatible(
+            '/api/flights/', FlightSerializer, Flight.objects.all()
+        )
+
+    def test_routes_list(self):
+        """Test that /api/routes/ is the same as RouteSerializer data"""
+
+        self.assert_list_is_compatible(
+            '/api/routes/', RouteSerializer, Route.objects.all()
+        )
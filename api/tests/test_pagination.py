@@ -0,0 +1,75 @@
+"""Tests for pagination of API lists"""
+
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from api.pagination import ApiCursorPagination
+from bus_stations.models import Ticket
+from bus_stations.tests.test_services import create_test_flight
+
+
+TICKETS_AMOUNT = 30
+PAGE_SIZE = 4
+
+
+class TicketsPaginationTests(TestCase):
+    """Test class for cursor pagination of /api/tickets/"""
+
+    def setUp(self):
+        flight = create_test_flight(amount_of_free_places=TICKETS_AMOUNT)
+
+        for ticket_index in range(TICKETS_AMOUNT):
+            Ticket.objects.create(
+                flight=flight,
+                user=f'Покупатель №{ticket_index}',
+                seller='Иван'
+            )
+
+    def get_pages(self, url):
+        """All pages of the list starting from url"""
+
+        pages = []
+
+        while url:
+            pages.append(self.client.get(url).json())
+            url = pages[-1]['next']
+
+        return pages
+
+    def test_pages_cover_all_tickets(self):
+        """Test that pages contain every ticket from the latest one"""
+
+        pages = self.get_pages(f'/api/tickets/?page_size={PAGE_SIZE}')
+        users = [
+            ticket['user']
+            for page in pages
+            for ticket in page['results']
+        ]
+
+        self.assertEqual(len(pages), -(-TICKETS_AMOUNT // PAGE_SIZE))
+        self.assertEqual(users, [
+            f'Покупатель №{ticket_index}'
+            for ticket_index in reversed(range(TICKETS_AMOUNT))
+        ])
+
+    def test_deep_page_costs_as_first_page(self):
+        """Test that the last page needs as many queries as the first"""
+
+        pages = self.get_pages(f'/api/tickets/?page_size={PAGE_SIZE}')
+
+        with self.assertNumQueries(1):
+            self.client.get(f'/api/tickets/?page_size={PAGE_SIZE}')
+
+        with self.assertNumQueries(1):
+            self.client.get(pages[-2]['next'])
+
+    def test_max_page_size(self):
+        """Test that requested page size is limited"""
+
+        with patch.object(ApiCursorPagination, 'max_page_size', PAGE_SIZE):
+            response = self.client.get(
+                f'/api/tickets/?page_size={TICKETS_AMOUNT}'
+            )
+
+        self.assertEqual(len(response.json()['results']), PAGE_SIZE)
@@ -0,0 +1,129 @@
+"""Tests for amount of queries of API lists"""
+
+from datetime import time
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from api.pagination import ApiCursorPagination
+from bus_stations.labels import get_route_label, get_flight_label
+from bus_stations.models import (
+    BusStation, Route, Flight, Bus, Driver, Ticket
+)
+
+
+ROWS_AMOUNTS = (1, 100, 1000)
+
+# Lists of routes and flights make one more query for their ETag
+URLS_AND_QUERIES_AMOUNTS = {
+    '/api/users/': 1,
+    '/api/bus_stations/': 2,
+    '/api/routes/': 3,
+    '/api/flights/': 2,
+    '/api/buses/': 2,
+    '/api/drivers/': 1,
+    '/api/tickets/': 1,
+}
+
+
+def create_rows(start, end):
+    """Create rows with indexes from start to end for every model"""
+
+    indexes = range(start, end)
+
+    User.objects.bulk_create(
+        User(username=f'user_{index}') for index in indexes
+    )
+    BusStation.objects.bulk_create(
+        BusStation(
+            id=index + 1,
+            name=f'Автовокзал №{index}',
+            office_hours='10:00 - 22:00',
+            address=f'г. Тула, дом №{index}',
+            phone_number=f'8-{index}'
+        )
+        for index in indexes
+    )
+    Route.objects.bulk_create(
+        Route(
+            id=index + 1,
+            name=f'Маршрут №{index}',
+            regularity='Еж',
+            departure_time='10:00',
+            price=200,
+            bus_station_id=index + 1,
+            label=get_route_label(f'Автовокзал №{index}', f'Маршрут №{index}')
+        )
+        for index in indexes
+    )
+    Driver.objects.bulk_create(
+        Driver(
+            id=index + 1,
+            passport_number=f'1234 {index}',
+            name='Семён',
+            second_name='Семёнов',
+            middle_name='Семёнович',
+            phone_number=index + 1,
+            age=50
+        )
+        for index in indexes
+    )
+    Bus.objects.bulk_create(
+        Bus(
+            registration_number=f'Е{index}КХ',
+            mark='Ford',
+            amount_of_places=30,
+            driver_id=index + 1
+        )
+        for index in indexes
+    )
+    Flight.objects.bulk_create(
+        Flight(
+            id=index + 1,
+            route_id=index + 1,
+            departure_time=time(10),
+            arrival_time=time(12),
+            bus_id=f'Е{index}КХ',
+            label=get_flight_label(
+                get_route_label(f'Автовокзал №{index}', f'Маршрут №{index}'),
+                time(10)
+            )
+        )
+        for index in indexes
+    )
+    Ticket.objects.bulk_create(
+        Ticket(flight_id=index + 1, user='Евгений', seller='Иван')
+        for index in indexes
+    )
+
+
+class ListQueriesAmountTests(TestCase):
+    """Test that API lists cost the same queries for any amount of rows"""
+
+    def setUp(self):
+        max_page_size = patch.object(
+            ApiCursorPagination, 'max_page_size', max(ROWS_AMOUNTS)
+        )
+        max_page_size.start()
+        self.addCleanup(max_page_size.stop)
+
+    def test_queries_amounts(self):
+        """Test amount of queries of every API list"""
+
+        created_rows_amount = 0
+
+        for rows_amount in ROWS_AMOUNTS:
+            create_rows(created_rows_amount, rows_amount)
+            created_rows_amount = rows_amount
+
+            for url, queries_amount in URLS_AND_QUERIES_AMOUNTS.items():
+                with self.subTest(url=url, rows_amount=rows_amount):
+                    with self.assertNumQueries(queries_amount):
+                        response = self.client.get(
+                            url, {'page_size': rows_amount}
+                        )
+
+                    self.assertEqual(
+                        len(response.json()['results']), rows_amount
+                    )
@@ -0,0 +1,176 @@
+"""Tests for views from api folder"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import localdate
+
+from bus_stations.models import DailyFlight, Ticket
+from bus_stations.services import create_seats, generate_daily_flights
+from bus_stations.tests.test_services import create_test_flight
+
+
+class FlightSellTicketsTests(TestCase):
+    """Test class for sell_tickets action of FlightViewSet"""
+
+    def setUp(self):
+        self.flight = create_test_flight(amount_of_free_places=3)
+        self.flight.refresh_from_db()
+        self.url = f'/api/flights/{self.flight.pk}/sell_tickets/'
+
+        self.client.force_login(
+            User.objects.create_superuser('admin', password='admin')
+        )
+
+    def test_sell_tickets_returns_cheques(self):
+        """Test that group sale returns cheque for every user"""
+
+        response = self.client.post(
+            self.url,
+            {'users': ['Евгений', 'Иван'], 'seller': 'Кассир'},
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [cheque['user'] for cheque in response.json()],
+            ['Евгений', 'Иван']
+        )
+        self.assertEqual(
+            response.json()[0]['flight_name'], str(self.flight)
+        )
+        self.assertEqual(Ticket.objects.count(), 2)
+
+    def test_sell_tickets_returns_ids_of_tickets(self):
+        """Test that cheques have ids of sold tickets"""
+
+        response = self.client.post(
+            self.url,
+            {'users': ['Евгений', 'Иван'], 'seller': 'Кассир'},
+            content_type='application/json'
+        )
+
+        self.assertEqual(
+            [(cheque['id'], cheque['user']) for cheque in response.json()],
+            list(Ticket.objects.order_by('seat__number').values_list(
+                'pk', 'user'
+            ))
+        )
+
+    def test_sell_tickets_queries_amount(self):
+        """Test that group sale makes the same queries for any group size"""
+
+        # Seats are created by the first sale
+        create_seats(self.flight.pk)
+        queries_amounts = []
+
+        for users in (['Евгений'], ['Пётр', 'Семён']):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    self.url, {'users': users, 'seller': 'Кассир'},
+                    content_type='application/json'
+                )
+
+            self.assertEqual(response.status_code, 201)
+            queries_amounts.append(len(queries))
+
+        self.assertEqual(queries_amounts[0], queries_amounts[1])
+
+    def test_group_larger_than_bus(self):
+        """Test that group can't be larger than bus of the flight"""
+
+        response = self.client.post(
+            self.url,
+            {'users': ['Евгений'] * 1000, 'seller': 'Кассир'},
+            content_type='application/json'
+        )
+
+        self.assertEqual(
+            response.json()['users'], ['В автобусе рейса только 3 мест']
+        )
+
+    def test_sell_tickets_without_enough_free_places(self):
+        """Test that group sale for too many users is rejected"""
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                self.url, {'users': ['Евгений'], 'seller': 'Кассир'},
+                content_type='application/json'
+            )
+        response = self.client.post(
+            self.url,
+            {'users': ['Пётр'] * 3, 'seller': 'Кассир'},
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json()['users'],
+            ['На этот рейс недостаточно свободных мест']
+        )
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_sell_tickets_on_date(self):
+        """Test that group sale takes free places of the date"""
+
+        tomorrow = localdate() + timedelta(days=1)
+        generate_daily_flights(tomorrow, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.url,
+                {
+                    'users': ['Евгений', 'Иван'], 'seller': 'Кассир',
+                    'departure_date': tomorrow.isoformat(),
+                },
+                content_type='application/json'
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            DailyFlight.objects.get().amount_of_free_places, 1
+        )
+        self.assertEqual(
+            set(Ticket.objects.values_list('departure_date', flat=True)),
+            {tomorrow}
+        )
+
+    def test_sell_tickets_on_wrong_date(self):
+        """Test that past date and date without departure are rejected"""
+
+        for departure_date, message in (
+                (localdate() - timedelta(days=1), 'уже прошла'),
+                (localdate() + timedelta(days=1), 'не отправляется')):
+            with self.subTest(departure_date=departure_date):
+                response = self.client.post(
+                    self.url,
+                    {
+                        'users': ['Евгений'], 'seller': 'Кассир',
+                        'departure_date': departure_date.isoformat(),
+                    },
+                    content_type='application/json'
+                )
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(
+                    message, response.json()['departure_date'][0]
+                )
+
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_sell_tickets_requires_superuser(self):
+        """Test that only superuser can sell tickets through API"""
+
+        self.client.force_login(
+            User.objects.create_user('cashier', password='cashier')
+        )
+        response = self.client.post(
+            self.url,
+            {'users': ['Евгений'], 'seller': 'Кассир'},
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, 403)
@@ -1,25 +1,61 @@
 """Views for folder api"""
 
 from django.contrib.auth.models import User
+from django.db.models import Prefetch
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 
 from bus_stations.models import (
     BusStation, Route, Flight, Bus, Driver, Ticket
 )
+from bus_stations.conditional import condition_on_stamp, get_collection_stamp
+from bus_stations.services import (
+    FlightSoldOutError, NoDepartureError, sell_tickets
+)
+from api.fast_serializers import FastFlightSerializer, FastRouteSerializer
+from api.pagination import ApiCursorPagination, TicketCursorPagination
 from api.permissions import SuperUserPermission
 from api.serializers import (
     UserSerializer, BusStationSerializer, RouteSerializer,
-    FlightSerializer, BusSerializer, DriverSerializer, TicketSerializer
+    FlightSerializer, BusSerializer, DriverSerializer, TicketSerializer,
+    ChequeSerializer, GroupSaleSerializer
 )
 
 
 class AdminPermissionMixin(ModelViewSet):
-    """Mixin for admin permission"""
+    """Mixin for admin permission and paginated lists"""
 
     permission_classes = (
         IsAuthenticatedOrReadOnly, SuperUserPermission
     )
+    pagination_class = ApiCursorPagination
+
+
+class FastListMixin:
+    """Mixin for list action serialized from QuerySet.values()"""
+
+    fast_list_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        """List of objects built by fast_list_serializer_class"""
+
+        rows = self.filter_queryset(self.get_queryset()).prefetch_related(
+            None
+        ).values(*self.fast_list_serializer_class.values_fields)
+
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(
+                self.fast_list_serializer_class(rows, request).data
+            )
+
+        return self.get_paginated_response(
+            self.fast_list_serializer_class(page, request).data
+        )
 
 
 class UserViewSet(AdminPermissionMixin):
@@ -32,28 +68,93 @@ class UserViewSet(AdminPermissionMixin):
 class BusStationViewSet(AdminPermissionMixin):
     """ViewSet for BusStation model"""
 
-    queryset = BusStation.objects.all()
+    queryset = BusStation.objects.prefetch_related('routes')
     serializer_class = BusStationSerializer
 
 
-class RouteViewSet(AdminPermissionMixin):
+class RouteViewSet(FastListMixin, AdminPermissionMixin):
     """ViewSet for Route model"""
 
-    queryset = Route.objects.all()
+    queryset = Route.objects.select_related(
+        'bus_station'
+    ).prefetch_related('flights')
     serializer_class = RouteSerializer
+    fast_list_serializer_class = FastRouteSerializer
+
+    def get_list_stamp(self, request, *args, **kwargs):
+        return get_collection_stamp('routes')
+
+    @condition_on_stamp(get_list_stamp)
+    def list(self, request, *args, **kwargs):
+        """List of routes or 304 if routes weren't changed"""
 
+        return super().list(request, *args, **kwargs)
 
-class FlightViewSet(AdminPermissionMixin):
+
+class FlightViewSet(FastListMixin, AdminPermissionMixin):
     """ViewSet for Flight model"""
 
-    queryset = Flight.objects.all()
+    queryset = Flight.objects.select_related('route__bus_station', 'bus')
     serializer_class = FlightSerializer
+    fast_list_serializer_class = FastFlightSerializer
+
+    def get_list_stamp(self, request, *args, **kwargs):
+        # Sales change updated_at of flights, not version of the list
+        return get_collection_stamp(
+            'flights',
+            free_places_updated_at=Flight.objects.order_by(
+                '-updated_at'
+            ).values('updated_at')[:1]
+        )
+
+    @condition_on_stamp(get_list_stamp)
+    def list(self, request, *args, **kwargs):
+        """List of flights or 304 if flights weren't changed"""
+
+        return super().list(request, *args, **kwargs)
+
+    @action(
+        detail=True, methods=['post'],
+        serializer_class=GroupSaleSerializer
+    )
+    def sell_tickets(self, request, pk=None):
+        """Sell tickets of the flight to group of users and return cheques"""
+
+        flight = self.get_object()
+        group_sale = GroupSaleSerializer(
+            data=request.data,
+            context={**self.get_serializer_context(), 'flight': flight}
+        )
+        group_sale.is_valid(raise_exception=True)
+
+        try:
+            tickets = sell_tickets(
+                flight,
+                group_sale.validated_data['users'],
+                group_sale.validated_data['seller'],
+                group_sale.validated_data.get('departure_date'),
+            )
+        except NoDepartureError as error:
+            raise ValidationError({'departure_date': [str(error)]})
+        except FlightSoldOutError as error:
+            raise ValidationError({'users': [str(error)]})
+
+        cheques = ChequeSerializer(
+            tickets, many=True, context=self.get_serializer_context()
+        )
+
+        return Response(cheques.data, status=status.HTTP_201_CREATED)
 
 
 class BusViewSet(AdminPermissionMixin):
     """ViewSet for Bus model"""
 
-    queryset = Bus.objects.all()
+    queryset = Bus.objects.select_related('driver').prefetch_related(
+        Prefetch(
+            'flights',
+            queryset=Flight.objects.only('pk', 'bus_id', 'label')
+        )
+    )
     serializer_class = BusSerializer
 
 
@@ -67,5 +168,6 @@ class DriverViewSet(AdminPermissionMixin):
 class TicketViewSet(AdminPermissionMixin):
     """ViewSet for Ticket model"""
 
-    queryset = Ticket.objects.all()
+    queryset = Ticket.objects.select_related('seat')
     serializer_class = TicketSerializer
+    pagination_class = TicketCursorPagination
@@ -0,0 +1,80 @@
+"""Check of production settings made when they are loaded"""
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+DEBUG_APPS = ('debug_toolbar',)
+
+DEBUG_MIDDLEWARE = ('debug_toolbar.middleware.DebugToolbarMiddleware',)
+
+PGBOUNCER_POOL_MODES = ('transaction', 'session', '')
+
+LOCAL_CACHE_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+def get_unsafe_settings(settings):
+    """Messages about unsafe settings of production from their dict"""
+
+    messages = []
+    database = settings['DATABASES']['default']
+
+    if settings['DEBUG']:
+        messages.append('DEBUG is enabled')
+
+    if not settings['ALLOWED_HOSTS']:
+        messages.append('ALLOWED_HOSTS are empty')
+
+    if settings['PERFORMANCE_BUDGETS_RAISE']:
+        messages.append(
+            'PERFORMANCE_BUDGETS_RAISE makes errors for users instead of '
+            'logging'
+        )
+
+    messages += [
+        f'{app} is installed' for app in DEBUG_APPS
+        if app in settings['INSTALLED_APPS']
+    ]
+    messages += [
+        f'{middleware} is in MIDDLEWARE' for middleware in DEBUG_MIDDLEWARE
+        if middleware in settings['MIDDLEWARE']
+    ]
+
+    pool_mode = settings['PGBOUNCER_POOL_MODE']
+    if pool_mode not in PGBOUNCER_POOL_MODES:
+        messages.append(f'Unknown PGBOUNCER_POOL_MODE {pool_mode!r}')
+
+    if pool_mode == 'transaction' and \
+            not database.get('DISABLE_SERVER_SIDE_CURSORS'):
+        messages.append(
+            'Server side cursors are enabled with Pgbouncer in transaction '
+            'pool mode'
+        )
+
+    # Invalidation of cache in one process leaves stale pages in others
+    if settings['WEB_WORKERS'] > 1:
+        messages += [
+            f'{alias} cache is local to one of {settings["WEB_WORKERS"]} '
+            'WEB_WORKERS'
+            for alias, cache in settings['CACHES'].items()
+            if cache['BACKEND'] in LOCAL_CACHE_BACKENDS
+        ]
+
+    # None keeps connection forever
+    if database.get('CONN_MAX_AGE', 0) != 0 and \
+            not database.get('CONN_HEALTH_CHECKS'):
+        messages.append(
+            'Persistent database connections are used without health checks'
+        )
+
+    return messages
+
+
+def check_production_settings(settings):
+    """Raise ImproperlyConfigured if production settings are unsafe"""
+
+    messages = get_unsafe_settings(settings)
+
+    if messages:
+        raise ImproperlyConfigured(
+            'Unsafe production settings: ' + '; '.join(messages)
+        )
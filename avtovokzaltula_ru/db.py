@@ -0,0 +1,22 @@
+"""Handling of kept database connections between requests"""
+
+from django.core.signals import request_started
+from django.db import connections
+from django.dispatch import receiver
+
+
+@receiver(request_started)
+def close_broken_connections(sender, **kwargs):
+    """Close kept database connections which can't be used anymore
+
+    Replaces CONN_HEALTH_CHECKS of Django 4.1, so request opens new
+    connection instead of failing on connection closed by Pgbouncer or
+    database restart.
+    """
+
+    for connection in connections.all():
+        if connection.settings_dict.get('CONN_HEALTH_CHECKS') and \
+                connection.connection is not None and \
+                not connection.in_atomic_block and \
+                not connection.is_usable():
+            connection.close()
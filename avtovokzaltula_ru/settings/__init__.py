@@ -0,0 +1,6 @@
+"""Settings profiles: base, dev for development and prod for production
+
+Set DJANGO_SETTINGS_MODULE to 'avtovokzaltula_ru.settings.dev' or
+'avtovokzaltula_ru.settings.prod'. Commands use dev profile by default,
+WSGI and ASGI applications use prod profile.
+"""
@@ -0,0 +1,238 @@
+"""Settings shared by development and production profiles"""
+
+from pathlib import Path
+from decouple import config
+from os import path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+SECRET_KEY = config('SECRET_KEY')
+
+DEBUG = config('DEBUG', default=False, cast=bool)
+
+ALLOWED_HOSTS = []
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+
+    'bus_stations',
+    'accounts',
+
+    # For VK login
+    'social_django',
+
+    # Simple captcha
+    'captcha'
+]
+
+MIDDLEWARE = [
+    # Queries, render time and latency of views for /metrics/
+    'bus_stations.middleware.PerformanceMiddleware',
+
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'avtovokzaltula_ru.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [path.join(BASE_DIR, 'templates')],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+
+                # For VK login
+                'social_django.context_processors.backends',
+                'social_django.context_processors.login_redirect',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'avtovokzaltula_ru.wsgi.application'
+
+DATABASES = {
+    'default': {
+        'ENGINE': config('DB_ENGINE'),
+        'NAME': config('DB_NAME'),
+        'USER': config('DB_USER'),
+        'PASSWORD': config('DB_PASSWORD'),
+        'HOST': config('DB_HOST'),
+
+        # Pgbouncer port
+        'PORT': config('DB_PORT', default='6432'),
+    }
+}
+
+# Test database of SQLite is a file, because in-memory database locks
+# tables for parallel connections of sales tests
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default']['TEST'] = {
+        'NAME': path.join(BASE_DIR, 'test_db.sqlite3'),
+    }
+
+# Cache for bus stations and routes lists
+
+CACHES = {
+    'default': {
+        'BACKEND': config(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# API pagination
+
+REST_FRAMEWORK = {
+    'PAGE_SIZE': config('API_PAGE_SIZE', default=50, cast=int),
+}
+
+API_MAX_PAGE_SIZE = config('API_MAX_PAGE_SIZE', default=500, cast=int)
+
+# Rendered cheques for printing
+
+CHEQUES_ROOT = config('CHEQUES_ROOT', default=path.join(BASE_DIR, 'cheques'))
+
+CHEQUE_FONT_PATH = config(
+    'CHEQUE_FONT_PATH',
+    default='/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf'
+)
+
+CHEQUE_RENDER_WORKERS = config('CHEQUE_RENDER_WORKERS', default=2, cast=int)
+
+# Seconds which cashier request waits for cheque rendering
+CHEQUE_RENDER_TIMEOUT = config(
+    'CHEQUE_RENDER_TIMEOUT', default=2, cast=float
+)
+
+# Performance budgets of views by view name: maximum amount of queries
+# and maximum seconds. Exceeded budgets are logged. Queries include
+# session and user of logged in user.
+
+PERFORMANCE_BUDGETS = {
+    'bus_stations:index': {'queries': 3, 'seconds': 0.3},
+    'bus_stations:routes': {'queries': 5, 'seconds': 0.3},
+    'bus_stations:flights': {'queries': 5, 'seconds': 0.3},
+
+    # The first sale of flight creates it's seats
+    'bus_stations:sell_ticket': {'queries': 16, 'seconds': 0.5},
+    'bus_stations:seats': {'queries': 8, 'seconds': 0.3},
+    'bus_stations:tickets': {'queries': 5, 'seconds': 0.5},
+    'bus_stations:cheque_for_ticket': {'queries': 3, 'seconds': 0.3},
+    'busstation-list': {'queries': 4, 'seconds': 0.5},
+    'route-list': {'queries': 5, 'seconds': 0.5},
+    'flight-list': {'queries': 4, 'seconds': 0.5},
+    'ticket-list': {'queries': 3, 'seconds': 0.5},
+}
+
+# Raise PerformanceBudgetError instead of logging exceeded queries budget
+PERFORMANCE_BUDGETS_RAISE = config(
+    'PERFORMANCE_BUDGETS_RAISE', default=False, cast=bool
+)
+
+# Bearer token of Prometheus reading /metrics/, staff reads it without
+# token, empty token allows only staff
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+LANGUAGE_CODE = 'ru-ru'
+
+TIME_ZONE = 'Europe/Moscow'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+STATIC_URL = '/static/'
+
+# Login and logout
+
+LOGIN_REDIRECT_URL = 'bus_stations:index'
+
+LOGOUT_REDIRECT_URL = 'accounts:login'
+
+LOGIN_URL = 'accounts:login'
+
+# For email messages
+
+# Emails are saved to queue and sent by send_queued_emails command
+EMAIL_BACKEND = 'accounts.mail.QueuedEmailBackend'
+
+QUEUED_EMAIL_BACKEND = config(
+    'QUEUED_EMAIL_BACKEND',
+    default='django.core.mail.backends.smtp.EmailBackend'
+)
+
+EMAIL_MAX_ATTEMPTS = config('EMAIL_MAX_ATTEMPTS', default=5, cast=int)
+
+# Seconds before second attempt, delay doubles after every attempt
+EMAIL_RETRY_DELAY = config('EMAIL_RETRY_DELAY', default=60, cast=int)
+
+# Seconds after which email claimed by stopped worker is sent again
+EMAIL_SENDING_TIMEOUT = config('EMAIL_SENDING_TIMEOUT', default=600, cast=int)
+
+# Days which sent emails are kept in queue
+EMAIL_KEEP_DAYS = config('EMAIL_KEEP_DAYS', default=30, cast=int)
+
+EMAIL_HOST = 'smtp.gmail.com'
+
+EMAIL_USE_TLS = True
+
+EMAIL_PORT = 587
+
+EMAIL_HOST_USER = config('EMAIL_HOST_USER')
+
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD')
+
+# For VK login
+
+# SOCIAL_AUTH_POSTGRES_JSONFIELD = True
+
+AUTHENTICATION_BACKENDS = {
+    'social_core.backends.vk.VKOAuth2',
+    'django.contrib.auth.backends.ModelBackend',
+}
+
+SOCIAL_AUTH_VK_OAUTH2_KEY = config(
+    'SOCIAL_AUTH_VK_OAUTH2_KEY'
+)
+
+SOCIAL_AUTH_VK_OAUTH2_SECRET = config(
+    'SOCIAL_AUTH_VK_OAUTH2_SECRET'
+)
+
+SOCIAL_AUTH_VK_OAUTH2_SCOPE = ['email']
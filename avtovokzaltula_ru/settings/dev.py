@@ -0,0 +1,17 @@
+"""Settings for development with debug toolbar"""
+
+from .base import *  # noqa: F401, F403
+from .base import INSTALLED_APPS, MIDDLEWARE, config
+
+DEBUG = config('DEBUG', default=True, cast=bool)
+
+INSTALLED_APPS = INSTALLED_APPS + ['debug_toolbar']
+
+MIDDLEWARE = MIDDLEWARE + [
+    # For debug toolbar
+    'debug_toolbar.middleware.DebugToolbarMiddleware',
+]
+
+INTERNAL_IPS = [
+    '127.0.0.1'
+]
@@ -0,0 +1,62 @@
+"""Settings for production behind Pgbouncer
+
+Connections to database are kept between requests and checked before
+reuse. Unsafe combinations of settings stop the start of the site.
+"""
+
+from decouple import Csv
+
+from .base import *  # noqa: F401, F403
+from .base import DATABASES, TEMPLATES, config
+from avtovokzaltula_ru.checks import check_production_settings
+
+DEBUG = config('DEBUG', default=False, cast=bool)
+
+ALLOWED_HOSTS = config('ALLOWED_HOSTS', cast=Csv())
+
+# Processes of WSGI server, local memory cache isn't shared between them
+WEB_WORKERS = config('WEB_WORKERS', default=1, cast=int)
+
+# Pool mode of Pgbouncer: 'transaction', 'session' or empty without it
+PGBOUNCER_POOL_MODE = config('PGBOUNCER_POOL_MODE', default='transaction')
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+
+        # Seconds which connection is kept between requests
+        'CONN_MAX_AGE': config('CONN_MAX_AGE', default=60, cast=int),
+
+        # Kept connection is checked before request, see
+        # avtovokzaltula_ru.db.close_broken_connections
+        'CONN_HEALTH_CHECKS': True,
+
+        # Named cursors of .iterator() don't live between transactions
+        # of Pgbouncer in transaction pool mode, without them .iterator()
+        # fetches all rows at once, so large querysets are read by pages
+        # of primary keys as in bus_stations.export
+        'DISABLE_SERVER_SIDE_CURSORS': PGBOUNCER_POOL_MODE == 'transaction',
+    }
+}
+
+# Templates are compiled once per process
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'loaders': [
+                (
+                    'django.template.loaders.cached.Loader',
+                    [
+                        'django.template.loaders.filesystem.Loader',
+                        'django.template.loaders.app_directories.Loader',
+                    ],
+                ),
+            ],
+        },
+    },
+]
+
+check_production_settings(globals())
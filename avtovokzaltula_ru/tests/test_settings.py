@@ -0,0 +1,146 @@
+"""Tests for production settings and their checks"""
+
+import os
+import runpy
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from avtovokzaltula_ru.checks import get_unsafe_settings
+from avtovokzaltula_ru.db import close_broken_connections
+
+
+def get_production_settings(**environment):
+    """Variables of prod settings module loaded with the environment"""
+
+    with mock.patch.dict(os.environ, {
+        'DEBUG': 'False', 'ALLOWED_HOSTS': 'avtovokzaltula.ru',
+        **environment,
+    }):
+        return runpy.run_module('avtovokzaltula_ru.settings.prod')
+
+
+class ProductionSettingsTests(SimpleTestCase):
+    """Test class for prod settings profile and it's check"""
+
+    def test_production_settings(self):
+        """Test kept connections, pool options and cached templates"""
+
+        settings = get_production_settings()
+        database = settings['DATABASES']['default']
+
+        self.assertIs(settings['DEBUG'], False)
+        self.assertEqual(settings['ALLOWED_HOSTS'], ['avtovokzaltula.ru'])
+        self.assertEqual(database['CONN_MAX_AGE'], 60)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        self.assertTrue(database['DISABLE_SERVER_SIDE_CURSORS'])
+        self.assertNotIn('debug_toolbar', settings['INSTALLED_APPS'])
+        self.assertEqual(
+            settings['TEMPLATES'][0]['OPTIONS']['loaders'][0][0],
+            'django.template.loaders.cached.Loader'
+        )
+
+    def test_session_pool_mode(self):
+        """Test that server side cursors work with session pool mode"""
+
+        settings = get_production_settings(PGBOUNCER_POOL_MODE='session')
+
+        self.assertFalse(
+            settings['DATABASES']['default']['DISABLE_SERVER_SIDE_CURSORS']
+        )
+
+    def test_debug_stops_start(self):
+        """Test that production with DEBUG isn't loaded"""
+
+        with self.assertRaisesMessage(
+                ImproperlyConfigured, 'DEBUG is enabled'):
+            get_production_settings(DEBUG='True')
+
+    def test_unsafe_settings(self):
+        """Test messages about every unsafe combination"""
+
+        settings = get_production_settings()
+        settings.update({
+            'DEBUG': True,
+            'ALLOWED_HOSTS': [],
+            'PERFORMANCE_BUDGETS_RAISE': True,
+            'INSTALLED_APPS': settings['INSTALLED_APPS'] + ['debug_toolbar'],
+            'MIDDLEWARE': settings['MIDDLEWARE'] + [
+                'debug_toolbar.middleware.DebugToolbarMiddleware'
+            ],
+            'DATABASES': {'default': {'CONN_MAX_AGE': None}},
+            'WEB_WORKERS': 4,
+        })
+
+        self.assertEqual(get_unsafe_settings(settings), [
+            'DEBUG is enabled',
+            'ALLOWED_HOSTS are empty',
+            'PERFORMANCE_BUDGETS_RAISE makes errors for users instead of '
+            'logging',
+            'debug_toolbar is installed',
+            'debug_toolbar.middleware.DebugToolbarMiddleware is in '
+            'MIDDLEWARE',
+            'Server side cursors are enabled with Pgbouncer in transaction '
+            'pool mode',
+            'default cache is local to one of 4 WEB_WORKERS',
+            'Persistent database connections are used without health checks',
+        ])
+
+    def test_shared_cache_with_workers(self):
+        """Test that several workers need cache shared between them"""
+
+        with self.assertRaisesMessage(
+                ImproperlyConfigured, 'cache is local'):
+            get_production_settings(WEB_WORKERS='4')
+
+        settings = get_production_settings()
+        settings.update({
+            'WEB_WORKERS': 4,
+            'CACHES': {'default': {
+                'BACKEND': 'django_redis.cache.RedisCache',
+            }},
+        })
+
+        self.assertEqual(get_unsafe_settings(settings), [])
+
+    def test_unknown_pool_mode(self):
+        """Test that misspelled pool mode is unsafe"""
+
+        settings = get_production_settings()
+        settings['PGBOUNCER_POOL_MODE'] = 'transactions'
+
+        self.assertEqual(
+            get_unsafe_settings(settings),
+            ["Unknown PGBOUNCER_POOL_MODE 'transactions'"]
+        )
+
+
+class ConnectionHealthChecksTests(SimpleTestCase):
+    """Test class for closing of broken kept connections"""
+
+    def get_connection(self, health_checks, usable):
+        connection = mock.Mock(
+            settings_dict={'CONN_HEALTH_CHECKS': health_checks},
+            in_atomic_block=False,
+        )
+        connection.is_usable.return_value = usable
+
+        return connection
+
+    def test_broken_connection_is_closed(self):
+        """Test that only broken checked connection is closed"""
+
+        broken = self.get_connection(health_checks=True, usable=False)
+        usable = self.get_connection(health_checks=True, usable=True)
+        unchecked = self.get_connection(health_checks=False, usable=False)
+
+        with mock.patch(
+                'avtovokzaltula_ru.db.connections.all',
+                return_value=[broken, usable, unchecked]):
+            close_broken_connections(sender=None)
+
+        broken.close.assert_called_once_with()
+        usable.close.assert_not_called()
+        unchecked.close.assert_not_called()
+        unchecked.is_usable.assert_not_called()
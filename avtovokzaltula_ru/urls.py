@@ -1,8 +1,10 @@
 """Urls for folder avtovokzaltula_ru"""
 
+from django.apps import apps
 from django.contrib import admin
 from django.urls import path, include
-import debug_toolbar
+
+from bus_stations.views import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -15,11 +17,8 @@ urlpatterns = [
         include('social_django.urls', namespace='social')
     ),
 
-    # Debug toolbar
-    path(
-        '__debug__/',
-        include(debug_toolbar.urls)
-    ),
+    # Performance metrics of views in Prometheus format
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 
     # Simple captcha
     path(
@@ -39,3 +38,12 @@ urlpatterns = [
         include('rest_framework.urls')
     )
 ]
+
+# Debug toolbar is installed only in development settings
+if apps.is_installed('debug_toolbar'):
+    import debug_toolbar
+
+    urlpatterns.append(path(
+        '__debug__/',
+        include(debug_toolbar.urls)
+    ))
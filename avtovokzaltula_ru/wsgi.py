@@ -11,6 +11,9 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'avtovokzaltula_ru.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'avtovokzaltula_ru.settings.prod')
 
 application = get_wsgi_application()
+
+# Connects check of kept database connections to requests
+from avtovokzaltula_ru import db  # noqa: E402, F401
@@ -2,8 +2,9 @@ from django.contrib import admin
 
 
 from .models import (
-    BusStation, Route, Flight, Bus, Driver, Ticket
+    BusStation, Route, Flight, DailyFlight, Bus, Driver, Ticket
 )
+from .pagination import EstimatedCountPaginator
 
 
 class BusStationAdmin(admin.ModelAdmin):
@@ -22,7 +23,10 @@ class RouteAdmin(admin.ModelAdmin):
         'price', 'bus_station'
     )
     list_display_links = ('name', 'bus_station')
-    search_fields = ('name', 'bus_station')
+    list_select_related = ('bus_station',)
+
+    # Prefix lookups use indexes of names, so search is case sensitive
+    search_fields = ('name__startswith', 'bus_station__name__startswith')
 
 
 class FlightAdmin(admin.ModelAdmin):
@@ -31,7 +35,21 @@ class FlightAdmin(admin.ModelAdmin):
         'amount_of_free_places', 'bus'
     )
     list_display_links = ('route', 'bus')
-    search_fields = ('route', 'bus')
+    list_select_related = ('route', 'bus')
+    search_fields = (
+        'route__name__startswith', 'bus__registration_number__startswith'
+    )
+
+
+class DailyFlightAdmin(admin.ModelAdmin):
+    list_display = (
+        'flight', 'departure_date', 'amount_of_free_places'
+    )
+    list_display_links = ('flight',)
+    list_filter = ('departure_date',)
+    list_select_related = ('flight',)
+    search_fields = ('flight__route__name__startswith',)
+    raw_id_fields = ('flight',)
 
 
 class BusAdmin(admin.ModelAdmin):
@@ -40,7 +58,7 @@ class BusAdmin(admin.ModelAdmin):
         'amount_of_places'
     )
     list_display_links = ('mark',)
-    search_fields = ('mark', 'registration_number')
+    search_fields = ('registration_number__startswith', 'mark')
 
 
 class DriverAdmin(admin.ModelAdmin):
@@ -49,8 +67,12 @@ class DriverAdmin(admin.ModelAdmin):
         'second_name', 'middle_name',
         'phone_number', 'age', 'bus'
     )
-    list_display_links = ('name', 'bus')
-    search_fields = ('name', 'bus', 'passport_number')
+    list_display_links = ('name',)
+    list_select_related = ('bus',)
+    search_fields = (
+        'passport_number__startswith', 'second_name',
+        'bus__registration_number__startswith'
+    )
 
 
 class TicketAdmin(admin.ModelAdmin):
@@ -60,12 +82,25 @@ class TicketAdmin(admin.ModelAdmin):
     list_display_links = (
         'flight', 'user', 'seller'
     )
-    search_fields = ('flight', 'user', 'seller')
+    list_select_related = ('flight',)
+    search_fields = ('user__startswith', 'flight__route__name__startswith')
+    raw_id_fields = ('flight',)
+
+    # Seat is taken by sale of ticket
+    readonly_fields = ('seat',)
+
+    # Latest tickets by primary key without sorting the table
+    ordering = ('-pk',)
+
+    # Table of tickets isn't counted by every page
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 admin.site.register(BusStation, BusStationAdmin)
 admin.site.register(Route, RouteAdmin)
 admin.site.register(Flight, FlightAdmin)
+admin.site.register(DailyFlight, DailyFlightAdmin)
 admin.site.register(Bus, BusAdmin)
 admin.site.register(Driver, DriverAdmin)
 admin.site.register(Ticket, TicketAdmin)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class BusStationsConfig(AppConfig):
     name = 'bus_stations'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,451 @@
+"""Benchmark of schedule pages, ticket sales and API lists
+
+Data of configurable scale is generated, then every page is requested by
+test client. Latency percentiles, throughput and queries of every page
+are measured, results are saved as JSON to compare them between commits.
+Cache of bus stations and routes is warmed up before measurements as it
+is warm in production.
+"""
+
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import time
+from math import ceil
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection
+from django.test import Client, RequestFactory, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from api.fast_serializers import FastFlightSerializer
+from api.serializers import FlightSerializer
+from api.urls import api_router
+
+from .metrics import get_metrics, reset_metrics
+from .models import BusStation, Route, Flight, Bus, Driver, Seat, Ticket
+from .services import FlightSoldOutError, recount_free_places, sell_ticket
+from .timetable import import_timetable
+
+
+BENCHMARK_BATCH_SIZE = 1000
+
+MINUTES_IN_DAY = 24 * 60
+
+# Fast serializer of API lists must be so many times faster than
+# ModelSerializer
+MIN_SERIALIZER_SPEEDUP = 5
+
+
+class BenchmarkError(Exception):
+    """Benchmark can't be run with given parameters"""
+
+
+def generate_benchmark_data(bus_stations_amount, routes_amount,
+                            flights_amount, tickets_amount, free_places):
+    """Create bus stations with their routes, flights and sold tickets
+
+    Every bus station gets routes_amount routes, every route gets
+    flights_amount flights and every flight gets tickets_amount tickets
+    with seats and free_places places left for sales.
+    """
+
+    if flights_amount > MINUTES_IN_DAY:
+        raise BenchmarkError(
+            f'Route can have at most {MINUTES_IN_DAY} flights'
+        )
+
+    amount_of_places = tickets_amount + free_places
+
+    Driver.objects.bulk_create(
+        (
+            Driver(
+                passport_number=f'БЕНЧ {index:08}',
+                name='Иван',
+                second_name='Иванов',
+                middle_name='Иванович',
+                phone_number=89000000000 + index,
+                age=40,
+            )
+            for index in range(flights_amount)
+        ),
+        batch_size=BENCHMARK_BATCH_SIZE,
+    )
+    drivers = Driver.objects.filter(
+        passport_number__startswith='БЕНЧ '
+    ).order_by('passport_number')
+
+    Bus.objects.bulk_create(
+        (
+            Bus(
+                registration_number=f'Б{index:06}',
+                mark='Ford',
+                amount_of_places=amount_of_places,
+                driver=driver,
+            )
+            for index, driver in enumerate(drivers)
+        ),
+        batch_size=BENCHMARK_BATCH_SIZE,
+    )
+
+    BusStation.objects.bulk_create(
+        (
+            BusStation(
+                name=f'Автовокзал №{index}',
+                office_hours='08:00 - 22:00',
+                address=f'г. Тула, ул. Такая-то, дом №{index}',
+                phone_number=f'8-800-{index:07}',
+            )
+            for index in range(bus_stations_amount)
+        ),
+        batch_size=BENCHMARK_BATCH_SIZE,
+    )
+
+    # Flights of route depart evenly through the day, one bus per time
+    departure_times = [
+        time(*divmod(index * (MINUTES_IN_DAY // flights_amount), 60))
+        for index in range(flights_amount)
+    ]
+
+    import_timetable(
+        {
+            'bus_station': f'Автовокзал №{bus_station_index}',
+            'route': f'Маршрут №{route_index}',
+            'regularity': 'Еж',
+            'price': 100,
+            'departure_time': departure_time.isoformat(),
+            'arrival_time': departure_time.isoformat(),
+            'bus': f'Б{flight_index:06}',
+        }
+        for bus_station_index in range(bus_stations_amount)
+        for route_index in range(routes_amount)
+        for flight_index, departure_time in enumerate(departure_times)
+    )
+
+    flights_ids = list(Flight.objects.values_list('pk', flat=True))
+
+    Seat.objects.bulk_create(
+        (
+            Seat(
+                flight_id=flight_id, number=number,
+                is_taken=number <= tickets_amount
+            )
+            for flight_id in flights_ids
+            for number in range(1, amount_of_places + 1)
+        ),
+        batch_size=BENCHMARK_BATCH_SIZE,
+    )
+
+    Ticket.objects.bulk_create(
+        (
+            Ticket(
+                flight_id=flight_id, seat_id=seat_id,
+                user=f'Покупатель №{number}', seller='Иван',
+            )
+            for seat_id, flight_id, number in Seat.objects.filter(
+                number__lte=tickets_amount
+            ).values_list('pk', 'flight_id', 'number')
+        ),
+        batch_size=BENCHMARK_BATCH_SIZE,
+    )
+
+    recount_free_places()
+
+
+def get_percentile(sorted_values, percent):
+    """Nearest rank percentile of sorted values"""
+
+    index = max(ceil(len(sorted_values) * percent / 100) - 1, 0)
+
+    return sorted_values[index]
+
+
+def measure(send_request, url, requests_amount, warmup_amount,
+            expected_status):
+    """Latency, throughput and queries of requests to the url
+
+    send_request is called with url and number of request and returns
+    response. Responses with other status than expected are errors.
+    """
+
+    for request_number in range(warmup_amount):
+        send_request(url, request_number)
+
+    reset_metrics()
+    timings = []
+    errors_amount = 0
+    start_time = perf_counter()
+
+    for request_number in range(
+            warmup_amount, warmup_amount + requests_amount):
+        request_start_time = perf_counter()
+        response = send_request(url, request_number)
+        timings.append(perf_counter() - request_start_time)
+
+        errors_amount += response.status_code != expected_status
+
+    seconds = perf_counter() - start_time
+    timings.sort()
+    view_metrics = get_metrics()[resolve(url).view_name]
+
+    return {
+        'url': url,
+        'requests': requests_amount,
+        'errors': errors_amount,
+        'throughput': round(requests_amount / seconds, 2),
+        'mean_ms': round(seconds / requests_amount * 1000, 3),
+        'p50_ms': round(get_percentile(timings, 50) * 1000, 3),
+        'p99_ms': round(get_percentile(timings, 99) * 1000, 3),
+        'queries': view_metrics['queries'] / view_metrics['requests'],
+        'db_ms': round(
+            view_metrics['db_seconds'] / view_metrics['requests'] * 1000, 3
+        ),
+    }
+
+
+def measure_serializers(flights_amount):
+    """Time of FlightSerializer and FastFlightSerializer for the flights
+
+    Flights aren't saved, so only serialization is measured. Both
+    serializers must make the same data.
+    """
+
+    bus_station = BusStation(pk=1, name='Автовокзал №1')
+    route = Route(pk=1, name='Маршрут №1', bus_station=bus_station)
+    bus = Bus(registration_number='Е666КХ')
+    flights = [
+        Flight(
+            pk=index,
+            route=route,
+            departure_time=time(index % 24, index % 60),
+            arrival_time=time(23, 59),
+            amount_of_free_places=30,
+            bus=bus,
+        )
+        for index in range(flights_amount)
+    ]
+
+    # The same flights as rows of QuerySet.values()
+    rows = [
+        {
+            'pk': flight.pk,
+            'route_id': route.pk,
+            'route__name': route.name,
+            'departure_time': flight.departure_time,
+            'arrival_time': flight.arrival_time,
+            'amount_of_free_places': flight.amount_of_free_places,
+            'bus_id': bus.pk,
+        }
+        for flight in flights
+    ]
+    request = RequestFactory().get(reverse('flight-list'))
+
+    start_time = perf_counter()
+    model_data = FlightSerializer(
+        flights, many=True, context={'request': request}
+    ).data
+    model_seconds = perf_counter() - start_time
+
+    start_time = perf_counter()
+    fast_data = FastFlightSerializer(rows, request).data
+    fast_seconds = perf_counter() - start_time
+
+    if fast_data != model_data:
+        raise BenchmarkError(
+            'FastFlightSerializer makes other data than FlightSerializer'
+        )
+
+    return {
+        'flights': flights_amount,
+        'model_ms': round(model_seconds * 1000, 3),
+        'fast_ms': round(fast_seconds * 1000, 3),
+        'speedup': round(model_seconds / fast_seconds, 2),
+    }
+
+
+def measure_parallel_sales(flights_ids, sales_amount, threads_amount):
+    """Sales per second of tickets sold by parallel threads
+
+    Every thread sells in own database connection, tickets are sold in
+    turn on every flight. Sales failed by locks or lack of free places
+    are errors.
+    """
+
+    def sell(sale_number):
+        try:
+            sell_ticket(
+                flights_ids[sale_number % len(flights_ids)],
+                f'Покупатель №{sale_number}', 'Иван'
+            )
+        except (FlightSoldOutError, OperationalError):
+            return False
+        finally:
+            connection.close()
+
+        return True
+
+    start_time = perf_counter()
+    with ThreadPoolExecutor(threads_amount) as executor:
+        results = list(executor.map(sell, range(sales_amount)))
+    seconds = perf_counter() - start_time
+
+    return {
+        'threads': threads_amount,
+        'sales': sales_amount,
+        'errors': results.count(False),
+        'sales_per_second': round(results.count(True) / seconds, 2),
+    }
+
+
+def get_commit():
+    """Hash of current git commit, None outside of git repository"""
+
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(requests_amount, warmup_amount=5,
+                  serializer_flights_amount=10000, parallel_sales_amount=0,
+                  threads_amount=8):
+    """Measure pages, sales, API lists and serializers on generated data
+
+    Tickets are sold in turn on every flight, so flights need
+    requests_amount + warmup_amount + parallel_sales_amount free places
+    in total. Serializers are compared on serializer_flights_amount
+    unsaved flights. Parallel sales need committed data, they aren't
+    measured inside of transaction.
+    """
+
+    bus_station = BusStation.objects.order_by('pk').first()
+    flight = Flight.objects.select_related('route').order_by('pk').first()
+    if flight is None:
+        raise BenchmarkError('There are no flights to benchmark')
+
+    flights_ids = list(Flight.objects.values_list('pk', flat=True))
+    scale = {
+        'bus_stations': BusStation.objects.count(),
+        'routes': Route.objects.count(),
+        'flights': len(flights_ids),
+        'tickets': Ticket.objects.count(),
+    }
+    client = Client()
+    client.force_login(User.objects.get_or_create(
+        username='benchmark',
+        defaults={'is_staff': True, 'is_superuser': True},
+    )[0])
+
+    def get(url, request_number):
+        return client.get(url)
+
+    def sell(url, request_number):
+        return client.post(url, {
+            'flight': flights_ids[request_number % len(flights_ids)],
+            'user': f'Покупатель №{request_number}',
+            'seller': 'Иван',
+        })
+
+    endpoints = {
+        'index': (get, reverse('bus_stations:index'), 200),
+        'routes': (
+            get, reverse('bus_stations:routes', args=[bus_station.pk]), 200
+        ),
+        'flights': (
+            get, reverse('bus_stations:flights', args=[flight.route.pk]), 200
+        ),
+        'sell_ticket': (sell, reverse('bus_stations:sell_ticket'), 302),
+    }
+    for prefix, view_set, basename in api_router.registry:
+        endpoints[f'api_{prefix}'] = (get, reverse(f'{basename}-list'), 200)
+
+    # Cheques of sold tickets are rendered to files
+    with TemporaryDirectory() as cheques_root, \
+            override_settings(CHEQUES_ROOT=cheques_root):
+        results = {
+            name: measure(
+                send_request, url, requests_amount, warmup_amount,
+                expected_status
+            )
+            for name, (send_request, url, expected_status) in
+            endpoints.items()
+        }
+        parallel_sales = measure_parallel_sales(
+            flights_ids, parallel_sales_amount, threads_amount
+        )
+
+    return {
+        'commit': get_commit(),
+        'created_at': timezone.now().isoformat(),
+        'database': connection.vendor,
+        'scale': scale,
+        'endpoints': results,
+        'serializers': measure_serializers(serializer_flights_amount),
+        'parallel_sales': parallel_sales,
+    }
+
+
+def compare_results(old_results, new_results, max_regression):
+    """Lines comparing endpoints and list of their regressions
+
+    Endpoint regressed if it's p50 latency grew more than max_regression
+    percents or it makes more queries. Fast serializer regressed if it's
+    less than MIN_SERIALIZER_SPEEDUP times faster than ModelSerializer.
+    Parallel sales regressed if their rate fell more than max_regression
+    percents.
+    """
+
+    lines, regressions = [], []
+
+    old_rate = old_results.get('parallel_sales', {}).get('sales_per_second')
+    new_rate = new_results['parallel_sales']['sales_per_second']
+    lines.append(
+        f'parallel_sales: {old_rate} -> {new_rate} sales/s'
+    )
+    if old_rate and (1 - new_rate / old_rate) * 100 > max_regression:
+        regressions.append(
+            f'Parallel sales fell from {old_rate} to {new_rate} sales/s'
+        )
+
+    old_speedup = old_results.get('serializers', {}).get('speedup')
+    new_speedup = new_results['serializers']['speedup']
+    lines.append(
+        f'serializers: speedup {old_speedup} -> {new_speedup} times'
+    )
+    if new_speedup < MIN_SERIALIZER_SPEEDUP:
+        regressions.append(
+            f'Fast serializer is only {new_speedup} times faster'
+        )
+
+    for name, new in new_results['endpoints'].items():
+        old = old_results['endpoints'].get(name)
+        if old is None:
+            lines.append(f'{name}: new endpoint')
+            continue
+
+        p50_change = (new['p50_ms'] / old['p50_ms'] - 1) * 100 \
+            if old['p50_ms'] else 0
+        lines.append(
+            f'{name}: p50 {old["p50_ms"]} -> {new["p50_ms"]} ms '
+            f'({p50_change:+.1f}%), p99 {old["p99_ms"]} -> '
+            f'{new["p99_ms"]} ms, queries {old["queries"]} -> '
+            f'{new["queries"]}'
+        )
+
+        if p50_change > max_regression:
+            regressions.append(
+                f'{name} p50 latency grew by {p50_change:.1f}%'
+            )
+        if new['queries'] > old['queries']:
+            regressions.append(
+                f'{name} makes {new["queries"]} queries '
+                f'instead of {old["queries"]}'
+            )
+
+    return lines, regressions
@@ -0,0 +1,132 @@
+"""Cache of bus stations and routes lists"""
+
+from threading import Lock
+from time import time_ns
+
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+
+from .models import BusStation
+
+
+CACHE_TIMEOUT = 60 * 60 * 24
+
+BUS_STATIONS_KEY = 'bus_stations'
+ROUTES_VERSION_KEY = 'routes_version'
+ROUTE_FLIGHTS_VERSION_KEY = 'route_{}_flights_version'
+
+# Hits and misses are counted by process like metrics of views, so cached
+# read makes one request to cache
+_cache_stats = {'hits': 0, 'misses': 0}
+_lock = Lock()
+
+
+def count_cache_read(result):
+    """Add hit or miss to amounts of cache reads"""
+
+    with _lock:
+        _cache_stats[result] += 1
+
+
+def get_version(key):
+    """Current version of cached values
+
+    New version starts from current time, so values cached before the
+    version was evicted from cache are never read again.
+    """
+
+    return cache.get_or_set(key, time_ns, timeout=None)
+
+
+def bump_version(key):
+    """Make values cached with current version outdated"""
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time_ns(), timeout=None)
+
+
+def get_or_set_cached(key, get_value):
+    """Value from cache or result of get_value saved to cache"""
+
+    value = cache.get(key)
+
+    if value is None:
+        count_cache_read('misses')
+        value = get_value()
+        cache.set(key, value, timeout=CACHE_TIMEOUT)
+    else:
+        count_cache_read('hits')
+
+    return value
+
+
+def get_cache_stats():
+    """Amounts of cache hits and misses in this process"""
+
+    with _lock:
+        return dict(_cache_stats)
+
+
+def reset_cache_stats():
+    """Forget cache hits and misses"""
+
+    with _lock:
+        _cache_stats.update(hits=0, misses=0)
+
+
+def get_bus_stations():
+    """List of all bus stations"""
+
+    return get_or_set_cached(
+        BUS_STATIONS_KEY, lambda: list(BusStation.objects.all())
+    )
+
+
+def get_bus_station_with_routes(bus_station_id):
+    """Bus station and list of it's routes"""
+
+    def get_bus_station_with_routes_from_db():
+        bus_station = get_object_or_404(BusStation, pk=bus_station_id)
+
+        return bus_station, list(bus_station.routes.all())
+
+    return get_or_set_cached(
+        f'bus_station_{bus_station_id}_routes_'
+        f'{get_version(ROUTES_VERSION_KEY)}',
+        get_bus_station_with_routes_from_db
+    )
+
+
+def get_route_flights_version(route_id):
+    """Version of cached flights table of the route
+
+    Table is outdated after changes of the route, it's bus station or
+    it's flights. Free places are not cached in the table.
+    """
+
+    return (
+        f'{get_version(ROUTES_VERSION_KEY)}.'
+        f'{get_version(ROUTE_FLIGHTS_VERSION_KEY.format(route_id))}'
+    )
+
+
+def invalidate_bus_stations():
+    """Delete cached bus stations and their routes"""
+
+    cache.delete(BUS_STATIONS_KEY)
+    invalidate_routes()
+
+
+def invalidate_routes():
+    """Make cached routes of all bus stations outdated"""
+
+    bump_version(ROUTES_VERSION_KEY)
+
+
+def invalidate_route_flights(route_ids):
+    """Make cached flights tables of the routes outdated"""
+
+    for route_id in route_ids:
+        bump_version(ROUTE_FLIGHTS_VERSION_KEY.format(route_id))
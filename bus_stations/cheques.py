@@ -0,0 +1,236 @@
+"""Rendering of ticket cheques to PDF and thermal printer commands
+
+Rendered cheques are saved to CHEQUES_ROOT by hash of their content, so
+reprint of a cheque reads the saved file. Rendering runs in a pool of
+threads and the same cheque is never rendered twice at a time.
+"""
+
+import os
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from hashlib import sha256
+from io import BytesIO
+from tempfile import NamedTemporaryFile
+from textwrap import wrap
+from threading import RLock
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.timezone import localtime
+from PIL import Image, ImageDraw, ImageFont
+
+
+# Change it after changes of cheque layout to render cheques again
+RENDERING_VERSION = 1
+
+# Characters in line of 80 mm thermal printer
+CHEQUE_WIDTH = 32
+
+# Commands of ESC/POS printers
+ESCPOS_INITIALIZE = b'\x1b@'
+ESCPOS_CYRILLIC_CODE_PAGE = b'\x1bt\x11'
+ESCPOS_CUT = b'\n\n\n\n\x1dV\x01'
+ESCPOS_ENCODING = 'cp866'
+
+PDF_FONT_SIZE = 24
+PDF_MARGIN = 20
+PDF_RESOLUTION = 203
+
+_executor = None
+_rendering_cheques = {}
+_lock = RLock()
+
+
+def get_cheque_lines(ticket):
+    """Lines of cheque text, ticket must have flight, route, bus and seat"""
+
+    flight = ticket.flight
+    separator = '-' * CHEQUE_WIDTH
+    departure = flight.departure_time.strftime('%H:%M')
+
+    if ticket.departure_date:
+        departure = f'{ticket.departure_date:%d.%m.%Y} {departure}'
+
+    lines = [
+        flight.route.bus_station.name.center(CHEQUE_WIDTH),
+        f'Чек для билета №{ticket.pk}'.center(CHEQUE_WIDTH),
+        separator,
+        f'Рейс: {flight.route.name}',
+        f'Отправление: {departure}',
+        f'Автобус: {flight.bus}',
+        *([f'Место: {ticket.seat.number}'] if ticket.seat_id else []),
+        f'Покупатель: {ticket.user}',
+        f'Кассир: {ticket.seller}',
+        'Дата выдачи: '
+        f'{localtime(ticket.registration_time):%d.%m.%Y %H:%M}',
+        separator,
+        f'Цена: {flight.route.price} руб.'.rjust(CHEQUE_WIDTH),
+    ]
+
+    return [
+        wrapped_line
+        for line in lines
+        for wrapped_line in wrap(line, CHEQUE_WIDTH, drop_whitespace=False)
+    ]
+
+
+def render_escpos(lines):
+    """Commands of ESC/POS thermal printer printing the lines"""
+
+    return ESCPOS_INITIALIZE + ESCPOS_CYRILLIC_CODE_PAGE + '\n'.join(
+        lines
+    ).encode(ESCPOS_ENCODING, 'replace') + ESCPOS_CUT
+
+
+def get_pdf_font():
+    """Font from CHEQUE_FONT_PATH or default font of Pillow"""
+
+    try:
+        return ImageFont.truetype(settings.CHEQUE_FONT_PATH, PDF_FONT_SIZE)
+    except OSError:
+        return ImageFont.load_default(PDF_FONT_SIZE)
+
+
+def render_pdf(lines):
+    """PDF with image of the lines in width of thermal printer paper"""
+
+    font = get_pdf_font()
+    line_height = PDF_FONT_SIZE + PDF_FONT_SIZE // 4
+    width = int(font.getlength('0' * CHEQUE_WIDTH)) + PDF_MARGIN * 2
+
+    image = Image.new(
+        'L', (width, line_height * len(lines) + PDF_MARGIN * 2), 255
+    )
+    draw = ImageDraw.Draw(image)
+
+    for line_number, line in enumerate(lines):
+        draw.text(
+            (PDF_MARGIN, PDF_MARGIN + line_height * line_number),
+            line, font=font, fill=0
+        )
+
+    pdf = BytesIO()
+    image.save(pdf, 'PDF', resolution=PDF_RESOLUTION)
+
+    return pdf.getvalue()
+
+
+# Format: (render function, content type, file extension)
+CHEQUE_FORMATS = {
+    'pdf': (render_pdf, 'application/pdf', 'pdf'),
+    'escpos': (render_escpos, 'application/octet-stream', 'bin'),
+}
+
+
+def get_cheque_storage():
+    """Storage of rendered cheques"""
+
+    return FileSystemStorage(location=settings.CHEQUES_ROOT)
+
+
+def get_cheque_name(cheque_format, lines):
+    """Name of rendered cheque file made from hash of it's content"""
+
+    digest = sha256(
+        '\n'.join([str(RENDERING_VERSION), cheque_format, *lines]).encode()
+    ).hexdigest()
+
+    return f'{digest[:2]}/{digest}.{CHEQUE_FORMATS[cheque_format][2]}'
+
+
+def save_rendered_cheque(storage, name, cheque_format, lines):
+    """Render cheque and save it with the name, return the name
+
+    Cheque is written to temporary file moved to it's name at once, so
+    other processes never read half written cheque and one of the same
+    cheques saved at a time simply replaces another.
+    """
+
+    content = CHEQUE_FORMATS[cheque_format][0](lines)
+    path = storage.path(name)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    with NamedTemporaryFile(dir=directory, delete=False) as file:
+        file.write(content)
+
+    try:
+        if storage.file_permissions_mode is not None:
+            os.chmod(file.name, storage.file_permissions_mode)
+        os.replace(file.name, path)
+    except OSError:
+        os.remove(file.name)
+        raise
+
+    return name
+
+
+def get_executor():
+    """Pool of threads rendering cheques"""
+
+    global _executor
+
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.CHEQUE_RENDER_WORKERS,
+                thread_name_prefix='cheque',
+            )
+
+    return _executor
+
+
+def forget_rendering_cheque(name):
+    """Remove rendered cheque from cheques which are rendering now"""
+
+    with _lock:
+        _rendering_cheques.pop(name, None)
+
+
+def render_cheque(cheque_format, lines):
+    """Future with name of the cheque file in storage
+
+    Saved cheque isn't rendered again, cheque which is rendering now
+    isn't rendered twice.
+    """
+
+    name = get_cheque_name(cheque_format, lines)
+    storage = get_cheque_storage()
+
+    with _lock:
+        if name in _rendering_cheques:
+            return _rendering_cheques[name]
+
+        if storage.exists(name):
+            future = Future()
+            future.set_result(name)
+
+            return future
+
+        future = get_executor().submit(
+            save_rendered_cheque, storage, name, cheque_format, lines
+        )
+        _rendering_cheques[name] = future
+
+    future.add_done_callback(lambda future: forget_rendering_cheque(name))
+
+    return future
+
+
+def render_ticket_cheques(ticket):
+    """Start rendering of cheques of the ticket in all formats"""
+
+    lines = get_cheque_lines(ticket)
+
+    for cheque_format in CHEQUE_FORMATS:
+        render_cheque(cheque_format, lines)
+
+
+def get_rendered_cheque(ticket, cheque_format, timeout):
+    """Name of rendered cheque or None if it isn't rendered in timeout"""
+
+    future = render_cheque(cheque_format, get_cheque_lines(ticket))
+
+    try:
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        return None
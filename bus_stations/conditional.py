@@ -0,0 +1,98 @@
+"""Conditional GET for views showing collections of objects"""
+
+from datetime import datetime
+from functools import wraps
+from hashlib import md5
+
+from django.db.models import Subquery
+from django.utils.cache import (
+    get_conditional_response, patch_vary_headers, quote_etag
+)
+from django.utils.http import http_date
+from django.utils.timezone import localdate
+
+from .models import CollectionVersion, bump_collection_versions
+
+
+def get_validators(request, stamp):
+    """ETag and Last-Modified timestamp of the response
+
+    Response depends on stamp of shown objects, requested URL, format
+    and user.
+    """
+
+    etag = md5(repr((
+        sorted(stamp.items()),
+        request.get_full_path(),
+        request.META.get('HTTP_ACCEPT'),
+        request.user.pk,
+        request.user.get_username(),
+        request.user.is_staff,
+        localdate(),
+    )).encode()).hexdigest()
+
+    last_modified_times = [
+        value for value in stamp.values() if isinstance(value, datetime)
+    ]
+    last_modified = int(max(last_modified_times).timestamp()) \
+        if last_modified_times else None
+
+    return quote_etag(etag), last_modified
+
+
+def get_collection_stamp(name, **subqueries):
+    """Stamp with stored version of the collection by one query
+
+    Subqueries add latest values of objects changed without changing the
+    version, like free places of flights.
+    """
+
+    stamp = CollectionVersion.objects.filter(name=name).annotate(**{
+        key: Subquery(subquery) for key, subquery in subqueries.items()
+    }).values('version', 'updated_at', *subqueries).first()
+
+    if stamp is None:
+        bump_collection_versions(name)
+
+        return get_collection_stamp(name, **subqueries)
+
+    return {f'{name}_{key}': value for key, value in stamp.items()}
+
+
+def condition_on_stamp(get_stamp):
+    """Decorator of view method answering 304 for unchanged objects
+
+    get_stamp gets the same arguments as the view method and returns dict
+    with the latest updated_at of shown objects and versions or amounts of
+    them. Versions and amounts change after objects are deleted.
+    """
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_method(self, request, *args, **kwargs)
+
+            etag, last_modified = get_validators(
+                request, get_stamp(self, request, *args, **kwargs)
+            )
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+
+            if response is None:
+                response = view_method(self, request, *args, **kwargs)
+
+                if response.status_code == 200:
+                    response['ETag'] = etag
+                    if last_modified is not None:
+                        response['Last-Modified'] = http_date(last_modified)
+
+            patch_vary_headers(response, ('Accept', 'Cookie'))
+
+            return response
+
+        return wrapper
+
+    return decorator
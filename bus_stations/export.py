@@ -0,0 +1,121 @@
+"""Streaming export of sold tickets to CSV and NDJSON"""
+
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import Ticket
+
+
+# Rows fetched from database at a time, memory doesn't depend on export size
+EXPORT_CHUNK_SIZE = 2000
+
+# Column names and Ticket fields for them
+EXPORT_COLUMNS = (
+    ('id', 'pk'),
+    ('registration_time', 'registration_time'),
+    ('departure_date', 'departure_date'),
+    ('bus_station', 'flight__route__bus_station__name'),
+    ('route', 'flight__route__name'),
+    ('flight_id', 'flight_id'),
+    ('departure_time', 'flight__departure_time'),
+    ('price', 'flight__route__price'),
+    ('user', 'user'),
+    ('seller', 'seller'),
+)
+
+EXPORT_HEADER = tuple(column for column, field in EXPORT_COLUMNS)
+
+
+def start_of_day(day):
+    """Aware datetime of the day beginning in current time zone"""
+
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def get_tickets_for_export(date_from=None, date_to=None,
+                           bus_station_id=None, route_id=None,
+                           flight_id=None):
+    """Rows of tickets sold from date_from to date_to inclusive
+
+    Rows are tuples of values of EXPORT_COLUMNS fetched by chunks.
+    """
+
+    # Range of registration time uses it's index unlike __date lookups
+    filters = {
+        'registration_time__gte':
+            start_of_day(date_from) if date_from else None,
+        'registration_time__lt':
+            start_of_day(date_to + timedelta(days=1)) if date_to else None,
+        'flight__route__bus_station_id': bus_station_id,
+        'flight__route_id': route_id,
+        'flight_id': flight_id,
+    }
+
+    return iter_chunks(Ticket.objects.filter(**{
+        lookup: value for lookup, value in filters.items()
+        if value is not None
+    }).values_list(*(field for column, field in EXPORT_COLUMNS)))
+
+
+def iter_chunks(rows):
+    """Rows of queryset fetched by chunks following primary key
+
+    Every chunk is separate query, unlike .iterator() it doesn't need
+    server side cursor which is disabled with Pgbouncer in transaction
+    pool mode. Primary key is the first column of rows.
+    """
+
+    last_pk = None
+
+    while True:
+        chunk = rows.order_by('pk')
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        chunk = list(chunk[:EXPORT_CHUNK_SIZE])
+
+        yield from chunk
+
+        if len(chunk) < EXPORT_CHUNK_SIZE:
+            return
+
+        last_pk = chunk[-1][0]
+
+
+class Echo:
+    """File-like object returning written value instead of saving it"""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv_lines(rows):
+    """Header and CSV lines of the rows"""
+
+    writer = csv.writer(Echo())
+
+    yield writer.writerow(EXPORT_HEADER)
+
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson_lines(rows):
+    """JSON object with columns of every row on separate line"""
+
+    for row in rows:
+        yield json.dumps(
+            dict(zip(EXPORT_HEADER, row)),
+            cls=DjangoJSONEncoder,
+            ensure_ascii=False,
+        ) + '\n'
+
+
+# Format name: (function making lines, content type, file extension)
+EXPORT_FORMATS = {
+    'csv': (iter_csv_lines, 'text/csv', 'csv'),
+    'ndjson': (iter_ndjson_lines, 'application/x-ndjson', 'ndjson'),
+}
@@ -1,9 +1,42 @@
 from django import forms
 
 from .models import Ticket
+from .validators import validate_not_past_date
 
 
 class SellTicketForm(forms.ModelForm):
+    seat_number = forms.IntegerField(
+        label='Номер места',
+        help_text='Пусто для первого свободного места',
+        min_value=1,
+        required=False,
+    )
+
     class Meta:
-        fields = '__all__'
+        exclude = ('seat',)
         model = Ticket
+
+    def clean_departure_date(self):
+        departure_date = self.cleaned_data['departure_date']
+        validate_not_past_date(departure_date)
+
+        return departure_date
+
+
+class SeatMapForm(forms.Form):
+    departure_date = forms.DateField(required=False)
+
+
+class TicketExportForm(forms.Form):
+    format = forms.ChoiceField(
+        choices=[('csv', 'CSV'), ('ndjson', 'NDJSON')],
+        required=False,
+    )
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+    bus_station = forms.IntegerField(required=False)
+    route = forms.IntegerField(required=False)
+    flight = forms.IntegerField(required=False)
+
+    def clean_format(self):
+        return self.cleaned_data['format'] or 'csv'
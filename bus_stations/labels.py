@@ -0,0 +1,18 @@
+"""Display labels of routes and flights saved with them
+
+Label of flight contains label of it's route and label of route contains
+name of it's bus station, so lists of routes and flights are shown
+without loading related objects.
+"""
+
+
+def get_route_label(bus_station_name, route_name):
+    """Label of route from names of it's bus station and the route"""
+
+    return str(bus_station_name) + " - " + str(route_name)
+
+
+def get_flight_label(route_label, departure_time):
+    """Label of flight from label of it's route and time of departure"""
+
+    return str(route_label) + " - " + str(departure_time)
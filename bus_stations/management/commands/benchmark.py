@@ -0,0 +1,154 @@
+"""Command for benchmark of pages, sales and API on generated data"""
+
+import json
+from math import ceil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases,
+    teardown_test_environment
+)
+
+from avtovokzaltula_ru.checks import DEBUG_MIDDLEWARE
+from bus_stations.benchmark import (
+    BenchmarkError, compare_results, generate_benchmark_data, run_benchmark
+)
+
+
+class Command(BaseCommand):
+    """Measure latency and throughput in test database with generated data"""
+
+    help = 'Benchmark schedule pages, ticket sales and API lists'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bus-stations', type=int, default=5)
+        parser.add_argument(
+            '--routes', type=int, default=10, help='Routes of bus station'
+        )
+        parser.add_argument(
+            '--flights', type=int, default=10, help='Flights of route'
+        )
+        parser.add_argument(
+            '--tickets', type=int, default=10, help='Sold tickets of flight'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=100,
+            help='Measured requests to every page'
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=5,
+            help='Requests to every page before measurements'
+        )
+        parser.add_argument(
+            '--serializer-flights', type=int, default=10000,
+            help='Unsaved flights serialized by fast and model serializers'
+        )
+        parser.add_argument(
+            '--parallel-sales', type=int, default=200,
+            help='Tickets sold by parallel threads'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=8,
+            help='Threads selling tickets in parallel'
+        )
+        parser.add_argument('--output', help='Path to JSON file of results')
+        parser.add_argument(
+            '--compare', help='Path to JSON file of previous results'
+        )
+        parser.add_argument(
+            '--max-regression', type=float, default=10,
+            help='Percents of p50 latency growth failing comparison'
+        )
+
+    def handle(self, *args, **options):
+        if min(options['bus_stations'], options['routes'],
+               options['flights'], options['requests'],
+               options['serializer_flights'], options['threads']) < 1:
+            raise CommandError(
+                'Amounts of bus stations, routes, flights, requests, '
+                'serialized flights and threads must be positive'
+            )
+
+        flights_amount = options['bus_stations'] * options['routes'] * \
+            options['flights']
+        free_places = ceil(
+            (options['requests'] + options['warmup'] +
+             options['parallel_sales']) / flights_amount
+        )
+        verbosity = options['verbosity']
+
+        # Data is generated in test database, cache keys don't mix
+        # with cached pages of real database. Pages are measured as in
+        # production, without DEBUG and debug toolbar
+        setup_test_environment(debug=False)
+        old_config = setup_databases(
+            verbosity, interactive=False, aliases={'default'}
+        )
+
+        try:
+            with override_settings(
+                    CACHES={
+                        alias: {**cache_settings, 'KEY_PREFIX': 'benchmark'}
+                        for alias, cache_settings in settings.CACHES.items()
+                    },
+                    MIDDLEWARE=[
+                        middleware for middleware in settings.MIDDLEWARE
+                        if middleware not in DEBUG_MIDDLEWARE
+                    ]):
+                generate_benchmark_data(
+                    options['bus_stations'], options['routes'],
+                    options['flights'], options['tickets'], free_places
+                )
+                results = run_benchmark(
+                    options['requests'], options['warmup'],
+                    options['serializer_flights'],
+                    options['parallel_sales'], options['threads']
+                )
+        except BenchmarkError as error:
+            raise CommandError(error)
+        finally:
+            teardown_databases(old_config, verbosity)
+            teardown_test_environment()
+
+        for name, result in results['endpoints'].items():
+            self.stdout.write(
+                f'{name}: {result["throughput"]} requests/s, '
+                f'p50 {result["p50_ms"]} ms, p99 {result["p99_ms"]} ms, '
+                f'{result["queries"]} queries, errors: {result["errors"]}'
+            )
+
+        serializers = results['serializers']
+        self.stdout.write(
+            f'serializers of {serializers["flights"]} flights: '
+            f'model {serializers["model_ms"]} ms, '
+            f'fast {serializers["fast_ms"]} ms, '
+            f'speedup {serializers["speedup"]} times'
+        )
+
+        parallel_sales = results['parallel_sales']
+        self.stdout.write(
+            f'parallel sales in {parallel_sales["threads"]} threads: '
+            f'{parallel_sales["sales_per_second"]} sales/s, '
+            f'errors: {parallel_sales["errors"]}'
+        )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(results, file, ensure_ascii=False, indent=2)
+
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as file:
+                lines, regressions = compare_results(
+                    json.load(file), results, options['max_regression']
+                )
+
+            self.stdout.write('\n'.join(lines))
+
+            if regressions:
+                raise CommandError(
+                    'Performance regressed:\n' + '\n'.join(regressions)
+                )
+
+        self.stdout.write(self.style.SUCCESS('Benchmark is finished'))
@@ -0,0 +1,56 @@
+"""Command for exporting sold tickets for accounting"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from bus_stations.export import EXPORT_FORMATS, get_tickets_for_export
+
+
+class Command(BaseCommand):
+    """Write sold tickets as CSV or NDJSON to file or stdout"""
+
+    help = 'Export sold tickets as CSV or NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=EXPORT_FORMATS, default='csv',
+            help='Format of exported tickets'
+        )
+        parser.add_argument(
+            '--date-from', type=date.fromisoformat,
+            help='First date of sales as YYYY-MM-DD'
+        )
+        parser.add_argument(
+            '--date-to', type=date.fromisoformat,
+            help='Last date of sales as YYYY-MM-DD'
+        )
+        parser.add_argument(
+            '--bus-station', type=int, help='Id of bus station'
+        )
+        parser.add_argument('--route', type=int, help='Id of route')
+        parser.add_argument('--flight', type=int, help='Id of flight')
+        parser.add_argument(
+            '--output', help='File for tickets, stdout by default'
+        )
+
+    def handle(self, *args, **options):
+        make_lines = EXPORT_FORMATS[options['format']][0]
+
+        lines = make_lines(get_tickets_for_export(
+            options['date_from'],
+            options['date_to'],
+            options['bus_station'],
+            options['route'],
+            options['flight'],
+        ))
+
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+
+            return
+
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as output:
+            output.writelines(lines)
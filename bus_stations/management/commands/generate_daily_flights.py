@@ -0,0 +1,36 @@
+"""Command for creating daily flights from routes schedule"""
+
+from django.core.management.base import BaseCommand
+from django.utils.timezone import localdate
+
+from bus_stations.services import (
+    generate_daily_flights, prune_daily_flights
+)
+
+
+class Command(BaseCommand):
+    """Create daily flights for days ahead and delete departed ones"""
+
+    help = 'Create daily flights for days ahead from routes schedule'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=30,
+            help='Amount of days ahead including today'
+        )
+        parser.add_argument(
+            '--prune', action='store_true',
+            help='Delete daily flights departed before today'
+        )
+
+    def handle(self, *args, **options):
+        today = localdate()
+
+        if options['prune']:
+            pruned_amount = prune_daily_flights(today)
+            self.stdout.write(f'Deleted daily flights: {pruned_amount}')
+
+        created_amount = generate_daily_flights(today, options['days'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Created daily flights: {created_amount}'
+        ))
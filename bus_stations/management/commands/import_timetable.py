@@ -0,0 +1,66 @@
+"""Command for bulk import of timetable from CSV or JSON file"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bus_stations.timetable import (
+    IMPORT_BATCH_SIZE, TIMETABLE_READERS, TimetableError, import_timetable
+)
+
+
+class Command(BaseCommand):
+    """Create and update routes, flights and buses from timetable file"""
+
+    help = 'Import routes, flights and buses from CSV or JSON timetable'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='Path to CSV or JSON timetable')
+        parser.add_argument(
+            '--format', choices=TIMETABLE_READERS,
+            help='Format of the file, by default from it\'s extension'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+            help='Amount of rows validated and written at a time'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Validate and count changes without saving them'
+        )
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or \
+            options['file'].rsplit('.', 1)[-1].lower()
+
+        if file_format == 'ndjson':
+            file_format = 'json'
+
+        if file_format not in TIMETABLE_READERS:
+            raise CommandError(f'Unknown format of timetable: {file_format}')
+
+        with open(options['file'], encoding='utf-8', newline='') as file:
+            try:
+                stats = import_timetable(
+                    TIMETABLE_READERS[file_format](file),
+                    dry_run=options['dry_run'],
+                    batch_size=options['batch_size'],
+                    report_progress=self.report_progress,
+                )
+            except TimetableError as error:
+                raise CommandError(
+                    f'Timetable is not imported, errors: {len(error.errors)}'
+                    f'\n{error}'
+                )
+
+        if options['dry_run']:
+            self.stdout.write('Dry run, nothing is saved')
+
+        self.stdout.write(self.style.SUCCESS(
+            ', '.join(f'{name}: {amount}' for name, amount in stats.items())
+        ))
+
+    def report_progress(self, rows_amount, stats):
+        self.stdout.write(
+            f'Rows processed: {rows_amount}, '
+            f'created flights: {stats["created_flights"]}, '
+            f'updated flights: {stats["updated_flights"]}'
+        )
@@ -0,0 +1,17 @@
+"""Command for fixing free places of flights by sold tickets"""
+
+from django.core.management.base import BaseCommand
+
+from bus_stations.services import recount_free_places
+
+
+class Command(BaseCommand):
+    """Set free places of flights to places of buses without tickets"""
+
+    help = 'Recount free places of flights and daily flights by tickets'
+
+    def handle(self, *args, **options):
+        fixed_amount = recount_free_places()
+        self.stdout.write(self.style.SUCCESS(
+            f'Fixed free places counters: {fixed_amount}'
+        ))
@@ -0,0 +1,200 @@
+"""Performance metrics of views and their budgets
+
+PerformanceMiddleware records queries, database time, template render
+time and latency of every request. Metrics are kept by process, so
+every worker process exports it's own metrics.
+"""
+
+from threading import Lock
+
+from django.conf import settings
+
+from .cache import get_cache_stats
+
+
+# Upper bounds of latency histogram in seconds
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Name of view for requests which didn't match any url
+UNRESOLVED_VIEW_NAME = '<unresolved>'
+
+_metrics = {}
+_lock = Lock()
+
+
+class PerformanceBudgetError(Exception):
+    """View made more queries than it's budget allows"""
+
+
+def get_empty_view_metrics():
+    """Metrics of view without requests"""
+
+    return {
+        'requests': 0,
+        'seconds': 0.0,
+        'buckets': [0] * len(LATENCY_BUCKETS),
+        'queries': 0,
+        'db_seconds': 0.0,
+        'render_seconds': 0.0,
+        'budget_exceeded': 0,
+    }
+
+
+def record_request(view_name, seconds, queries_amount, db_seconds,
+                   render_seconds, budget_exceeded=False):
+    """Add measurements of one request to metrics of the view"""
+
+    with _lock:
+        view_metrics = _metrics.setdefault(
+            view_name, get_empty_view_metrics()
+        )
+        view_metrics['requests'] += 1
+        view_metrics['seconds'] += seconds
+        view_metrics['queries'] += queries_amount
+        view_metrics['db_seconds'] += db_seconds
+        view_metrics['render_seconds'] += render_seconds
+        view_metrics['budget_exceeded'] += budget_exceeded
+
+        for bucket_index, upper_bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= upper_bound:
+                view_metrics['buckets'][bucket_index] += 1
+
+
+def get_metrics():
+    """Copy of metrics of views by their names"""
+
+    with _lock:
+        return {
+            view_name: {**view_metrics, 'buckets': [*view_metrics['buckets']]}
+            for view_name, view_metrics in _metrics.items()
+        }
+
+
+def reset_metrics():
+    """Forget metrics of all views"""
+
+    with _lock:
+        _metrics.clear()
+
+
+def get_budget_violations(view_name, queries_amount=None, seconds=None):
+    """Messages about budgets of the view which the request exceeded
+
+    Budgets are set in PERFORMANCE_BUDGETS by view name as maximum
+    amount of queries and maximum seconds. Measurement which is None
+    isn't checked.
+    """
+
+    budget = settings.PERFORMANCE_BUDGETS.get(view_name, {})
+    violations = []
+
+    if queries_amount is not None and \
+            queries_amount > budget.get('queries', queries_amount):
+        violations.append(
+            f'{view_name} made {queries_amount} queries, '
+            f'budget is {budget["queries"]}'
+        )
+
+    if seconds is not None and seconds > budget.get('seconds', seconds):
+        violations.append(
+            f'{view_name} took {seconds:.3f} s, '
+            f'budget is {budget["seconds"]} s'
+        )
+
+    return violations
+
+
+def escape_label(value):
+    """Value of label escaped for Prometheus text format"""
+
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace(
+        '\n', '\\n'
+    )
+
+
+def render_metrics():
+    """Metrics of views and cache in Prometheus text format"""
+
+    metrics = get_metrics()
+    views = sorted(metrics)
+    lines = []
+
+    def add_metric(name, metric_type, help_text, samples):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        lines.extend(
+            f'{sample_name}{labels} {value}'
+            for sample_name, labels, value in samples
+        )
+
+    def get_view_samples(name, key):
+        return [
+            (name, f'{{view="{escape_label(view)}"}}', metrics[view][key])
+            for view in views
+        ]
+
+    add_metric(
+        'view_requests_total', 'counter', 'Requests handled by view',
+        get_view_samples('view_requests_total', 'requests')
+    )
+
+    latency_samples = []
+    for view in views:
+        view_label = f'view="{escape_label(view)}"'
+
+        for upper_bound, amount in zip(
+                LATENCY_BUCKETS, metrics[view]['buckets']):
+            latency_samples.append((
+                'view_latency_seconds_bucket',
+                f'{{{view_label},le="{upper_bound}"}}', amount
+            ))
+
+        latency_samples += [
+            (
+                'view_latency_seconds_bucket',
+                f'{{{view_label},le="+Inf"}}', metrics[view]['requests']
+            ),
+            (
+                'view_latency_seconds_sum',
+                f'{{{view_label}}}', metrics[view]['seconds']
+            ),
+            (
+                'view_latency_seconds_count',
+                f'{{{view_label}}}', metrics[view]['requests']
+            ),
+        ]
+
+    add_metric(
+        'view_latency_seconds', 'histogram', 'Latency of view',
+        latency_samples
+    )
+    add_metric(
+        'view_queries_total', 'counter', 'Database queries made by view',
+        get_view_samples('view_queries_total', 'queries')
+    )
+    add_metric(
+        'view_db_seconds_total', 'counter', 'Time of database queries',
+        get_view_samples('view_db_seconds_total', 'db_seconds')
+    )
+    add_metric(
+        'view_render_seconds_total', 'counter', 'Time of template rendering',
+        get_view_samples('view_render_seconds_total', 'render_seconds')
+    )
+    add_metric(
+        'view_budget_exceeded_total', 'counter',
+        'Requests exceeding performance budget of view',
+        get_view_samples('view_budget_exceeded_total', 'budget_exceeded')
+    )
+
+    cache_stats = get_cache_stats()
+    add_metric(
+        'cache_hits_total', 'counter', 'Hits of bus stations and routes cache',
+        [('cache_hits_total', '', cache_stats['hits'])]
+    )
+    add_metric(
+        'cache_misses_total', 'counter',
+        'Misses of bus stations and routes cache',
+        [('cache_misses_total', '', cache_stats['misses'])]
+    )
+
+    return '\n'.join(lines) + '\n'
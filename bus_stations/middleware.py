@@ -0,0 +1,107 @@
+"""Middleware measuring performance of views"""
+
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import (
+    UNRESOLVED_VIEW_NAME, PerformanceBudgetError, get_budget_violations,
+    record_request
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMeasurements:
+    """Queries, database time and render time of one request"""
+
+    def __init__(self):
+        self.queries_amount = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper of database connections measuring queries"""
+
+        start_time = perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += perf_counter() - start_time
+            self.queries_amount += 1
+
+
+class PerformanceMiddleware:
+    """Record queries, database time, render time and latency of views
+
+    Requests exceeding PERFORMANCE_BUDGETS of their view are logged, or
+    raise PerformanceBudgetError if PERFORMANCE_BUDGETS_RAISE is set.
+    Only budgets of queries raise, because latency of tests isn't stable.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        measurements = RequestMeasurements()
+        request.performance_measurements = measurements
+        start_time = perf_counter()
+
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(measurements)
+                )
+
+            response = self.get_response(request)
+
+        seconds = perf_counter() - start_time
+        view_name = UNRESOLVED_VIEW_NAME
+        if request.resolver_match is not None:
+            view_name = request.resolver_match.view_name
+
+        queries_violations = get_budget_violations(
+            view_name, queries_amount=measurements.queries_amount
+        )
+        violations = queries_violations + get_budget_violations(
+            view_name, seconds=seconds
+        )
+        record_request(
+            view_name, seconds, measurements.queries_amount,
+            measurements.db_seconds, measurements.render_seconds,
+            bool(violations)
+        )
+
+        for violation in violations:
+            logger.warning('Performance budget exceeded: %s', violation)
+
+        if settings.PERFORMANCE_BUDGETS_RAISE and queries_violations:
+            raise PerformanceBudgetError('; '.join(queries_violations))
+
+        return response
+
+    def process_template_response(self, request, response):
+        """Measure rendering of the template response"""
+
+        render = response.render
+        measurements = request.performance_measurements
+
+        def measured_render():
+            start_time = perf_counter()
+
+            try:
+                return render()
+            finally:
+                measurements.render_seconds += perf_counter() - start_time
+
+                # Rendered response can be pickled by cache
+                del response.render
+
+        response.render = measured_render
+
+        return response
@@ -0,0 +1,122 @@
+# Generated by Django 3.2.25 on 2026-10-18 06:26
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Bus',
+            fields=[
+                ('registration_number', models.CharField(max_length=10, primary_key=True, serialize=False, verbose_name='Регистрационный номер')),
+                ('mark', models.CharField(max_length=100, verbose_name='Марка')),
+                ('amount_of_places', models.PositiveSmallIntegerField(verbose_name='Число мест')),
+            ],
+            options={
+                'verbose_name': 'Автобус',
+                'verbose_name_plural': 'Автобусы',
+                'ordering': ['mark'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BusStation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True, verbose_name='Название')),
+                ('office_hours', models.CharField(help_text='Часы работы через точку с запятой', max_length=30, verbose_name='Часы работы')),
+                ('address', models.CharField(max_length=100, unique=True, verbose_name='Адрес')),
+                ('phone_number', models.CharField(max_length=15, unique=True, verbose_name='Номер телефона')),
+            ],
+            options={
+                'verbose_name': 'Автовокзал',
+                'verbose_name_plural': 'Автовокзалы',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Driver',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('passport_number', models.CharField(max_length=25, unique=True, verbose_name='Номер паспорта')),
+                ('name', models.CharField(max_length=255, verbose_name='Имя')),
+                ('second_name', models.CharField(max_length=255, verbose_name='Фамилия')),
+                ('middle_name', models.CharField(max_length=255, verbose_name='Отчество')),
+                ('phone_number', models.BigIntegerField(unique=True, validators=[django.core.validators.MinValueValidator(1)], verbose_name='Номер телефона')),
+                ('age', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(21)], verbose_name='Возраст')),
+            ],
+            options={
+                'verbose_name': 'Водитель',
+                'verbose_name_plural': 'Водители',
+                'ordering': ['name', 'second_name', 'middle_name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Flight',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('departure_time', models.TimeField(verbose_name='Время отправления')),
+                ('arrival_time', models.TimeField(verbose_name='Время прибытия')),
+                ('amount_of_free_places', models.PositiveSmallIntegerField(default=30, verbose_name='Число свободных мест')),
+                ('bus', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flights', to='bus_stations.bus', verbose_name='Автобус')),
+            ],
+            options={
+                'verbose_name': 'Рейс',
+                'verbose_name_plural': 'Рейсы',
+                'ordering': ['departure_time'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Ticket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user', models.CharField(max_length=255, verbose_name='Покупатель')),
+                ('seller', models.CharField(max_length=255, verbose_name='Продавец')),
+                ('registration_time', models.DateTimeField(auto_now_add=True, verbose_name='Время оформления')),
+                ('flight', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='bus_stations.flight', verbose_name='Рейс')),
+            ],
+            options={
+                'verbose_name': 'Билет',
+                'verbose_name_plural': 'Билеты',
+                'ordering': ['flight'],
+                'get_latest_by': 'registration_time',
+            },
+        ),
+        migrations.CreateModel(
+            name='Route',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Пункт прибытия', max_length=100, verbose_name='Название')),
+                ('regularity', models.CharField(help_text='Первые 2 буквы дней недели через точку с запятой,            либо Еж - ежедневно', max_length=20, verbose_name='Регулярность')),
+                ('departure_time', models.CharField(help_text='Всё возможное время отправления', max_length=255, verbose_name='Время отправления')),
+                ('price', models.PositiveSmallIntegerField(verbose_name='Цена')),
+                ('bus_station', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='routes', to='bus_stations.busstation', verbose_name='Автовокзал')),
+            ],
+            options={
+                'verbose_name': 'Маршрут',
+                'verbose_name_plural': 'Маршруты',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='route',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flights', to='bus_stations.route', verbose_name='Маршрут'),
+        ),
+        migrations.AddField(
+            model_name='bus',
+            name='driver',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.PROTECT, to='bus_stations.driver', verbose_name='Водитель'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='flight',
+            unique_together={('route', 'departure_time')},
+        ),
+    ]
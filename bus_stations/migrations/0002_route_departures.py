@@ -0,0 +1,37 @@
+# Generated by Django 3.2.25 on 2026-10-18 06:31
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bus_stations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RouteDeparture',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Пн'), (1, 'Вт'), (2, 'Ср'), (3, 'Чт'), (4, 'Пт'), (5, 'Сб'), (6, 'Вс')], validators=[django.core.validators.MaxValueValidator(6)], verbose_name='День недели')),
+                ('departure_time', models.TimeField(verbose_name='Время отправления')),
+                ('route', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='departures', to='bus_stations.route', verbose_name='Маршрут')),
+            ],
+            options={
+                'verbose_name': 'Отправление по расписанию',
+                'verbose_name_plural': 'Отправления по расписанию',
+                'ordering': ['weekday', 'departure_time'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='routedeparture',
+            index=models.Index(fields=['weekday', 'departure_time'], name='bus_station_weekday_b4eace_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='routedeparture',
+            unique_together={('route', 'weekday', 'departure_time')},
+        ),
+    ]
@@ -0,0 +1,67 @@
+import re
+from datetime import time
+
+from django.db import migrations
+
+
+# Parser of route schedule as it was when departures were added, later
+# changes of bus_stations.schedule don't change this migration
+WEEKDAYS_CODES = ('Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс')
+
+EVERY_DAY_CODE = 'Еж'
+
+DEPARTURE_TIME_PATTERN = re.compile(r'(\d{1,2})[:.](\d{2})')
+
+
+def get_route_departures(regularity, departure_time):
+    codes = [code.strip().capitalize() for code in regularity.split(';')]
+
+    if EVERY_DAY_CODE in codes:
+        weekdays = range(len(WEEKDAYS_CODES))
+    else:
+        weekdays = sorted({
+            WEEKDAYS_CODES.index(code)
+            for code in codes if code in WEEKDAYS_CODES
+        })
+
+    departure_times = sorted({
+        time(int(hours), int(minutes))
+        for hours, minutes in DEPARTURE_TIME_PATTERN.findall(departure_time)
+        if int(hours) < 24 and int(minutes) < 60
+    })
+
+    return [
+        (weekday, route_departure_time)
+        for weekday in weekdays
+        for route_departure_time in departure_times
+    ]
+
+
+def fill_route_departures(apps, schema_editor):
+    Route = apps.get_model('bus_stations', 'Route')
+    RouteDeparture = apps.get_model('bus_stations', 'RouteDeparture')
+
+    RouteDeparture.objects.bulk_create(
+        RouteDeparture(
+            route_id=route.pk, weekday=weekday, departure_time=departure_time
+        )
+        for route in Route.objects.only('regularity', 'departure_time')
+        for weekday, departure_time in get_route_departures(
+            route.regularity, route.departure_time
+        )
+    )
+
+
+def clear_route_departures(apps, schema_editor):
+    apps.get_model('bus_stations', 'RouteDeparture').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bus_stations', '0002_route_departures'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_route_departures, clear_route_departures),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.2.25 on 2026-10-18 06:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bus_stations', '0003_fill_route_departures'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='departure_date',
+            field=models.DateField(blank=True, help_text='Пусто для билета без даты', null=True, verbose_name='Дата отправления'),
+        ),
+        migrations.CreateModel(
+            name='DailyFlight',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('departure_date', models.DateField(verbose_name='Дата отправления')),
+                ('amount_of_free_places', models.PositiveSmallIntegerField(verbose_name='Число свободных мест')),
+                ('flight', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_flights', to='bus_stations.flight', verbose_name='Рейс')),
+            ],
+            options={
+                'verbose_name': 'Рейс на дату',
+                'verbose_name_plural': 'Рейсы на дату',
+                'ordering': ['departure_date', 'flight'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='dailyflight',
+            index=models.Index(fields=['departure_date'], name='bus_station_departu_67d50f_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailyflight',
+            unique_together={('flight', 'departure_date')},
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:01
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bus_stations', '0006_ticket_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Seat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('departure_date', models.DateField(blank=True, help_text='Пусто для рейса без даты', null=True, verbose_name='Дата отправления')),
+                ('number', models.PositiveSmallIntegerField(validators=[django.core.validators.MinValueValidator(1)], verbose_name='Номер места')),
+                ('flight', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seats', to='bus_stations.flight', verbose_name='Рейс')),
+            ],
+            options={
+                'verbose_name': 'Место',
+                'verbose_name_plural': 'Места',
+                'ordering': ['flight', 'departure_date', 'number'],
+            },
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='seat',
+            field=models.OneToOneField(blank=True, help_text='Пусто для билета, проданного до появления мест', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ticket', to='bus_stations.seat', verbose_name='Место'),
+        ),
+        migrations.AddConstraint(
+            model_name='seat',
+            constraint=models.UniqueConstraint(fields=('flight', 'departure_date', 'number'), name='seat_flight_date_number_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='seat',
+            constraint=models.UniqueConstraint(condition=models.Q(('departure_date', None)), fields=('flight', 'number'), name='seat_flight_number_uniq'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bus_stations', '0007_seats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ticket',
+            name='user',
+            field=models.CharField(db_index=True, max_length=255, verbose_name='Покупатель'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+from bus_stations.labels import get_route_label, get_flight_label
+
+
+def fill_labels(apps, schema_editor):
+    Route = apps.get_model('bus_stations', 'Route')
+    Flight = apps.get_model('bus_stations', 'Flight')
+
+    routes = list(Route.objects.select_related('bus_station').only(
+        'name', 'bus_station__name'
+    ))
+    for route in routes:
+        route.label = get_route_label(route.bus_station.name, route.name)
+    Route.objects.bulk_update(routes, ['label'], batch_size=1000)
+
+    route_labels = {route.pk: route.label for route in routes}
+    flights = list(Flight.objects.only('route_id', 'departure_time'))
+    for flight in flights:
+        flight.label = get_flight_label(
+            route_labels[flight.route_id], flight.departure_time
+        )
+    Flight.objects.bulk_update(flights, ['label'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bus_stations', '0008_ticket_user_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='route',
+            name='label',
+            field=models.CharField(default='', editable=False, help_text='Автовокзал и название маршрута', max_length=255, verbose_name='Название в списках'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='label',
+            field=models.CharField(default='', editable=False, help_text='Маршрут и время отправления', max_length=255, verbose_name='Название в списках'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_labels, migrations.RunPython.noop),
+    ]
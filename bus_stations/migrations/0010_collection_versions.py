@@ -0,0 +1,36 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:29
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def create_versions(apps, schema_editor):
+    CollectionVersion = apps.get_model('bus_stations', 'CollectionVersion')
+
+    CollectionVersion.objects.bulk_create([
+        CollectionVersion(name=name, updated_at=timezone.now())
+        for name in ('routes', 'flights')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bus_stations', '0009_labels'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CollectionVersion',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Коллекция')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='Версия')),
+                ('updated_at', models.DateTimeField(verbose_name='Время изменения')),
+            ],
+            options={
+                'verbose_name': 'Версия коллекции',
+                'verbose_name_plural': 'Версии коллекций',
+            },
+        ),
+        migrations.RunPython(create_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bus_stations', '0010_collection_versions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='route',
+            name='name',
+            field=models.CharField(db_index=True, help_text='Пункт прибытия', max_length=100, verbose_name='Название'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+def fill_taken_seats(apps, schema_editor):
+    apps.get_model('bus_stations', 'Seat').objects.filter(
+        ticket__isnull=False
+    ).update(is_taken=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bus_stations', '0011_route_name_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seat',
+            name='is_taken',
+            field=models.BooleanField(default=False, verbose_name='Занято'),
+        ),
+        migrations.RunPython(fill_taken_seats, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,13 @@
-from django.db import models
-from django.core.validators import MinValueValidator
+from django.db import models, transaction
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+
+from .labels import get_route_label, get_flight_label
+from .schedule import WEEKDAYS_CODES, get_route_departures
+
+
+LABELS_BATCH_SIZE = 1000
 
 
 class BusStation(models.Model):
@@ -27,20 +35,68 @@ class BusStation(models.Model):
         unique=True,
     )
 
+    updated_at = models.DateTimeField(
+        'Время изменения',
+        auto_now=True,
+        db_index=True,
+    )
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.update_route_labels()
+
+    def update_route_labels(self):
+        """Rebuild labels of routes and their flights after renaming"""
+
+        routes = []
+        for route in self.routes.only('pk', 'name', 'label'):
+            label = get_route_label(self.name, route.name)
+
+            if route.label != label:
+                route.label = label
+                routes.append(route)
+
+        Route.objects.bulk_update(
+            routes, ['label'], batch_size=LABELS_BATCH_SIZE
+        )
+        update_flight_labels(routes)
+
     class Meta:
         verbose_name = 'Автовокзал'
         verbose_name_plural = 'Автовокзалы'
         ordering = ['name']
 
 
+class RouteQuerySet(models.QuerySet):
+    def by_schedule(self, weekday, departure_time_from,
+                    departure_time_to=None):
+        """Routes departing on weekday in range of departure time
+
+        Weekday is a number like in date.weekday(). Upper bound of
+        departure time isn't limited if departure_time_to is None.
+        """
+
+        departures = {
+            'departures__weekday': weekday,
+            'departures__departure_time__gte': departure_time_from,
+        }
+
+        if departure_time_to is not None:
+            departures['departures__departure_time__lte'] = departure_time_to
+
+        return self.filter(**departures).distinct()
+
+
 class Route(models.Model):
     name = models.CharField(
         'Название',
         help_text='Пункт прибытия',
         max_length=100,
+        db_index=True,
     )
 
     regularity = models.CharField(
@@ -67,8 +123,45 @@ class Route(models.Model):
         verbose_name='Автовокзал',
     )
 
+    updated_at = models.DateTimeField(
+        'Время изменения',
+        auto_now=True,
+        db_index=True,
+    )
+
+    label = models.CharField(
+        'Название в списках',
+        help_text='Автовокзал и название маршрута',
+        max_length=255,
+        editable=False,
+    )
+
+    objects = RouteQuerySet.as_manager()
+
     def __str__(self):
-        return str(self.bus_station) + " - " + str(self.name)
+        return self.label or get_route_label(self.bus_station, self.name)
+
+    def save(self, *args, **kwargs):
+        self.label = get_route_label(self.bus_station.name, self.name)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.update_departures()
+            update_flight_labels([self])
+
+    def update_departures(self):
+        """Rebuild departures of the route from regularity and times"""
+
+        self.departures.all().delete()
+        RouteDeparture.objects.bulk_create(
+            RouteDeparture(
+                route=self, weekday=weekday, departure_time=departure_time
+            )
+            for weekday, departure_time in get_route_departures(
+                self.regularity, self.departure_time,
+                self.flights.values_list('departure_time', flat=True)
+            )
+        )
 
     class Meta:
         verbose_name = 'Маршрут'
@@ -76,6 +169,38 @@ class Route(models.Model):
         ordering = ['name']
 
 
+class RouteDeparture(models.Model):
+    route = models.ForeignKey(
+        'Route',
+        related_name='departures',
+        on_delete=models.CASCADE,
+        verbose_name='Маршрут',
+    )
+
+    weekday = models.PositiveSmallIntegerField(
+        'День недели',
+        choices=list(enumerate(WEEKDAYS_CODES)),
+        validators=[MaxValueValidator(len(WEEKDAYS_CODES) - 1)],
+    )
+
+    departure_time = models.TimeField(
+        'Время отправления',
+    )
+
+    def __str__(self):
+        return str(self.route) + " - " + \
+            self.get_weekday_display() + " " + str(self.departure_time)
+
+    class Meta:
+        verbose_name = 'Отправление по расписанию'
+        verbose_name_plural = 'Отправления по расписанию'
+        ordering = ['weekday', 'departure_time']
+        unique_together = ['route', 'weekday', 'departure_time']
+        indexes = [
+            models.Index(fields=['weekday', 'departure_time']),
+        ]
+
+
 class Flight(models.Model):
     route = models.ForeignKey(
         'Route',
@@ -104,9 +229,41 @@ class Flight(models.Model):
         verbose_name='Автобус',
     )
 
+    updated_at = models.DateTimeField(
+        'Время изменения',
+        auto_now=True,
+        db_index=True,
+    )
+
+    label = models.CharField(
+        'Название в списках',
+        help_text='Маршрут и время отправления',
+        max_length=255,
+        editable=False,
+    )
+
     def __str__(self):
-        return str(self.route) + " - " + \
-            str(self.departure_time)
+        return self.label or get_flight_label(
+            self.route, self.departure_time
+        )
+
+    def save(self, *args, **kwargs):
+        self.label = get_flight_label(
+            self.route.label,
+            self._meta.get_field('departure_time').to_python(
+                self.departure_time
+            )
+        )
+
+        super().save(*args, **kwargs)
+
+    def clean(self):
+        if self.bus_id is not None and \
+                self.amount_of_free_places > self.bus.amount_of_places:
+            raise ValidationError({
+                'amount_of_free_places': 'Свободных мест больше, '
+                'чем мест в автобусе',
+            })
 
     class Meta:
         verbose_name = 'Рейс'
@@ -115,6 +272,73 @@ class Flight(models.Model):
         unique_together = ['route', 'departure_time']
 
 
+def update_routes_departures(routes_ids):
+    """Rebuild departures of existing routes after their flights changed"""
+
+    with transaction.atomic():
+        for route in Route.objects.filter(pk__in=routes_ids).only(
+                'pk', 'regularity', 'departure_time'):
+            route.update_departures()
+
+
+def update_flight_labels(routes):
+    """Rebuild labels of flights of the routes after their labels changed"""
+
+    route_labels = {route.pk: route.label for route in routes}
+    flights = []
+
+    for flight in Flight.objects.filter(route__in=list(route_labels)).only(
+            'pk', 'route_id', 'departure_time', 'label'):
+        label = get_flight_label(
+            route_labels[flight.route_id], flight.departure_time
+        )
+
+        if flight.label != label:
+            flight.label = label
+            flights.append(flight)
+
+    Flight.objects.bulk_update(
+        flights, ['label'], batch_size=LABELS_BATCH_SIZE
+    )
+
+
+class DailyFlight(models.Model):
+    flight = models.ForeignKey(
+        'Flight',
+        related_name='daily_flights',
+        on_delete=models.CASCADE,
+        verbose_name='Рейс',
+    )
+
+    departure_date = models.DateField(
+        'Дата отправления',
+    )
+
+    amount_of_free_places = models.PositiveSmallIntegerField(
+        'Число свободных мест',
+    )
+
+    def __str__(self):
+        return str(self.flight) + " - " + str(self.departure_date)
+
+    def clean(self):
+        if self.flight_id is not None and self.amount_of_free_places > \
+                self.flight.bus.amount_of_places:
+            raise ValidationError({
+                'amount_of_free_places': 'Свободных мест больше, '
+                'чем мест в автобусе',
+            })
+
+    class Meta:
+        verbose_name = 'Рейс на дату'
+        verbose_name_plural = 'Рейсы на дату'
+        ordering = ['departure_date', 'flight']
+        unique_together = ['flight', 'departure_date']
+        indexes = [
+            models.Index(fields=['departure_date']),
+        ]
+
+
 class Bus(models.Model):
     registration_number = models.CharField(
         'Регистрационный номер',
@@ -190,6 +414,56 @@ class Driver(models.Model):
         ordering = ['name', 'second_name', 'middle_name']
 
 
+class Seat(models.Model):
+    flight = models.ForeignKey(
+        'Flight',
+        related_name='seats',
+        on_delete=models.CASCADE,
+        verbose_name='Рейс',
+    )
+
+    departure_date = models.DateField(
+        'Дата отправления',
+        help_text='Пусто для рейса без даты',
+        null=True,
+        blank=True,
+    )
+
+    number = models.PositiveSmallIntegerField(
+        'Номер места',
+        validators=[MinValueValidator(1)]
+    )
+
+    # Sale changes row of the seat it locks, so parallel sale waiting
+    # for the lock checks the seat again instead of joined ticket
+    is_taken = models.BooleanField(
+        'Занято',
+        default=False,
+    )
+
+    def __str__(self):
+        return str(self.flight) + " - место №" + str(self.number)
+
+    class Meta:
+        verbose_name = 'Место'
+        verbose_name_plural = 'Места'
+        ordering = ['flight', 'departure_date', 'number']
+        constraints = [
+            # Free seats of flight on date are found in order of numbers
+            models.UniqueConstraint(
+                fields=['flight', 'departure_date', 'number'],
+                name='seat_flight_date_number_uniq',
+            ),
+
+            # NULL dates aren't equal in unique constraint above
+            models.UniqueConstraint(
+                fields=['flight', 'number'],
+                condition=models.Q(departure_date=None),
+                name='seat_flight_number_uniq',
+            ),
+        ]
+
+
 class Ticket(models.Model):
     flight = models.ForeignKey(
         'Flight',
@@ -199,7 +473,8 @@ class Ticket(models.Model):
 
     user = models.CharField(
         'Покупатель',
-        max_length=255
+        max_length=255,
+        db_index=True,
     )
 
     seller = models.CharField(
@@ -212,6 +487,23 @@ class Ticket(models.Model):
         auto_now_add=True,
     )
 
+    departure_date = models.DateField(
+        'Дата отправления',
+        help_text='Пусто для билета без даты',
+        null=True,
+        blank=True,
+    )
+
+    seat = models.OneToOneField(
+        'Seat',
+        related_name='ticket',
+        on_delete=models.PROTECT,
+        verbose_name='Место',
+        help_text='Пусто для билета, проданного до появления мест',
+        null=True,
+        blank=True,
+    )
+
     def __str__(self):
         return str(self.flight) + \
             " - " + \
@@ -222,3 +514,58 @@ class Ticket(models.Model):
         verbose_name_plural = 'Билеты'
         ordering = ['flight']
         get_latest_by = 'registration_time'
+        indexes = [
+            # Tickets of flight in order of sale
+            models.Index(
+                fields=['flight', 'registration_time'],
+                name='ticket_flight_time_idx',
+            ),
+
+            # Latest ticket and sales for dates
+            models.Index(
+                fields=['registration_time'],
+                name='ticket_registration_time_idx',
+            ),
+        ]
+
+
+class CollectionVersion(models.Model):
+    name = models.CharField(
+        'Коллекция',
+        max_length=50,
+        primary_key=True,
+    )
+
+    version = models.PositiveBigIntegerField(
+        'Версия',
+        default=0,
+    )
+
+    updated_at = models.DateTimeField(
+        'Время изменения',
+    )
+
+    def __str__(self):
+        return f'{self.name} - {self.version}'
+
+    class Meta:
+        verbose_name = 'Версия коллекции'
+        verbose_name_plural = 'Версии коллекций'
+
+
+def bump_collection_versions(*names):
+    """Increase stored versions of collections after their objects changed
+
+    Versions are read for ETag of lists instead of aggregating all their
+    objects.
+    """
+
+    now = timezone.now()
+
+    CollectionVersion.objects.bulk_create(
+        [CollectionVersion(name=name, updated_at=now) for name in names],
+        ignore_conflicts=True,
+    )
+    CollectionVersion.objects.filter(name__in=names).update(
+        version=models.F('version') + 1, updated_at=now
+    )
@@ -0,0 +1,54 @@
+"""Paginator of admin changelists for large tables"""
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+# Tables with less rows are counted exactly
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+def get_estimated_count(queryset):
+    """Amount of rows of the table from statistics of PostgreSQL
+
+    Return None if database has no statistics of the table.
+    """
+
+    connection = connections[queryset.db]
+
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            [connection.ops.quote_name(queryset.model._meta.db_table)]
+        )
+        row = cursor.fetchone()
+
+    # Table which was never analyzed has -1 or 0 tuples
+    if row is None or row[0] <= 0:
+        return None
+
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator counting large unfiltered table by statistics
+
+    COUNT(*) reads the whole table, so changelist without filters and
+    search uses estimated amount of rows. Filtered changelist is counted
+    exactly.
+    """
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            estimated_count = get_estimated_count(self.object_list)
+
+            if estimated_count is not None and \
+                    estimated_count >= ESTIMATED_COUNT_THRESHOLD:
+                return estimated_count
+
+        return super().count
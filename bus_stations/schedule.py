@@ -0,0 +1,77 @@
+"""Parsing of route schedule from text fields of Route"""
+
+import re
+from datetime import time
+
+
+# Weekday numbers are the same as in date.weekday()
+WEEKDAYS_CODES = ('Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс')
+
+EVERY_DAY_CODE = 'Еж'
+
+DEPARTURE_TIME_PATTERN = re.compile(r'(\d{1,2})[:.](\d{2})')
+
+
+def parse_regularity(regularity):
+    """Weekday numbers from 2 letters codes separated by semicolon"""
+
+    codes = [
+        code.strip().capitalize()
+        for code in regularity.split(';')
+    ]
+
+    if EVERY_DAY_CODE in codes:
+        return list(range(len(WEEKDAYS_CODES)))
+
+    return sorted({
+        WEEKDAYS_CODES.index(code)
+        for code in codes if code in WEEKDAYS_CODES
+    })
+
+
+def parse_departure_time(departure_time):
+    """Sorted departure times found in text like '10:00; 22:00'"""
+
+    return sorted({
+        time(int(hours), int(minutes))
+        for hours, minutes in DEPARTURE_TIME_PATTERN.findall(departure_time)
+        if int(hours) < 24 and int(minutes) < 60
+    })
+
+
+def format_departure_time(departure_times, max_length):
+    """Text like '10:00; 22:00' of the times fitting in max_length
+
+    Times which don't fit are replaced by '…'.
+    """
+
+    texts = [
+        departure_time.strftime('%H:%M')
+        for departure_time in sorted(departure_times)
+    ]
+    text = '; '.join(texts)
+
+    # Every time takes 7 characters with separator
+    if len(text) > max_length:
+        text = '; '.join(texts[:(max_length - 1) // 7] + ['…'])
+
+    return text
+
+
+def get_route_departures(regularity, departure_time,
+                         flights_departure_times=()):
+    """Pairs of weekday number and departure time of the route
+
+    Times are taken from text of the route and from it's flights.
+    """
+
+    departure_times = sorted(
+        set(parse_departure_time(departure_time)) |
+        set(flights_departure_times)
+    )
+
+    return [
+        (weekday, route_departure_time)
+        for weekday in parse_regularity(regularity)
+        for route_departure_time in departure_times
+    ]
@@ -0,0 +1,469 @@
+"""Seat inventory services for selling and returning tickets
+
+Sale takes free seats skipping seats locked by other sales. Free places
+of flights and daily flights are counted from their free seats after
+sale is committed, so parallel sales don't wait for one counter row.
+"""
+
+from datetime import timedelta
+from itertools import zip_longest
+
+from django.db import connection, transaction
+from django.db.models import (
+    F, Case, Count, Exists, IntegerField, OuterRef, Subquery, When
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Flight, DailyFlight, RouteDeparture, Seat, Ticket
+
+
+DAILY_FLIGHTS_BATCH_SIZE = 1000
+
+
+class FlightSoldOutError(Exception):
+    """Flight has no free places"""
+
+
+class SeatTakenError(FlightSoldOutError):
+    """Chosen seat of the flight is taken or doesn't exist"""
+
+
+class NoDepartureError(Exception):
+    """Flight doesn't depart on the date"""
+
+
+def get_seat_inventory(flight_id, departure_date=None):
+    """Queryset with row keeping free places of the flight
+
+    Flight without date keeps free places itself, flight on date keeps
+    them in DailyFlight.
+    """
+
+    if departure_date is None:
+        return Flight.objects.filter(pk=flight_id)
+
+    return DailyFlight.objects.filter(
+        flight_id=flight_id, departure_date=departure_date
+    )
+
+
+def update_free_places(seat_inventory, amount_of_free_places):
+    """Set free places of seat inventory rows, return amount of rows"""
+
+    fields = {'amount_of_free_places': amount_of_free_places}
+
+    # Free places of Flight are a part of it's schedule
+    if seat_inventory.model is Flight:
+        fields['updated_at'] = timezone.now()
+
+    return seat_inventory.update(**fields)
+
+
+def check_departure(flight_id, departure_date=None):
+    """Raise NoDepartureError if the flight doesn't depart on the date
+
+    Flight having daily flights departs only on their dates, seats of it
+    without date aren't sold.
+    """
+
+    daily_flights = DailyFlight.objects.filter(flight_id=flight_id)
+
+    if departure_date is None:
+        if daily_flights.exists():
+            raise NoDepartureError('Рейс продаётся по датам, укажите дату')
+    elif not daily_flights.filter(departure_date=departure_date).exists():
+        raise NoDepartureError(
+            f'Рейс не отправляется {departure_date:%d.%m.%Y}'
+        )
+
+
+def refresh_free_places(flight_id, departure_date=None):
+    """Set free places of the flight to amount of it's free seats
+
+    Seat inventory row is locked by UPDATE before seats are counted, so
+    refresh after later sale waits for this one and counts it's seat too.
+    """
+
+    seat_inventory = get_seat_inventory(flight_id, departure_date)
+
+    with transaction.atomic():
+        if not seat_inventory.update(
+                amount_of_free_places=F('amount_of_free_places')):
+            return
+
+        update_free_places(
+            seat_inventory,
+            Seat.objects.filter(
+                flight_id=flight_id, departure_date=departure_date,
+                is_taken=False
+            ).count()
+        )
+
+
+def refresh_free_places_on_commit(flight_id, departure_date=None):
+    """Count free places of the flight after current transaction"""
+
+    transaction.on_commit(
+        lambda: refresh_free_places(flight_id, departure_date)
+    )
+
+
+def get_free_places(departure_date):
+    """Expression with free places of flight on the date
+
+    Flights having daily flights are sold by dates, so they have no free
+    places without daily flight on the date. Other flights keep free
+    places themselves.
+    """
+
+    daily_flights = DailyFlight.objects.filter(flight=OuterRef('pk'))
+
+    return Case(
+        When(
+            Exists(daily_flights),
+            then=Subquery(
+                daily_flights.filter(
+                    departure_date=departure_date
+                ).values('amount_of_free_places')[:1]
+            ),
+        ),
+        default=F('amount_of_free_places'),
+        output_field=IntegerField(),
+    )
+
+
+def create_seats(flight_id, departure_date=None):
+    """Create seats of the flight by places of it's bus if there are none
+
+    Tickets sold before seats get the first seats. Return True if seats
+    were created.
+    """
+
+    seats = Seat.objects.filter(
+        flight_id=flight_id, departure_date=departure_date
+    )
+
+    if seats.exists():
+        return False
+
+    amount_of_places = Flight.objects.filter(pk=flight_id).values_list(
+        'bus__amount_of_places', flat=True
+    ).get()
+
+    Seat.objects.bulk_create(
+        (
+            Seat(
+                flight_id=flight_id, departure_date=departure_date,
+                number=number
+            )
+            for number in range(1, amount_of_places + 1)
+        ),
+        ignore_conflicts=True,
+    )
+
+    tickets = list(Ticket.objects.filter(
+        flight_id=flight_id, departure_date=departure_date, seat=None
+    ).order_by('pk'))
+
+    for ticket, seat_id in zip(
+            tickets, seats.order_by('number').values_list('pk', flat=True)):
+        ticket.seat_id = seat_id
+
+    tickets = [ticket for ticket in tickets if ticket.seat_id is not None]
+    Ticket.objects.bulk_update(tickets, ['seat'])
+    Seat.objects.filter(
+        pk__in=[ticket.seat_id for ticket in tickets]
+    ).update(is_taken=True)
+
+    return True
+
+
+def create_daily_flights_seats(daily_flights):
+    """Create seats of daily flights without seats by one INSERT
+
+    Return amount of created seats.
+    """
+
+    seats = [
+        Seat(flight_id=flight_id, departure_date=departure_date,
+             number=number)
+        for flight_id, departure_date, amount_of_places in
+        daily_flights.exclude(
+            Exists(Seat.objects.filter(
+                flight=OuterRef('flight'),
+                departure_date=OuterRef('departure_date'),
+            ))
+        ).values_list(
+            'flight_id', 'departure_date', 'flight__bus__amount_of_places'
+        ).iterator()
+        for number in range(1, amount_of_places + 1)
+    ]
+
+    Seat.objects.bulk_create(
+        seats, batch_size=DAILY_FLIGHTS_BATCH_SIZE, ignore_conflicts=True
+    )
+
+    return len(seats)
+
+
+def take_seats(flight_id, amount=1, departure_date=None, seat_number=None):
+    """Lock free seats of the flight with the lowest numbers and take them
+
+    Seats locked by other sales are skipped, so sale never waits for
+    another one choosing seats. Return less seats than amount if flight
+    hasn't got enough free seats. Must be called inside a transaction.
+    """
+
+    free_seats = Seat.objects.select_for_update(
+        skip_locked=True
+    ).filter(
+        flight_id=flight_id, departure_date=departure_date, is_taken=False
+    ).order_by('number')
+
+    if seat_number is not None:
+        free_seats = free_seats.filter(number=seat_number)
+
+    seats = list(free_seats[:amount])
+
+    # Seats are created by the first sale of flight on date
+    if len(seats) < amount and create_seats(flight_id, departure_date):
+        seats = list(free_seats[:amount])
+
+    Seat.objects.filter(pk__in=[seat.pk for seat in seats]).update(
+        is_taken=True
+    )
+    for seat in seats:
+        seat.is_taken = True
+
+    return seats
+
+
+def get_seat_map(flight_id, departure_date=None):
+    """Numbers of seats of the flight with ids of their tickets or None
+
+    Map is only read. Flight without seats shows seats which it's first
+    sale creates, tickets sold before seats take the first of them.
+    """
+
+    seats = list(Seat.objects.filter(
+        flight_id=flight_id, departure_date=departure_date
+    ).order_by('number').values_list('number', 'ticket'))
+
+    if seats:
+        return seats
+
+    amount_of_places = Flight.objects.filter(pk=flight_id).values_list(
+        'bus__amount_of_places', flat=True
+    ).get()
+    tickets_ids = Ticket.objects.filter(
+        flight_id=flight_id, departure_date=departure_date, seat=None
+    ).order_by('pk').values_list('pk', flat=True)[:amount_of_places]
+
+    return list(zip_longest(range(1, amount_of_places + 1), tickets_ids))
+
+
+def sell_ticket(flight_id, user, seller, departure_date=None,
+                seat_number=None):
+    """Take free place of the flight and create ticket for it
+
+    Ticket gets the seat with the number or the first free seat.
+    """
+
+    with transaction.atomic():
+        check_departure(flight_id, departure_date)
+        seats = take_seats(flight_id, 1, departure_date, seat_number)
+
+        if seat_number is not None and not seats:
+            raise SeatTakenError(
+                f'Место №{seat_number} занято или его нет в автобусе'
+            )
+
+        if not seats:
+            raise FlightSoldOutError(
+                'На этот рейс нет свободных мест'
+            )
+
+        ticket = Ticket.objects.create(
+            flight_id=flight_id, user=user, seller=seller,
+            departure_date=departure_date, seat=seats[0]
+        )
+        refresh_free_places_on_commit(flight_id, departure_date)
+
+    return ticket
+
+
+def sell_tickets(flight, users, seller, departure_date=None):
+    """Take free places of the flight for group of users
+
+    Tickets are created by one INSERT and returned in order of users,
+    users get free seats in order of their numbers.
+    """
+
+    with transaction.atomic():
+        check_departure(flight.pk, departure_date)
+        seats = take_seats(flight.pk, len(users), departure_date)
+
+        if len(seats) < len(users):
+            raise FlightSoldOutError(
+                'На этот рейс недостаточно свободных мест'
+            )
+
+        tickets = Ticket.objects.bulk_create(
+            Ticket(
+                flight=flight, user=user, seller=seller,
+                departure_date=departure_date, seat=seat
+            )
+            for user, seat in zip(users, seats)
+        )
+
+        # Database which doesn't return primary keys of inserted rows
+        # gets them by one query of unique seats
+        if not connection.features.can_return_rows_from_bulk_insert:
+            tickets_ids = dict(Ticket.objects.filter(
+                seat__in=seats
+            ).values_list('seat_id', 'pk'))
+
+            for ticket in tickets:
+                ticket.pk = tickets_ids[ticket.seat_id]
+
+        refresh_free_places_on_commit(flight.pk, departure_date)
+
+    return tickets
+
+
+def delete_ticket(ticket):
+    """Delete ticket and return it's seat to the flight
+
+    Return True if the ticket was deleted by this call.
+    """
+
+    with transaction.atomic():
+        if not Ticket.objects.filter(pk=ticket.pk).delete()[0]:
+            return False
+
+        # Free places are counted by seats, which flight sold before
+        # them hasn't got yet
+        if ticket.seat_id is None:
+            create_seats(ticket.flight_id, ticket.departure_date)
+
+        refresh_free_places_on_commit(
+            ticket.flight_id, ticket.departure_date
+        )
+
+    return True
+
+
+def get_sold_tickets_amount(**filters):
+    """Subquery with amount of tickets matching the filters"""
+
+    return Coalesce(
+        Subquery(
+            Ticket.objects.filter(**filters).order_by().values(
+                'flight'
+            ).annotate(amount=Count('pk')).values('amount')
+        ),
+        0
+    )
+
+
+def recount_free_places():
+    """Set free places to places of bus without sold tickets
+
+    Fixes counters of flights and daily flights which drifted from their
+    tickets. Counter changed by a sale during recount is kept. Return
+    amount of fixed rows.
+    """
+
+    flights = Flight.objects.annotate(
+        sold_amount=get_sold_tickets_amount(
+            flight=OuterRef('pk'), departure_date=None
+        )
+    ).values_list(
+        'pk', 'bus__amount_of_places', 'amount_of_free_places',
+        'sold_amount'
+    )
+    daily_flights = DailyFlight.objects.annotate(
+        sold_amount=get_sold_tickets_amount(
+            flight=OuterRef('flight'),
+            departure_date=OuterRef('departure_date')
+        )
+    ).values_list(
+        'flight', 'departure_date', 'flight__bus__amount_of_places',
+        'amount_of_free_places', 'sold_amount'
+    )
+
+    counters = [
+        (flight_id, None, *amounts) for flight_id, *amounts in flights
+    ] + list(daily_flights)
+    fixed_amount = 0
+
+    for flight_id, departure_date, amount_of_places, \
+            amount_of_free_places, sold_amount in counters:
+        actual_amount = max(amount_of_places - sold_amount, 0)
+
+        if actual_amount != amount_of_free_places:
+            fixed_amount += update_free_places(
+                get_seat_inventory(flight_id, departure_date).filter(
+                    amount_of_free_places=amount_of_free_places
+                ),
+                actual_amount
+            )
+
+    return fixed_amount
+
+
+def generate_daily_flights(start_date, days_amount):
+    """Create missing daily flights for days from start_date
+
+    Flight departs on the weekdays of it's route schedule. Existing daily
+    flights are kept with their free places, new ones get their seats.
+    Return amount of created daily flights.
+    """
+
+    route_weekdays = {}
+    for route_id, weekday in RouteDeparture.objects.values_list(
+            'route_id', 'weekday').distinct():
+        route_weekdays.setdefault(route_id, set()).add(weekday)
+
+    dates = [start_date + timedelta(days=day) for day in range(days_amount)]
+    daily_flights_amount = DailyFlight.objects.count()
+
+    DailyFlight.objects.bulk_create(
+        (
+            DailyFlight(
+                flight_id=flight_id,
+                departure_date=departure_date,
+                amount_of_free_places=amount_of_places,
+            )
+            for flight_id, route_id, amount_of_places in
+            Flight.objects.values_list(
+                'pk', 'route_id', 'bus__amount_of_places'
+            ).iterator()
+            for departure_date in dates
+            if departure_date.weekday() in route_weekdays.get(route_id, ())
+        ),
+        batch_size=DAILY_FLIGHTS_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+    create_daily_flights_seats(
+        DailyFlight.objects.filter(departure_date__in=dates)
+    )
+
+    return DailyFlight.objects.count() - daily_flights_amount
+
+
+def prune_daily_flights(before_date):
+    """Delete daily flights departed before the date, return amount
+
+    Their free seats are deleted too, seats of sold tickets are kept.
+    """
+
+    Seat.objects.filter(
+        departure_date__lt=before_date, is_taken=False
+    ).delete()
+
+    return DailyFlight.objects.filter(
+        departure_date__lt=before_date
+    ).delete()[0]
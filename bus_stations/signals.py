@@ -0,0 +1,122 @@
+"""Signal handlers of bus_stations models"""
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import (
+    invalidate_bus_stations, invalidate_routes, invalidate_route_flights
+)
+from .models import (
+    BusStation, Route, Flight, DailyFlight, Bus, Seat, Ticket,
+    bump_collection_versions, update_routes_departures
+)
+from .services import create_seats
+
+
+@receiver([post_save, post_delete], sender=BusStation)
+def invalidate_bus_stations_cache(sender, **kwargs):
+    """Delete cached bus stations after bus station is changed"""
+
+    transaction.on_commit(invalidate_bus_stations)
+
+
+@receiver([post_save, post_delete], sender=BusStation)
+def bump_bus_station_collections(sender, **kwargs):
+    """Change version of routes list showing names of bus stations"""
+
+    bump_collection_versions('routes')
+
+
+@receiver([post_save, post_delete], sender=Route)
+@receiver([post_save, post_delete], sender=Flight)
+def bump_timetable_collections(sender, **kwargs):
+    """Change versions of routes and flights lists showing each other"""
+
+    bump_collection_versions('routes', 'flights')
+
+
+@receiver([post_save, post_delete], sender=Route)
+def invalidate_routes_cache(sender, **kwargs):
+    """Make cached routes outdated after route is changed"""
+
+    transaction.on_commit(invalidate_routes)
+
+
+def invalidate_route_flights_on_commit(route_ids):
+    """Make cached flights tables of the routes outdated after commit"""
+
+    transaction.on_commit(lambda: invalidate_route_flights(route_ids))
+
+
+def update_routes_departures_on_commit(route_ids):
+    """Rebuild departures of the routes from their flights after commit
+
+    Route deleted with it's flights isn't rebuilt.
+    """
+
+    transaction.on_commit(lambda: update_routes_departures(route_ids))
+
+
+@receiver(pre_save, sender=Flight)
+def invalidate_previous_route_flights_cache(sender, instance, **kwargs):
+    """Make cached flights and departures of route flight leaves outdated"""
+
+    if instance.pk is not None:
+        route_ids = list(
+            Flight.objects.filter(pk=instance.pk).exclude(
+                route=instance.route_id
+            ).values_list('route_id', flat=True)
+        )
+        invalidate_route_flights_on_commit(route_ids)
+        update_routes_departures_on_commit(route_ids)
+
+
+@receiver([post_save, post_delete], sender=Flight)
+def invalidate_route_flights_cache(sender, instance, **kwargs):
+    """Make cached flights of the route outdated after flight is changed"""
+
+    invalidate_route_flights_on_commit([instance.route_id])
+
+
+@receiver([post_save, post_delete], sender=Flight)
+def update_flight_route_departures(sender, instance, **kwargs):
+    """Add departure time of changed flight to departures of it's route"""
+
+    update_routes_departures_on_commit([instance.route_id])
+
+
+@receiver([post_save, post_delete], sender=Bus)
+def invalidate_bus_flights_cache(sender, instance, **kwargs):
+    """Make cached flights of routes outdated after their bus is changed"""
+
+    invalidate_route_flights_on_commit(list(
+        Flight.objects.filter(bus=instance).values_list(
+            'route_id', flat=True
+        ).distinct()
+    ))
+
+
+@receiver(post_save, sender=Bus)
+def touch_bus_flights(sender, instance, **kwargs):
+    """Mark flights as updated after their bus is changed"""
+
+    Flight.objects.filter(bus=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=DailyFlight)
+def create_daily_flight_seats(sender, instance, created, **kwargs):
+    """Create seats of new daily flight, so seat map only reads them"""
+
+    if created:
+        create_seats(instance.flight_id, instance.departure_date)
+
+
+
+@receiver(post_delete, sender=Ticket)
+def free_ticket_seat(sender, instance, **kwargs):
+    """Return seat of deleted ticket to free seats of it's flight"""
+
+    if instance.seat_id is not None:
+        Seat.objects.filter(pk=instance.seat_id).update(is_taken=False)
@@ -0,0 +1,64 @@
+"""Template tags for bus_stations templates"""
+
+import re
+
+from django import template
+from django.utils.safestring import mark_safe
+
+
+register = template.Library()
+
+FREE_PLACES_PLACEHOLDER = '<!--free_places_{}-->'
+FREE_PLACES_PLACEHOLDER_PATTERN = re.compile(r'<!--free_places_(\d+)-->')
+
+# Free places of flight which doesn't depart on the date
+NO_DEPARTURE_TEXT = 'Нет отправления'
+
+
+@register.simple_tag
+def free_places_placeholder(flight):
+    """Placeholder for free places amount of the flight"""
+
+    return mark_safe(FREE_PLACES_PLACEHOLDER.format(flight.pk))
+
+
+@register.tag
+def fill_free_places(parser, token):
+    """Replace free places placeholders in the block with live amounts
+
+    Flights are annotated with free_places.
+
+    Usage: {% fill_free_places flights %}...{% endfill_free_places %}
+    """
+
+    try:
+        tag_name, flights = token.split_contents()
+    except ValueError:
+        raise template.TemplateSyntaxError(
+            f'{token.contents.split()[0]} tag requires list of flights'
+        )
+
+    nodelist = parser.parse(('endfill_free_places',))
+    parser.delete_first_token()
+
+    return FillFreePlacesNode(nodelist, parser.compile_filter(flights))
+
+
+class FillFreePlacesNode(template.Node):
+    """Node of fill_free_places tag"""
+
+    def __init__(self, nodelist, flights):
+        self.nodelist = nodelist
+        self.flights = flights
+
+    def render(self, context):
+        free_places = {
+            str(flight.pk): NO_DEPARTURE_TEXT if flight.free_places is None
+            else str(flight.free_places)
+            for flight in self.flights.resolve(context)
+        }
+
+        return FREE_PLACES_PLACEHOLDER_PATTERN.sub(
+            lambda match: free_places.get(match.group(1), ''),
+            self.nodelist.render(context)
+        )
@@ -0,0 +1,110 @@
+"""Tests for admin changelists"""
+
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from bus_stations.models import Flight, Ticket
+from bus_stations.pagination import EstimatedCountPaginator
+from bus_stations.tests.test_services import create_test_flight
+
+
+class AdminChangelistTests(TestCase):
+    """Test that changelists cost the same queries for any amount of rows"""
+
+    def setUp(self):
+        self.flight = create_test_flight(amount_of_free_places=10)
+        self.client.force_login(User.objects.create_superuser(
+            'admin', password='admin'
+        ))
+
+    def get_queries_amount(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+
+        self.assertEqual(response.status_code, 200)
+
+        return len(queries)
+
+    def create_tickets(self, amount):
+        Ticket.objects.bulk_create(
+            Ticket(flight=self.flight, user=f'Покупатель №{index}',
+                   seller='Иван')
+            for index in range(amount)
+        )
+
+    def test_changelists_queries_amount(self):
+        """Test that rows of changelists don't make queries"""
+
+        urls = [
+            f'/admin/bus_stations/{model_name}/'
+            for model_name in (
+                'route', 'flight', 'dailyflight', 'driver', 'ticket'
+            )
+        ]
+
+        self.create_tickets(1)
+        queries_amounts = [self.get_queries_amount(url) for url in urls]
+
+        for hour in range(11, 21):
+            Flight.objects.create(
+                route=self.flight.route, departure_time=f'{hour}:00',
+                arrival_time='23:00', bus=self.flight.bus
+            )
+        self.create_tickets(20)
+
+        self.assertEqual(
+            [self.get_queries_amount(url) for url in urls], queries_amounts
+        )
+
+    def test_search_tickets(self):
+        """Test that tickets are found by prefix of user and route"""
+
+        self.create_tickets(3)
+
+        response = self.client.get(
+            '/admin/bus_stations/ticket/', {'q': '"Покупатель №2"'}
+        )
+        self.assertEqual(len(response.context['cl'].result_list), 1)
+
+        response = self.client.get(
+            '/admin/bus_stations/ticket/', {'q': 'Маршрут'}
+        )
+        self.assertEqual(len(response.context['cl'].result_list), 3)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    """Test class for EstimatedCountPaginator"""
+
+    def setUp(self):
+        create_test_flight(amount_of_free_places=10)
+
+    @patch('bus_stations.pagination.get_estimated_count', return_value=50000)
+    def test_large_table_is_estimated(self, get_estimated_count):
+        """Test that unfiltered large table isn't counted"""
+
+        paginator = EstimatedCountPaginator(Flight.objects.all(), 10)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.count, 50000)
+
+    @patch('bus_stations.pagination.get_estimated_count', return_value=50000)
+    def test_filtered_table_is_counted(self, get_estimated_count):
+        """Test that filtered rows are counted exactly"""
+
+        paginator = EstimatedCountPaginator(
+            Flight.objects.filter(amount_of_free_places=10), 10
+        )
+
+        self.assertEqual(paginator.count, 1)
+        get_estimated_count.assert_not_called()
+
+    def test_table_without_statistics_is_counted(self):
+        """Test that table is counted if database has no statistics"""
+
+        paginator = EstimatedCountPaginator(Flight.objects.all(), 10)
+
+        self.assertEqual(paginator.count, 1)
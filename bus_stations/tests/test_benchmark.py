@@ -0,0 +1,191 @@
+"""Tests for benchmark of pages, sales and API lists"""
+
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from bus_stations.benchmark import (
+    BenchmarkError, compare_results, generate_benchmark_data,
+    get_percentile, measure_parallel_sales, measure_serializers,
+    run_benchmark
+)
+from bus_stations.metrics import reset_metrics
+from bus_stations.models import Route, Flight, Seat, Ticket
+from bus_stations.tests.test_services import create_test_flight
+
+
+class BenchmarkTests(TestCase):
+    """Test class for data generator and measurements of benchmark"""
+
+    def setUp(self):
+        self.addCleanup(reset_metrics)
+
+    def test_generated_data(self):
+        """Test amounts of generated routes, flights, seats and tickets"""
+
+        generate_benchmark_data(2, 3, 4, 2, free_places=5)
+
+        self.assertEqual(Route.objects.count(), 6)
+        self.assertEqual(Flight.objects.count(), 24)
+        self.assertEqual(Seat.objects.count(), 24 * 7)
+        self.assertEqual(Ticket.objects.exclude(seat=None).count(), 48)
+        self.assertEqual(
+            set(Flight.objects.values_list(
+                'amount_of_free_places', flat=True
+            )),
+            {5}
+        )
+
+    def test_route_with_many_flights(self):
+        """Test that route can have more flights than fit in it's text"""
+
+        generate_benchmark_data(1, 1, 60, 0, free_places=1)
+
+        self.assertEqual(Flight.objects.count(), 60)
+        self.assertEqual(Route.objects.get().departures.count(), 7 * 60)
+
+    def test_too_many_flights(self):
+        """Test that route can't have two flights at one minute"""
+
+        with self.assertRaises(BenchmarkError):
+            generate_benchmark_data(1, 1, 24 * 60 + 1, 0, free_places=1)
+
+    def test_run_benchmark(self):
+        """Test that every page is measured without errors"""
+
+        generate_benchmark_data(1, 2, 2, 1, free_places=2)
+        results = run_benchmark(
+            requests_amount=3, warmup_amount=1, serializer_flights_amount=10
+        )
+
+        self.assertEqual(results['database'], 'sqlite')
+        self.assertEqual(results['scale']['flights'], 4)
+        self.assertEqual(results['scale']['tickets'], 4)
+        self.assertEqual(set(results['endpoints']), {
+            'index', 'routes', 'flights', 'sell_ticket', 'api_users',
+            'api_bus_stations', 'api_routes', 'api_flights', 'api_buses',
+            'api_drivers', 'api_tickets',
+        })
+
+        for name, result in results['endpoints'].items():
+            self.assertEqual(result['errors'], 0, name)
+            self.assertEqual(result['requests'], 3)
+            self.assertGreater(result['queries'], 0, name)
+            self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+
+        self.assertEqual(Ticket.objects.count(), 4 + 4)
+        self.assertEqual(results['serializers']['flights'], 10)
+        self.assertEqual(results['parallel_sales']['sales'], 0)
+        self.assertGreater(results['serializers']['speedup'], 0)
+
+    def test_get_percentile(self):
+        """Test nearest rank percentiles"""
+
+        values = list(range(1, 101))
+
+        self.assertEqual(get_percentile(values, 50), 50)
+        self.assertEqual(get_percentile(values, 99), 99)
+        self.assertEqual(get_percentile([7], 99), 7)
+
+    def test_compare_results(self):
+        """Test that slower page and page with more queries regressed"""
+
+        old_results = {
+            'endpoints': {
+                'index': {'p50_ms': 10, 'p99_ms': 20, 'queries': 3},
+                'routes': {'p50_ms': 10, 'p99_ms': 20, 'queries': 3},
+            },
+            'parallel_sales': {'sales_per_second': 100},
+        }
+        new_results = {
+            'endpoints': {
+                'index': {'p50_ms': 10.5, 'p99_ms': 30, 'queries': 4},
+                'routes': {'p50_ms': 12, 'p99_ms': 20, 'queries': 3},
+                'flights': {'p50_ms': 5, 'p99_ms': 9, 'queries': 2},
+            },
+            'serializers': {'speedup': 4.5},
+            'parallel_sales': {'sales_per_second': 80},
+        }
+
+        lines, regressions = compare_results(old_results, new_results, 10)
+
+        self.assertEqual(len(lines), 5)
+        self.assertIn('flights: new endpoint', lines)
+        self.assertIn('serializers: speedup None -> 4.5 times', lines)
+        self.assertIn('parallel_sales: 100 -> 80 sales/s', lines)
+        self.assertEqual(regressions, [
+            'Parallel sales fell from 100 to 80 sales/s',
+            'Fast serializer is only 4.5 times faster',
+            'index makes 4 queries instead of 3',
+            'routes p50 latency grew by 20.0%',
+        ])
+
+    def test_measure_serializers(self):
+        """Test that serializers are measured on the same data"""
+
+        result = measure_serializers(100)
+
+        self.assertEqual(result['flights'], 100)
+        self.assertGreater(result['model_ms'], 0)
+        self.assertGreater(result['fast_ms'], 0)
+
+
+class ParallelSalesBenchmarkTests(TransactionTestCase):
+    """Test class for rate of sales from parallel threads"""
+
+    def test_measure_parallel_sales(self):
+        """Test that sales are counted and extra sales are errors"""
+
+        flight = create_test_flight(amount_of_free_places=3)
+        result = measure_parallel_sales([flight.pk], 4, threads_amount=1)
+
+        self.assertEqual(result['sales'], 4)
+        self.assertEqual(result['errors'], 1)
+        self.assertGreater(result['sales_per_second'], 0)
+        self.assertEqual(Ticket.objects.count(), 3)
+
+
+class BenchmarkCommandTests(TestCase):
+    """Test class for settings of benchmark command"""
+
+    @override_settings(DEBUG=True, MIDDLEWARE=[
+        'django.middleware.common.CommonMiddleware',
+        'debug_toolbar.middleware.DebugToolbarMiddleware',
+    ])
+    def test_pages_are_measured_without_debug(self):
+        """Test that pages are measured without DEBUG and debug toolbar"""
+
+        measured_settings = {}
+
+        def run_benchmark(requests_amount, warmup_amount,
+                          serializer_flights_amount, parallel_sales_amount,
+                          threads_amount):
+            measured_settings.update(MIDDLEWARE=settings.MIDDLEWARE)
+
+            return {
+                'endpoints': {},
+                'serializers': {
+                    'flights': 1, 'model_ms': 1, 'fast_ms': 1, 'speedup': 1,
+                },
+                'parallel_sales': {
+                    'threads': 1, 'sales_per_second': 1, 'errors': 0,
+                },
+            }
+
+        command = 'bus_stations.management.commands.benchmark'
+        with mock.patch(f'{command}.setup_test_environment') as setup, \
+                mock.patch(f'{command}.teardown_test_environment'), \
+                mock.patch(f'{command}.setup_databases'), \
+                mock.patch(f'{command}.teardown_databases'), \
+                mock.patch(f'{command}.generate_benchmark_data'), \
+                mock.patch(f'{command}.run_benchmark', run_benchmark):
+            call_command('benchmark', stdout=StringIO())
+
+        setup.assert_called_once_with(debug=False)
+        self.assertEqual(
+            measured_settings['MIDDLEWARE'],
+            ['django.middleware.common.CommonMiddleware']
+        )
@@ -0,0 +1,183 @@
+"""Tests for cache of bus stations and routes"""
+
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, RequestFactory
+
+from bus_stations.cache import get_cache_stats, reset_cache_stats
+from bus_stations.models import Route, Flight
+from bus_stations.services import sell_ticket
+from bus_stations.tests.test_services import create_test_flight
+from bus_stations.views import Index, RoutesListView, FlightListView
+
+
+class BusStationsCacheTests(TestCase):
+    """Test class for cached Index and RoutesListView"""
+
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+
+        self.route = create_test_flight(amount_of_free_places=10).route
+        self.bus_station = self.route.bus_station
+
+        self.request = RequestFactory().get('/index/')
+        self.request.user = User.objects.create_user(
+            'cashier', password='cashier'
+        )
+
+    def get_bus_stations(self):
+        """Bus stations from response of Index"""
+
+        return list(
+            Index.as_view()(self.request).context_data['bus_stations']
+        )
+
+    def get_routes(self):
+        """Routes from response of RoutesListView"""
+
+        return list(RoutesListView.as_view()(
+            self.request, bus_station_id=self.bus_station.pk
+        ).context_data['routes'])
+
+    def test_index_is_cached(self):
+        """Test that Index doesn't query database for cached stations"""
+
+        self.get_bus_stations()
+
+        with self.assertNumQueries(0):
+            bus_stations = self.get_bus_stations()
+
+        self.assertEqual(bus_stations, [self.bus_station])
+        self.assertEqual(get_cache_stats(), {'hits': 1, 'misses': 1})
+
+    def test_cached_read_is_one_request(self):
+        """Test that hit is read by one request to cache"""
+
+        self.get_bus_stations()
+
+        with patch.object(cache, 'get', wraps=cache.get) as cache_get, \
+                patch.object(cache, 'add') as cache_add, \
+                patch.object(cache, 'incr') as cache_incr:
+            self.get_bus_stations()
+
+        cache_get.assert_called_once()
+        cache_add.assert_not_called()
+        cache_incr.assert_not_called()
+
+    def test_routes_are_cached(self):
+        """Test that only next flights are queried for cached routes"""
+
+        self.get_routes()
+
+        with self.assertNumQueries(1):
+            routes = self.get_routes()
+
+        self.assertEqual(routes, [self.route])
+
+    def test_bus_station_change_invalidates_cache(self):
+        """Test that changed bus station is shown on pages"""
+
+        self.get_bus_stations()
+        self.get_routes()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bus_station.name = 'Автовокзал №2'
+            self.bus_station.save()
+
+        self.assertEqual(self.get_bus_stations()[0].name, 'Автовокзал №2')
+        self.assertEqual(
+            self.get_routes()[0].bus_station.name, 'Автовокзал №2'
+        )
+
+    def test_route_change_invalidates_cache(self):
+        """Test that created and deleted routes are shown on pages"""
+
+        self.get_routes()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            new_route = Route.objects.create(
+                name='Алексин',
+                regularity='Еж',
+                departure_time='12:00',
+                price=100,
+                bus_station=self.bus_station
+            )
+
+        self.assertEqual(self.get_routes(), [new_route, self.route])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            new_route.delete()
+
+        self.assertEqual(self.get_routes(), [self.route])
+
+
+class RouteFlightsTableCacheTests(TestCase):
+    """Test class for cached flights table of FlightListView"""
+
+    def setUp(self):
+        cache.clear()
+
+        self.flight = create_test_flight(amount_of_free_places=10)
+
+        self.request = RequestFactory().get('/index/')
+        self.request.user = User.objects.create_user(
+            'cashier', password='cashier', is_staff=True
+        )
+
+    def get_page(self):
+        """Rendered content of FlightListView"""
+
+        response = FlightListView.as_view()(
+            self.request, route_id=self.flight.route_id
+        )
+
+        return response.render().content.decode()
+
+    def test_free_places_are_live(self):
+        """Test that sold tickets are shown in cached table"""
+
+        self.assertIn('<td>10</td>', self.get_page())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            sell_ticket(self.flight.pk, 'Евгений', 'Иван')
+
+        self.assertIn('<td>9</td>', self.get_page())
+
+    def test_table_is_cached(self):
+        """Test that table isn't rendered again until flight is saved"""
+
+        self.get_page()
+        Flight.objects.filter(pk=self.flight.pk).update(
+            arrival_time='13:45'
+        )
+
+        self.assertIn('12:00', self.get_page())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Flight.objects.get(pk=self.flight.pk).save()
+
+        self.assertIn('13:45', self.get_page())
+
+    def test_table_of_moved_flight_is_outdated(self):
+        """Test that flight moved to other route leaves first table"""
+
+        flight_tickets_url = f'/index/flight/{self.flight.pk}/tickets/'
+        new_route = Route.objects.create(
+            name='Алексин',
+            regularity='Еж',
+            departure_time='10:00',
+            price=100,
+            bus_station=self.flight.route.bus_station
+        )
+
+        self.assertIn(flight_tickets_url, self.get_page())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            moved_flight = Flight.objects.get(pk=self.flight.pk)
+            moved_flight.route = new_route
+            moved_flight.save()
+
+        self.assertNotIn(flight_tickets_url, self.get_page())
@@ -0,0 +1,166 @@
+"""Tests for rendering of cheques"""
+
+import os
+from tempfile import TemporaryDirectory
+from threading import Event
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from bus_stations.cheques import (
+    CHEQUE_FORMATS, ESCPOS_CUT, ESCPOS_INITIALIZE, CHEQUE_WIDTH,
+    get_cheque_lines, get_cheque_name, get_cheque_storage, render_cheque,
+    save_rendered_cheque
+)
+from bus_stations.services import sell_ticket
+from bus_stations.tests.test_services import create_test_flight
+
+
+class ChequeTests(TestCase):
+    """Test class for rendering and saving of cheques"""
+
+    def setUp(self):
+        cheques_root = TemporaryDirectory()
+        self.addCleanup(cheques_root.cleanup)
+
+        settings_override = override_settings(
+            CHEQUES_ROOT=cheques_root.name, CHEQUE_RENDER_TIMEOUT=5
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        flight = create_test_flight(amount_of_free_places=10)
+        self.ticket = sell_ticket(flight.pk, 'Евгений', 'Иван')
+        self.ticket.refresh_from_db()
+        self.url = f'/index/cheque_for_ticket/{self.ticket.pk}/'
+
+        self.client.force_login(
+            User.objects.create_user(
+                'cashier', password='cashier', is_staff=True
+            )
+        )
+
+    def patch_render_function(self, cheque_format, render_function):
+        """Replace render function of the format by mock calling it"""
+
+        render_mock = patch.dict(CHEQUE_FORMATS, {
+            cheque_format: (
+                render_function,
+                *CHEQUE_FORMATS[cheque_format][1:]
+            )
+        })
+        render_mock.start()
+        self.addCleanup(render_mock.stop)
+
+    def test_cheque_lines(self):
+        """Test that cheque lines fit into thermal printer paper"""
+
+        lines = get_cheque_lines(self.ticket)
+
+        self.assertIn('Покупатель: Евгений', lines)
+        self.assertTrue(all(len(line) <= CHEQUE_WIDTH for line in lines))
+
+    def test_escpos_cheque(self):
+        """Test that ESC/POS cheque is encoded for cyrillic code page"""
+
+        response = self.client.get(self.url + 'escpos/')
+        content = b''.join(response.streaming_content)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(content.startswith(ESCPOS_INITIALIZE))
+        self.assertTrue(content.endswith(ESCPOS_CUT))
+        self.assertIn('Евгений'.encode('cp866'), content)
+
+    def test_pdf_cheque(self):
+        """Test that PDF cheque is rendered"""
+
+        response = self.client.get(self.url + 'pdf/')
+
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(
+            b''.join(response.streaming_content).startswith(b'%PDF')
+        )
+
+    def test_reprint_reads_saved_cheque(self):
+        """Test that cheque is rendered only once"""
+
+        render_calls = []
+
+        def render_escpos(lines):
+            render_calls.append(lines)
+            return b'cheque'
+
+        self.patch_render_function('escpos', render_escpos)
+
+        for reprint in range(3):
+            response = self.client.get(self.url + 'escpos/')
+            self.assertEqual(b''.join(response.streaming_content), b'cheque')
+
+        self.assertEqual(len(render_calls), 1)
+
+    def test_slow_rendering(self):
+        """Test that slow rendering is answered with 202 and finishes"""
+
+        rendering_allowed = Event()
+
+        def render_escpos(lines):
+            rendering_allowed.wait(5)
+            return b'cheque'
+
+        self.patch_render_function('escpos', render_escpos)
+
+        with override_settings(CHEQUE_RENDER_TIMEOUT=0.01):
+            response = self.client.get(self.url + 'escpos/')
+
+        self.assertEqual(response.status_code, 202)
+
+        rendering_allowed.set()
+        render_cheque(
+            'escpos', get_cheque_lines(self.ticket)
+        ).result(timeout=5)
+
+        response = self.client.get(self.url + 'escpos/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_same_content_has_same_name(self):
+        """Test that name of cheque depends only on it's content"""
+
+        lines = get_cheque_lines(self.ticket)
+
+        self.assertEqual(
+            get_cheque_name('pdf', lines), get_cheque_name('pdf', lines[:])
+        )
+        self.assertNotEqual(
+            get_cheque_name('pdf', lines), get_cheque_name('escpos', lines)
+        )
+        self.assertNotEqual(
+            get_cheque_name('pdf', lines),
+            get_cheque_name('pdf', lines + ['Скидка'])
+        )
+
+    def test_saved_cheque_is_replaced_whole(self):
+        """Test that saving of the same cheque leaves one whole file"""
+
+        storage = get_cheque_storage()
+        lines = get_cheque_lines(self.ticket)
+        name = get_cheque_name('escpos', lines)
+
+        self.patch_render_function('escpos', lambda lines: b'cheque')
+
+        for saving in range(2):
+            save_rendered_cheque(storage, name, 'escpos', lines)
+
+        self.assertEqual(
+            os.listdir(os.path.dirname(storage.path(name))),
+            [os.path.basename(name)]
+        )
+        with storage.open(name) as file:
+            self.assertEqual(file.read(), b'cheque')
+
+    def test_unknown_format(self):
+        """Test that cheque in unknown format isn't found"""
+
+        response = self.client.get(self.url + 'docx/')
+
+        self.assertEqual(response.status_code, 404)
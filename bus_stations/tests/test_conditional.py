@@ -0,0 +1,179 @@
+"""Tests for conditional GET of flights and routes lists"""
+
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils.timezone import localdate
+
+from api.views import FastListMixin
+from bus_stations.models import Flight, Ticket
+from bus_stations.services import (
+    sell_ticket, delete_ticket, generate_daily_flights
+)
+from bus_stations.tests.test_services import create_test_flight
+from bus_stations.tests.test_timetable import get_timetable_rows
+from bus_stations.timetable import import_timetable
+from bus_stations.views import FlightListView
+
+
+class FlightListConditionalTests(TestCase):
+    """Test class for ETag of the flights page of route"""
+
+    def setUp(self):
+        self.flight = create_test_flight(amount_of_free_places=10)
+        self.url = f'/index/{self.flight.route.pk}/flights/'
+
+        self.client.force_login(
+            User.objects.create_user(
+                'cashier', password='cashier', is_staff=True
+            )
+        )
+
+    def get_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+        return response['ETag']
+
+    def test_not_modified(self):
+        """Test that unchanged page is answered with 304 without rendering"""
+
+        etag = self.get_etag()
+
+        with patch.object(FlightListView, 'get_queryset') as get_queryset:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        get_queryset.assert_not_called()
+
+    def test_etag_changes(self):
+        """Test that ticket sale and changes of flights change ETag"""
+
+        etags = [self.get_etag()]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket = sell_ticket(self.flight.pk, 'Евгений', 'Иван')
+        etags.append(self.get_etag())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_ticket(ticket)
+        etags.append(self.get_etag())
+
+        Flight.objects.get(pk=self.flight.pk).save()
+        etags.append(self.get_etag())
+
+        self.flight.delete()
+        etags.append(self.get_etag())
+
+        self.assertEqual(len(set(etags)), len(etags))
+
+    def test_etag_changes_after_sale_for_today(self):
+        """Test that tickets for today change free places and ETag"""
+
+        generate_daily_flights(localdate(), 1)
+        etags = [self.get_etag()]
+
+        ticket = sell_ticket(self.flight.pk, 'Евгений', 'Иван', localdate())
+        etags.append(self.get_etag())
+
+        delete_ticket(ticket)
+        etags.append(self.get_etag())
+
+        self.assertNotEqual(etags[0], etags[1])
+        self.assertNotEqual(etags[1], etags[2])
+
+    def test_etag_changes_after_free_places_for_today(self):
+        """Test that free places counted after sale commit change ETag"""
+
+        generate_daily_flights(localdate(), 1)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            sell_ticket(self.flight.pk, 'Евгений', 'Иван', localdate())
+        etag = self.get_etag()
+
+        for callback in callbacks:
+            callback()
+
+        self.assertNotEqual(self.get_etag(), etag)
+
+    def test_etag_depends_on_user(self):
+        """Test that other user doesn't get 304 for the same page"""
+
+        etag = self.get_etag()
+
+        self.client.force_login(
+            User.objects.create_superuser('admin', password='admin')
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+
+
+class ApiListConditionalTests(TestCase):
+    """Test class for ETag of API lists of flights and routes"""
+
+    def setUp(self):
+        self.flight = create_test_flight(amount_of_free_places=10)
+
+        self.client.force_login(
+            User.objects.create_superuser('admin', password='admin')
+        )
+
+    def test_not_modified(self):
+        """Test that unchanged lists are answered with 304"""
+
+        for url in ('/api/flights/', '/api/routes/'):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+
+                with patch.object(FastListMixin, 'list') as fast_list:
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+                self.assertEqual(response.status_code, 304)
+                fast_list.assert_not_called()
+
+    def test_etag_changes_after_sale(self):
+        """Test that sold ticket changes free places and ETag of flights"""
+
+        etag = self.client.get('/api/flights/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            sell_ticket(self.flight.pk, 'Евгений', 'Иван')
+
+        response = self.client.get(
+            '/api/flights/', HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertEqual(
+            response.json()['results'][0]['amount_of_free_places'], 9
+        )
+
+    def test_etag_changes_after_timetable_changes(self):
+        """Test that stored versions of lists change with timetable"""
+
+        etags = {
+            url: [self.client.get(url)['ETag']]
+            for url in ('/api/flights/', '/api/routes/')
+        }
+
+        route = self.flight.route
+        route.name = 'Маршрут №2'
+        route.save()
+        for url in etags:
+            etags[url].append(self.client.get(url)['ETag'])
+
+        import_timetable(
+            get_timetable_rows(route.bus_station, self.flight.bus, 1, 1)
+        )
+        for url in etags:
+            etags[url].append(self.client.get(url)['ETag'])
+
+        Flight.objects.filter(route=route).delete()
+        for url in etags:
+            etags[url].append(self.client.get(url)['ETag'])
+
+        for url, url_etags in etags.items():
+            self.assertEqual(len(set(url_etags)), len(url_etags), url)
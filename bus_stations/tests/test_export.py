@@ -0,0 +1,186 @@
+"""Tests for streaming export of tickets"""
+
+import csv
+import json
+import tracemalloc
+from datetime import time, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from bus_stations import export
+from bus_stations.export import EXPORT_HEADER
+from bus_stations.models import Route, Flight, Ticket
+from bus_stations.tests.test_services import create_test_flight
+
+
+def create_tickets(flight, amount):
+    """Create tickets of the flight by one query"""
+
+    Ticket.objects.bulk_create(
+        Ticket(flight=flight, user=f'Покупатель {index}', seller='Иван')
+        for index in range(amount)
+    )
+
+
+def create_other_flight(flight):
+    """Create flight of new route of the same bus station"""
+
+    route = Route.objects.create(
+        name='Маршрут №2',
+        regularity='Еж',
+        departure_time='12:00',
+        price=300,
+        bus_station=flight.route.bus_station
+    )
+
+    return Flight.objects.create(
+        route=route,
+        departure_time=time(12),
+        arrival_time=time(14),
+        bus=flight.bus
+    )
+
+
+def get_export_peak_memory():
+    """Peak of memory allocated while exporting tickets to CSV"""
+
+    tracemalloc.start()
+
+    for line in export.iter_csv_lines(export.get_tickets_for_export()):
+        pass
+
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return peak_memory
+
+
+class TicketExportViewTests(TestCase):
+    """Test class for TicketExportView"""
+
+    def setUp(self):
+        self.flight = create_test_flight(amount_of_free_places=10)
+        create_tickets(self.flight, 3)
+
+        self.client.force_login(
+            User.objects.create_user(
+                'cashier', password='cashier', is_staff=True
+            )
+        )
+
+    def test_csv_export(self):
+        """Test that CSV has header and line for every ticket"""
+
+        response = self.client.get('/index/tickets/export/')
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+
+        rows = list(csv.reader(StringIO(
+            b''.join(response.streaming_content).decode()
+        )))
+
+        self.assertEqual(tuple(rows[0]), EXPORT_HEADER)
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(
+            rows[1][EXPORT_HEADER.index('user')], 'Покупатель 0'
+        )
+
+    def test_ndjson_export_with_filters(self):
+        """Test that NDJSON has only tickets matching filters"""
+
+        other_flight = create_other_flight(self.flight)
+        create_tickets(other_flight, 2)
+        today = timezone.localdate()
+
+        response = self.client.get('/index/tickets/export/', {
+            'format': 'ndjson',
+            'route': other_flight.route_id,
+            'date_from': today - timedelta(days=1),
+            'date_to': today,
+        })
+
+        tickets = [
+            json.loads(line) for line in
+            b''.join(response.streaming_content).decode().splitlines()
+        ]
+
+        self.assertEqual(len(tickets), 2)
+        self.assertEqual(
+            {ticket['flight_id'] for ticket in tickets}, {other_flight.pk}
+        )
+
+    def test_dates_are_local_days(self):
+        """Test that day boundaries of filters are in current time zone"""
+
+        today = timezone.localdate()
+        Ticket.objects.update(
+            registration_time=export.start_of_day(today) -
+            timedelta(microseconds=1)
+        )
+
+        self.assertEqual(
+            len(list(export.get_tickets_for_export(date_from=today))), 0
+        )
+        self.assertEqual(
+            len(list(export.get_tickets_for_export(
+                date_from=today - timedelta(days=1),
+                date_to=today - timedelta(days=1)
+            ))),
+            3
+        )
+
+    def test_invalid_filters(self):
+        """Test that wrong filter is answered with 400"""
+
+        response = self.client.get(
+            '/index/tickets/export/', {'date_from': 'вчера'}
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_chunks_follow_primary_key(self):
+        """Test that every ticket is exported once by queries of chunks"""
+
+        create_tickets(self.flight, 3)
+
+        with patch.object(export, 'EXPORT_CHUNK_SIZE', 2), \
+                self.assertNumQueries(4):
+            rows = list(export.get_tickets_for_export())
+
+        self.assertEqual(
+            [row[0] for row in rows],
+            list(Ticket.objects.order_by('pk').values_list('pk', flat=True))
+        )
+
+    def test_memory_is_flat(self):
+        """Test that memory doesn't grow with amount of exported tickets"""
+
+        with patch.object(export, 'EXPORT_CHUNK_SIZE', 100):
+            small_export_memory = get_export_peak_memory()
+
+            create_tickets(self.flight, 5000)
+            large_export_memory = get_export_peak_memory()
+
+        self.assertLess(large_export_memory, small_export_memory * 2)
+
+
+class ExportTicketsCommandTests(TestCase):
+    """Test class for export_tickets command"""
+
+    def test_command_writes_csv(self):
+        """Test that command writes tickets of the flight to stdout"""
+
+        flight = create_test_flight(amount_of_free_places=10)
+        create_tickets(flight, 2)
+        create_tickets(create_other_flight(flight), 1)
+
+        output = StringIO()
+        call_command('export_tickets', '--flight', flight.pk, stdout=output)
+
+        self.assertEqual(len(output.getvalue().splitlines()), 3)
@@ -0,0 +1,82 @@
+"""Tests for labels of routes and flights"""
+
+from datetime import time
+
+from django.test import TestCase
+
+from bus_stations.models import Route, Flight, Ticket
+from bus_stations.tests.test_services import create_test_flight
+from bus_stations.tests.test_timetable import get_timetable_rows
+from bus_stations.timetable import import_timetable
+
+
+class LabelsTests(TestCase):
+    """Test that labels are saved and rebuilt after renaming"""
+
+    def setUp(self):
+        self.flight = create_test_flight(amount_of_free_places=10)
+        self.route = self.flight.route
+        self.bus_station = self.route.bus_station
+
+    def test_labels_are_saved(self):
+        """Test that labels of new route and flight are saved"""
+
+        self.assertEqual(
+            Route.objects.get().label, 'Автовокзал №1 - Маршрут №1'
+        )
+        self.assertEqual(
+            Flight.objects.get().label, 'Автовокзал №1 - Маршрут №1 - 10:00:00'
+        )
+
+    def test_renamed_bus_station(self):
+        """Test that labels of routes and flights of bus station change"""
+
+        self.bus_station.name = 'Автовокзал №2'
+        self.bus_station.save()
+
+        self.assertEqual(
+            str(Route.objects.get()), 'Автовокзал №2 - Маршрут №1'
+        )
+        self.assertEqual(
+            str(Flight.objects.get()), 'Автовокзал №2 - Маршрут №1 - 10:00:00'
+        )
+
+    def test_renamed_route(self):
+        """Test that labels of flights of the route change"""
+
+        self.route.name = 'Маршрут №2'
+        self.route.save()
+
+        self.assertEqual(
+            str(Flight.objects.get()), 'Автовокзал №1 - Маршрут №2 - 10:00:00'
+        )
+
+    def test_tickets_are_shown_by_one_query(self):
+        """Test that list of tickets doesn't load routes and bus stations"""
+
+        for user in ('Евгений', 'Пётр'):
+            Ticket.objects.create(flight=self.flight, user=user, seller='Иван')
+
+        with self.assertNumQueries(1):
+            labels = [
+                str(ticket) for ticket in Ticket.objects.select_related(
+                    'flight'
+                ).order_by('user')
+            ]
+
+        self.assertEqual(labels, [
+            'Автовокзал №1 - Маршрут №1 - 10:00:00 - Евгений',
+            'Автовокзал №1 - Маршрут №1 - 10:00:00 - Пётр',
+        ])
+
+    def test_imported_labels(self):
+        """Test that imported routes and flights get labels"""
+
+        import_timetable(
+            get_timetable_rows(self.bus_station, self.flight.bus, 1, 2)
+        )
+
+        self.assertEqual(
+            Flight.objects.get(departure_time=time(1)).label,
+            'Автовокзал №1 - Город №0 - 01:00:00'
+        )
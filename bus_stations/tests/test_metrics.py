@@ -0,0 +1,159 @@
+"""Tests for performance metrics middleware and budgets"""
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from bus_stations.metrics import (
+    PerformanceBudgetError, escape_label, get_metrics, reset_metrics
+)
+from bus_stations.models import Flight
+from bus_stations.services import sell_ticket
+from bus_stations.tests.test_services import create_test_flight
+
+
+@override_settings(PERFORMANCE_BUDGETS_RAISE=True)
+class PerformanceBudgetsTests(TestCase):
+    """Test that views stay in their budgets of queries"""
+
+    def setUp(self):
+        reset_metrics()
+        self.addCleanup(reset_metrics)
+
+        self.flight = create_test_flight(amount_of_free_places=10)
+        self.client.force_login(User.objects.create_superuser(
+            'admin', password='admin'
+        ))
+
+    def test_views_stay_in_budgets(self):
+        """Test pages with many rows, budget error fails the test"""
+
+        for hour in range(11, 21):
+            Flight.objects.create(
+                route=self.flight.route, departure_time=f'{hour}:00',
+                arrival_time='23:00', bus=self.flight.bus
+            )
+        for user_index in range(5):
+            ticket = sell_ticket(self.flight.pk, f'Покупатель №{user_index}',
+                                 'Иван')
+
+        urls = [
+            '/index/',
+            f'/index/{self.flight.route.bus_station.pk}/routes/',
+            f'/index/{self.flight.route.pk}/flights/',
+            '/index/sell_ticket/',
+            f'/index/flight/{self.flight.pk}/seats/',
+            f'/index/flight/{self.flight.pk}/tickets/',
+            f'/index/cheque_for_ticket/{ticket.pk}/',
+            '/api/bus_stations/',
+            '/api/routes/',
+            '/api/flights/',
+            '/api/tickets/',
+        ]
+
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(PERFORMANCE_BUDGETS={
+        'bus_stations:index': {'queries': 1},
+    })
+    def test_exceeded_budget_raises(self):
+        """Test that view over it's queries budget raises error"""
+
+        with self.assertRaisesMessage(
+                PerformanceBudgetError, 'bus_stations:index made'):
+            self.client.get('/index/')
+
+    @override_settings(
+        PERFORMANCE_BUDGETS={'bus_stations:index': {'queries': 1}},
+        PERFORMANCE_BUDGETS_RAISE=False,
+    )
+    def test_exceeded_budget_is_logged(self):
+        """Test that view over it's budget is logged in production"""
+
+        with self.assertLogs('bus_stations.middleware', 'WARNING') as logs:
+            self.assertEqual(self.client.get('/index/').status_code, 200)
+
+        self.assertIn('bus_stations:index made', logs.output[0])
+        self.assertEqual(
+            get_metrics()['bus_stations:index']['budget_exceeded'], 1
+        )
+
+
+class MetricsTests(TestCase):
+    """Test class for recorded metrics and their endpoint"""
+
+    def setUp(self):
+        reset_metrics()
+        self.addCleanup(reset_metrics)
+
+        create_test_flight(amount_of_free_places=10)
+        self.client.force_login(User.objects.create_user(
+            'user', password='user'
+        ))
+
+    def test_metrics_of_view(self):
+        """Test that queries, database and render time are recorded"""
+
+        self.client.get('/index/')
+        self.client.get('/index/')
+
+        metrics = get_metrics()['bus_stations:index']
+
+        self.assertEqual(metrics['requests'], 2)
+        self.assertGreater(metrics['queries'], 0)
+        self.assertGreater(metrics['db_seconds'], 0)
+        self.assertGreater(metrics['render_seconds'], 0)
+        self.assertGreaterEqual(metrics['seconds'], metrics['render_seconds'])
+        self.assertEqual(metrics['buckets'][-1], 2)
+
+    def test_prometheus_endpoint(self):
+        """Test that metrics are exported in Prometheus text format"""
+
+        self.client.get('/index/')
+        self.client.get('/index/missing/page/')
+
+        with override_settings(METRICS_TOKEN='secret'):
+            response = self.client.get(
+                '/metrics/', HTTP_AUTHORIZATION='Bearer secret'
+            )
+        content = response.content.decode()
+
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn('# TYPE view_latency_seconds histogram', content)
+        self.assertIn(
+            'view_requests_total{view="bus_stations:index"} 1', content
+        )
+        self.assertIn(
+            'view_latency_seconds_bucket{view="bus_stations:index",le="+Inf"}'
+            ' 1', content
+        )
+        self.assertIn('cache_misses_total', content)
+
+    def test_endpoint_needs_staff_or_token(self):
+        """Test that metrics are shown only to staff and with token"""
+
+        with override_settings(METRICS_TOKEN='secret'):
+            for authorization in ('', 'Bearer wrong', 'secret', 'Bearer é'):
+                response = self.client.get(
+                    '/metrics/', HTTP_AUTHORIZATION=authorization
+                )
+                self.assertEqual(response.status_code, 404, authorization)
+
+        self.client.force_login(User.objects.create_user(
+            'admin', password='admin', is_staff=True
+        ))
+
+        self.assertEqual(self.client.get('/metrics/').status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_empty_token_is_not_accepted(self):
+        """Test that empty token doesn't open metrics"""
+
+        response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer ')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_escape_label(self):
+        """Test escaping of quotes and backslashes in labels"""
+
+        self.assertEqual(escape_label('a"b\\c\n'), 'a\\"b\\\\c\\n')
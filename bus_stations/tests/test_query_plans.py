@@ -0,0 +1,88 @@
+"""Tests for indexes used by frequent queries and free places validation"""
+
+from unittest import skipUnless
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+
+from bus_stations.models import DailyFlight, Flight, Route, Ticket
+from bus_stations.tests.test_services import create_test_flight
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Plans are checked for SQLite')
+class QueryPlansTests(TestCase):
+    """Test that EXPLAIN of frequent queries shows their indexes"""
+
+    def setUp(self):
+        self.flight = create_test_flight(amount_of_free_places=10)
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+
+        self.assertRegex(plan, rf'USING (COVERING )?INDEX \w*{index_name}')
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_tickets_of_flight(self):
+        """Test that tickets of flight are found and ordered by index"""
+
+        self.assertUsesIndex(
+            Ticket.objects.filter(flight=self.flight).order_by(
+                'registration_time'
+            ),
+            'ticket_flight_time_idx'
+        )
+
+    def test_latest_ticket(self):
+        """Test that latest ticket is found by index"""
+
+        self.assertUsesIndex(
+            Ticket.objects.order_by('-registration_time')[:1],
+            'ticket_registration_time_idx'
+        )
+
+    def test_flights_of_route(self):
+        """Test that flights of route are ordered by unique index"""
+
+        self.assertUsesIndex(
+            Flight.objects.filter(route=self.flight.route),
+            'flight_route_id_departure_time'
+        )
+
+    def test_routes_by_name(self):
+        """Test that routes searched in admin are found by index of name"""
+
+        self.assertUsesIndex(
+            Route.objects.filter(name=self.flight.route.name), 'route_name'
+        )
+
+
+class FreePlacesValidationTests(TestCase):
+    """Test that free places can't exceed places of the bus"""
+
+    def setUp(self):
+        self.flight = create_test_flight(amount_of_free_places=10)
+
+    def test_flight_free_places(self):
+        """Test validation of free places of Flight"""
+
+        self.flight.amount_of_free_places = \
+            self.flight.bus.amount_of_places + 1
+
+        with self.assertRaises(ValidationError):
+            self.flight.full_clean()
+
+    def test_daily_flight_free_places(self):
+        """Test validation of free places of DailyFlight"""
+
+        daily_flight = DailyFlight(
+            flight=self.flight,
+            departure_date='2021-08-16',
+            amount_of_free_places=self.flight.bus.amount_of_places + 1
+        )
+
+        with self.assertRaises(ValidationError):
+            daily_flight.full_clean()
+
+        daily_flight.amount_of_free_places = 0
+        daily_flight.full_clean()
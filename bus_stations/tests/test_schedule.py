@@ -0,0 +1,155 @@
+"""Tests for route schedule from bus_stations folder"""
+
+from datetime import time
+
+from django.test import TestCase
+
+from bus_stations.models import (
+    BusStation, Route, RouteDeparture, Flight, Bus, Driver
+)
+from bus_stations.schedule import (
+    format_departure_time, parse_regularity, parse_departure_time
+)
+
+
+class ParseScheduleTests(TestCase):
+    """Test class for parsing of Route text fields"""
+
+    def test_parse_regularity(self):
+        """Test that weekdays codes are converted to weekday numbers"""
+
+        self.assertEqual(parse_regularity('Пн;Ср'), [0, 2])
+        self.assertEqual(parse_regularity(' сб ; Пн;Пн'), [0, 5])
+        self.assertEqual(parse_regularity('Еж'), list(range(7)))
+        self.assertEqual(parse_regularity(''), [])
+
+    def test_parse_departure_time(self):
+        """Test that all correct departure times are found in text"""
+
+        self.assertEqual(
+            parse_departure_time('22:00; 10:00, 7.30 и 25:00'),
+            [time(7, 30), time(10), time(22)]
+        )
+        self.assertEqual(parse_departure_time('По запросу'), [])
+
+    def test_format_departure_time(self):
+        """Test that times which don't fit in text are replaced by '…'"""
+
+        times = [time(7, 30), time(22), time(10)]
+
+        self.assertEqual(
+            format_departure_time(times, 20), '07:30; 10:00; 22:00'
+        )
+        self.assertEqual(format_departure_time(times, 15), '07:30; 10:00; …')
+        self.assertEqual(format_departure_time([], 15), '')
+
+
+class RouteDeparturesTests(TestCase):
+    """Test class for RouteDeparture model and schedule queries"""
+
+    def setUp(self):
+        test_bus_station = BusStation.objects.create(
+            name='Автовокзал №1',
+            office_hours='10:00 - 22:00',
+            address='г. Тула, ул. Такая-то, дом №1',
+            phone_number='8-666-666-69-69'
+        )
+
+        self.weekend_route = Route.objects.create(
+            name='Москва',
+            regularity='Сб;Вс',
+            departure_time='08:00; 19:30',
+            price=500,
+            bus_station=test_bus_station
+        )
+
+        self.daily_route = Route.objects.create(
+            name='Алексин',
+            regularity='Еж',
+            departure_time='10:00',
+            price=200,
+            bus_station=test_bus_station
+        )
+
+    def test_departures_created_on_save(self):
+        """Test that departures are created for every weekday and time"""
+
+        self.assertEqual(self.weekend_route.departures.count(), 4)
+        self.assertEqual(self.daily_route.departures.count(), 7)
+
+    def test_departures_updated_on_save(self):
+        """Test that departures follow changed text fields of route"""
+
+        self.weekend_route.regularity = 'Пт'
+        self.weekend_route.save()
+
+        self.assertEqual(
+            list(self.weekend_route.departures.values_list(
+                'weekday', 'departure_time'
+            )),
+            [(4, time(8)), (4, time(19, 30))]
+        )
+        self.assertEqual(RouteDeparture.objects.count(), 9)
+
+    def test_departures_follow_flights(self):
+        """Test that changed flights are found by schedule of route"""
+
+        driver = Driver.objects.create(
+            passport_number='1234 12345678',
+            name='Семён',
+            second_name='Семёнов',
+            middle_name='Семёнович',
+            phone_number=89206666996,
+            age=50
+        )
+        bus = Bus.objects.create(
+            registration_number='Е666КХ', mark='Ford',
+            amount_of_places=30, driver=driver
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            flight = Flight.objects.create(
+                route=self.daily_route, departure_time=time(21),
+                arrival_time=time(23), bus=bus
+            )
+        self.assertEqual(
+            list(Route.objects.by_schedule(0, time(20))),
+            [self.daily_route]
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            flight.route = self.weekend_route
+            flight.save()
+        self.assertEqual(
+            list(Route.objects.by_schedule(0, time(20))), []
+        )
+        self.assertEqual(
+            list(Route.objects.by_schedule(5, time(20, 30))),
+            [self.weekend_route]
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            flight.delete()
+        self.assertFalse(Route.objects.by_schedule(5, time(20, 30)).exists())
+
+        # Route is deleted with it's flights
+        with self.captureOnCommitCallbacks(execute=True):
+            Flight.objects.create(
+                route=self.daily_route, departure_time=time(21),
+                arrival_time=time(23), bus=bus
+            )
+            self.daily_route.delete()
+        self.assertEqual(RouteDeparture.objects.count(), 4)
+
+    def test_routes_by_schedule(self):
+        """Test routes departing on Saturday after 18:00"""
+
+        self.assertEqual(
+            list(Route.objects.by_schedule(5, time(18))),
+            [self.weekend_route]
+        )
+        self.assertEqual(
+            set(Route.objects.by_schedule(5, time(7), time(12))),
+            {self.weekend_route, self.daily_route}
+        )
+        self.assertFalse(Route.objects.by_schedule(0, time(18)).exists())
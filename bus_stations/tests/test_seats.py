@@ -0,0 +1,394 @@
+"""Tests for seats of flights"""
+
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from bus_stations.cheques import get_cheque_lines
+from bus_stations.models import DailyFlight, Flight, Seat, Ticket
+from bus_stations.services import (
+    FlightSoldOutError, NoDepartureError, SeatTakenError, sell_ticket,
+    sell_tickets, delete_ticket, get_seat_map, recount_free_places
+)
+from bus_stations.tests.test_services import create_test_flight
+
+
+PLACES_AMOUNT = 5
+DEPARTURE_DATE = '2021-08-16'
+
+
+class SeatsTests(TestCase):
+    """Test class for seats taken by sale of tickets"""
+
+    def setUp(self):
+        self.flight = create_test_flight(PLACES_AMOUNT)
+
+    def test_tickets_get_seats_in_order(self):
+        """Test that sold tickets get free seats with the lowest numbers"""
+
+        first_ticket = sell_ticket(self.flight.pk, 'Евгений', 'Иван')
+        group_tickets = sell_tickets(self.flight, ['Пётр', 'Семён'], 'Иван')
+
+        self.assertEqual(first_ticket.seat.number, 1)
+        self.assertEqual(
+            [ticket.seat.number for ticket in group_tickets], [2, 3]
+        )
+        self.assertEqual(
+            Seat.objects.filter(flight=self.flight).count(), PLACES_AMOUNT
+        )
+
+    def test_sell_chosen_seat(self):
+        """Test that ticket gets chosen seat and taken seat isn't sold"""
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket = sell_ticket(
+                self.flight.pk, 'Евгений', 'Иван', seat_number=4
+            )
+
+        for seat_number in (4, PLACES_AMOUNT + 1):
+            with self.assertRaises(SeatTakenError):
+                sell_ticket(
+                    self.flight.pk, 'Пётр', 'Иван', seat_number=seat_number
+                )
+
+        self.flight.refresh_from_db()
+
+        self.assertEqual(ticket.seat.number, 4)
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertEqual(self.flight.amount_of_free_places, PLACES_AMOUNT - 1)
+
+    def test_deleted_ticket_frees_seat(self):
+        """Test that seat of deleted ticket is sold again"""
+
+        sell_ticket(self.flight.pk, 'Евгений', 'Иван')
+        delete_ticket(sell_ticket(self.flight.pk, 'Пётр', 'Иван'))
+
+        self.assertEqual(
+            sell_ticket(self.flight.pk, 'Семён', 'Иван').seat.number, 2
+        )
+
+    def test_taken_seats_are_marked(self):
+        """Test that seats of sold tickets are marked as taken"""
+
+        sell_tickets(self.flight, ['Евгений', 'Пётр'], 'Иван')
+        ticket = sell_ticket(self.flight.pk, 'Семён', 'Иван')
+
+        self.assertTrue(ticket.seat.is_taken)
+        self.assertEqual(
+            list(Seat.objects.filter(is_taken=True).values_list(
+                'number', flat=True
+            )),
+            [1, 2, 3]
+        )
+
+    def test_ticket_deleted_without_service_frees_seat(self):
+        """Test that seat of ticket deleted in admin is sold again"""
+
+        ticket = sell_ticket(self.flight.pk, 'Евгений', 'Иван')
+        ticket.delete()
+
+        self.assertFalse(Seat.objects.get(number=1).is_taken)
+        self.assertEqual(
+            sell_ticket(self.flight.pk, 'Пётр', 'Иван').seat.number, 1
+        )
+
+    def test_seats_of_dates_are_separate(self):
+        """Test that flight on every date has own seats"""
+
+        for departure_date in (DEPARTURE_DATE, '2021-08-17'):
+            DailyFlight.objects.create(
+                flight=self.flight, departure_date=departure_date,
+                amount_of_free_places=PLACES_AMOUNT
+            )
+
+            ticket = sell_ticket(
+                self.flight.pk, 'Евгений', 'Иван', departure_date
+            )
+            self.assertEqual(ticket.seat.number, 1)
+
+    def test_flight_with_dates_is_not_sold_without_date(self):
+        """Test that seats without date of flight with dates aren't sold"""
+
+        DailyFlight.objects.create(
+            flight=self.flight, departure_date=DEPARTURE_DATE,
+            amount_of_free_places=PLACES_AMOUNT
+        )
+
+        with self.assertRaises(NoDepartureError):
+            sell_ticket(self.flight.pk, 'Евгений', 'Иван')
+        with self.assertRaises(NoDepartureError):
+            sell_tickets(self.flight, ['Евгений', 'Пётр'], 'Иван')
+
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_tickets_sold_before_seats(self):
+        """Test that tickets without seats get the first seats"""
+
+        old_ticket = Ticket.objects.create(
+            flight=self.flight, user='Евгений', seller='Иван'
+        )
+
+        ticket = sell_ticket(self.flight.pk, 'Пётр', 'Иван')
+        old_ticket.refresh_from_db()
+
+        self.assertEqual(old_ticket.seat.number, 1)
+        self.assertEqual(ticket.seat.number, 2)
+
+    def test_delete_ticket_sold_before_seats(self):
+        """Test that place of ticket without seat is returned by seats"""
+
+        old_tickets = [
+            Ticket.objects.create(
+                flight=self.flight, user=user, seller='Иван'
+            )
+            for user in ('Евгений', 'Пётр')
+        ]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_ticket(old_tickets[0])
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.amount_of_free_places, PLACES_AMOUNT - 1)
+        self.assertEqual(
+            Seat.objects.filter(is_taken=True).get().ticket, old_tickets[1]
+        )
+        self.assertEqual(Seat.objects.get(ticket=old_tickets[1]).number, 1)
+
+    def test_counter_larger_than_seats(self):
+        """Test that counter drifted from bus places doesn't oversell"""
+
+        Flight.objects.filter(pk=self.flight.pk).update(
+            amount_of_free_places=PLACES_AMOUNT + 10
+        )
+        sell_tickets(self.flight, ['Евгений'] * PLACES_AMOUNT, 'Иван')
+
+        with self.assertRaises(FlightSoldOutError):
+            sell_ticket(self.flight.pk, 'Пётр', 'Иван')
+
+        self.assertEqual(Ticket.objects.count(), PLACES_AMOUNT)
+
+    def test_seat_map(self):
+        """Test that seat map shows tickets of taken seats"""
+
+        ticket = sell_ticket(
+            self.flight.pk, 'Евгений', 'Иван', seat_number=2
+        )
+
+        self.assertEqual(
+            get_seat_map(self.flight.pk),
+            [(1, None), (2, ticket.pk), (3, None), (4, None), (5, None)]
+        )
+
+    def test_seat_map_is_only_read(self):
+        """Test that seat map of flight without seats creates nothing"""
+
+        old_ticket = Ticket.objects.create(
+            flight=self.flight, user='Евгений', seller='Иван'
+        )
+
+        self.assertEqual(
+            get_seat_map(self.flight.pk),
+            [(1, old_ticket.pk), (2, None), (3, None), (4, None), (5, None)]
+        )
+        self.assertFalse(Seat.objects.exists())
+
+    def test_daily_flight_gets_seats(self):
+        """Test that seats of daily flight are created with it"""
+
+        DailyFlight.objects.create(
+            flight=self.flight, departure_date=DEPARTURE_DATE,
+            amount_of_free_places=PLACES_AMOUNT
+        )
+
+        self.assertEqual(
+            Seat.objects.filter(departure_date=DEPARTURE_DATE).count(),
+            PLACES_AMOUNT
+        )
+
+    def test_cheque_shows_seat(self):
+        """Test that cheque has number of seat"""
+
+        ticket = sell_ticket(
+            self.flight.pk, 'Евгений', 'Иван', seat_number=3
+        )
+
+        self.assertIn('Место: 3', get_cheque_lines(ticket))
+
+
+@skipUnless(
+    connection.vendor == 'postgresql',
+    'Only PostgreSQL skips rows locked by other transactions'
+)
+class ParallelSeatsTests(TransactionTestCase):
+    """Stress test of seats taken by parallel single and group sales"""
+
+    places_amount = 100
+
+    def setUp(self):
+        self.flight = create_test_flight(self.places_amount)
+
+    def sell_in_thread(self, sale_index):
+        """Sell one ticket or group of them, return amount of tickets"""
+
+        users = [f'Покупатель №{sale_index}'] * (sale_index % 3 + 1)
+
+        try:
+            if len(users) == 1:
+                sell_ticket(self.flight.pk, users[0], 'Иван')
+            else:
+                sell_tickets(self.flight, users, 'Иван')
+        except FlightSoldOutError:
+            return 0
+        finally:
+            connection.close()
+
+        return len(users)
+
+    def test_committed_sale_seats_are_not_sold_again(self):
+        """Test that seat sold by committed sale isn't taken again
+
+        Sale waiting in SELECT of free seats while another one commits
+        must recheck the seat, otherwise INSERT of ticket fails on it's
+        unique seat.
+        """
+
+        with ThreadPoolExecutor(16) as executor:
+            sold_amount = sum(executor.map(
+                self.sell_in_thread, range(self.places_amount)
+            ))
+
+        self.assertEqual(
+            Ticket.objects.filter(flight=self.flight).count(), sold_amount
+        )
+        self.assertEqual(
+            Seat.objects.filter(flight=self.flight, is_taken=True).count(),
+            sold_amount
+        )
+        self.assertGreater(sold_amount, self.places_amount * 9 // 10)
+
+
+class RecountFreePlacesTests(TestCase):
+    """Test class for recount_free_places service and command"""
+
+    def setUp(self):
+        self.flight = create_test_flight(PLACES_AMOUNT)
+
+        # Ticket without date was sold before daily flights
+        sell_ticket(self.flight.pk, 'Евгений', 'Иван')
+        self.daily_flight = DailyFlight.objects.create(
+            flight=self.flight, departure_date=DEPARTURE_DATE,
+            amount_of_free_places=0
+        )
+        Ticket.objects.create(
+            flight=self.flight, user='Пётр', seller='Иван',
+            departure_date=DEPARTURE_DATE
+        )
+        Flight.objects.filter(pk=self.flight.pk).update(
+            amount_of_free_places=30
+        )
+
+    def test_recount_free_places(self):
+        """Test that counters are set by bus places and sold tickets"""
+
+        self.assertEqual(recount_free_places(), 2)
+        self.assertEqual(recount_free_places(), 0)
+
+        self.flight.refresh_from_db()
+        self.daily_flight.refresh_from_db()
+
+        self.assertEqual(self.flight.amount_of_free_places, PLACES_AMOUNT - 1)
+        self.assertEqual(
+            self.daily_flight.amount_of_free_places, PLACES_AMOUNT - 1
+        )
+
+    def test_command(self):
+        """Test that command reports amount of fixed counters"""
+
+        output = StringIO()
+        call_command('recount_free_places', stdout=output)
+
+        self.assertIn('Fixed free places counters: 2', output.getvalue())
+
+
+class SeatMapViewTests(TestCase):
+    """Test class for SeatMapView and sale of chosen seat"""
+
+    def setUp(self):
+        self.flight = create_test_flight(PLACES_AMOUNT)
+        self.client.force_login(User.objects.create_user(
+            'cashier', password='cashier', is_staff=True
+        ))
+
+    def test_seat_map_links_free_seats_to_sale(self):
+        """Test that free seat is linked to sale of it"""
+
+        sell_ticket(self.flight.pk, 'Евгений', 'Иван')
+
+        response = self.client.get(f'/index/flight/{self.flight.pk}/seats/')
+
+        self.assertContains(response, 'title="Место занято"', count=1)
+        self.assertContains(
+            response,
+            f'/index/sell_ticket/?flight={self.flight.pk}&amp;seat_number=2'
+        )
+
+    def test_invalid_date(self):
+        """Test that seat map for invalid date isn't found"""
+
+        response = self.client.get(
+            f'/index/flight/{self.flight.pk}/seats/',
+            {'departure_date': 'завтра'}
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_date_without_departure(self):
+        """Test that seat map isn't found for date without daily flight"""
+
+        url = f'/index/flight/{self.flight.pk}/seats/'
+        response = self.client.get(url, {'departure_date': DEPARTURE_DATE})
+
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Seat.objects.exists())
+
+        DailyFlight.objects.create(
+            flight=self.flight, departure_date=DEPARTURE_DATE,
+            amount_of_free_places=PLACES_AMOUNT
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                url, {'departure_date': DEPARTURE_DATE}
+            )
+
+        self.assertContains(response, 'seat_number=', count=PLACES_AMOUNT)
+        self.assertTrue(all(
+            query['sql'].startswith('SELECT')
+            for query in queries.captured_queries
+        ))
+
+    def test_sell_taken_seat(self):
+        """Test that sale of taken seat shows error of the seat"""
+
+        sell_ticket(self.flight.pk, 'Евгений', 'Иван')
+
+        with TemporaryDirectory() as cheques_root, \
+                override_settings(CHEQUES_ROOT=cheques_root):
+            response = self.client.post('/index/sell_ticket/', {
+                'flight': self.flight.pk,
+                'user': 'Пётр',
+                'seller': 'Иван',
+                'seat_number': 1,
+            })
+
+        self.assertFormError(
+            response, 'form', 'seat_number',
+            'Место №1 занято или его нет в автобусе'
+        )
@@ -0,0 +1,409 @@
+"""Tests for services from bus_stations folder"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from io import StringIO
+from time import sleep
+
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+
+from bus_stations.models import (
+    BusStation, Route, Flight, DailyFlight, Bus, Driver, Seat, Ticket
+)
+from bus_stations.services import (
+    FlightSoldOutError, NoDepartureError, sell_ticket, sell_tickets,
+    delete_ticket, get_free_places, generate_daily_flights,
+    prune_daily_flights, create_seats
+)
+
+
+FREE_PLACES_AMOUNT = 50
+DAYS_AMOUNT = 14
+
+# Monday
+START_DATE = date(2021, 8, 16)
+PARALLEL_SALES_AMOUNT = 400
+THREADS_AMOUNT = 16
+
+# Attempts of sale failed by lock of SQLite database and seconds between
+# them growing with every attempt
+SALE_ATTEMPTS = 50
+SALE_RETRY_DELAY = 0.005
+
+
+def create_test_flight(amount_of_free_places):
+    """Create flight with route, bus station, bus and driver"""
+
+    test_bus_station = BusStation.objects.create(
+        name='Автовокзал №1',
+        office_hours='10:00 - 22:00',
+        address='г. Тула, ул. Такая-то, дом №1',
+        phone_number='8-666-666-69-69'
+    )
+
+    test_route = Route.objects.create(
+        name='Маршрут №1',
+        regularity='Еж',
+        departure_time='10:00',
+        price=200,
+        bus_station=test_bus_station
+    )
+
+    test_driver = Driver.objects.create(
+        passport_number='1234 12345678',
+        name='Семён',
+        second_name='Семёнов',
+        middle_name='Семёнович',
+        phone_number=89206666996,
+        age=50
+    )
+
+    test_bus = Bus.objects.create(
+        registration_number='Е666КХ',
+        mark='Ford',
+        amount_of_places=amount_of_free_places,
+        driver=test_driver
+    )
+
+    return Flight.objects.create(
+        route=test_route,
+        departure_time='10:00',
+        arrival_time='12:00',
+        amount_of_free_places=amount_of_free_places,
+        bus=test_bus
+    )
+
+
+class SellTicketTests(TestCase):
+    """Test class for sell_ticket and delete_ticket services"""
+
+    def setUp(self):
+        self.flight = create_test_flight(amount_of_free_places=1)
+
+    def test_sell_ticket_takes_free_place(self):
+        """Test that sold ticket decreases amount of free places"""
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket = sell_ticket(self.flight.pk, 'Евгений', 'Иван')
+        self.flight.refresh_from_db()
+
+        self.assertEqual(ticket.flight, self.flight)
+        self.assertEqual(self.flight.amount_of_free_places, 0)
+
+    def test_sell_ticket_for_sold_out_flight(self):
+        """Test that sold out flight raises error and creates no ticket"""
+
+        with self.captureOnCommitCallbacks(execute=True):
+            sell_ticket(self.flight.pk, 'Евгений', 'Иван')
+
+        with self.assertRaises(FlightSoldOutError):
+            sell_ticket(self.flight.pk, 'Евгений', 'Иван')
+
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.amount_of_free_places, 0)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_sell_ticket_queries_amount(self):
+        """Test that ticket is sold by changes of seat and ticket only
+
+        Free places are counted after commit of the sale.
+        """
+
+        # Seats are created by the first sale
+        create_seats(self.flight.pk)
+
+        # Savepoint, check of daily flights, SELECT and UPDATE of seat,
+        # INSERT and release of savepoint
+        with self.captureOnCommitCallbacks() as callbacks, \
+                self.assertNumQueries(6):
+            sell_ticket(self.flight.pk, 'Евгений', 'Иван')
+
+        self.assertEqual(len(callbacks), 1)
+
+    def test_delete_ticket_returns_free_place(self):
+        """Test that deleted ticket increases amount of free places"""
+
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_ticket(sell_ticket(self.flight.pk, 'Евгений', 'Иван'))
+        self.flight.refresh_from_db()
+
+        self.assertEqual(self.flight.amount_of_free_places, 1)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_deleted_twice_ticket_returns_one_place(self):
+        """Test that second deletion of one ticket doesn't add a place"""
+
+        ticket = sell_ticket(self.flight.pk, 'Евгений', 'Иван')
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.assertTrue(delete_ticket(ticket))
+            self.assertFalse(delete_ticket(ticket))
+        self.flight.refresh_from_db()
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.flight.amount_of_free_places, 1)
+
+
+class SellTicketsTests(TestCase):
+    """Test class for sell_tickets service"""
+
+    def setUp(self):
+        self.flight = create_test_flight(FREE_PLACES_AMOUNT)
+        self.users = [
+            f'Покупатель №{user_index}'
+            for user_index in range(FREE_PLACES_AMOUNT - 10)
+        ]
+
+    def test_sell_tickets_takes_free_places(self):
+        """Test that group sale creates tickets and takes free places"""
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tickets = sell_tickets(self.flight, self.users, 'Иван')
+        self.flight.refresh_from_db()
+
+        self.assertEqual([ticket.user for ticket in tickets], self.users)
+        self.assertEqual(self.flight.amount_of_free_places, 10)
+        self.assertEqual(Ticket.objects.count(), len(self.users))
+
+    def test_sell_tickets_without_enough_free_places(self):
+        """Test that group sale is rejected whole if places are not enough"""
+
+        with self.assertRaises(FlightSoldOutError):
+            sell_tickets(self.flight, self.users * 2, 'Иван')
+
+        self.flight.refresh_from_db()
+
+        self.assertEqual(
+            self.flight.amount_of_free_places, FREE_PLACES_AMOUNT
+        )
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_sell_tickets_queries_amount(self):
+        """Test that amount of queries doesn't depend on group size"""
+
+        # Seats are created by the first sale
+        create_seats(self.flight.pk)
+
+        # Savepoint, check of daily flights, SELECT and UPDATE of seats,
+        # INSERT, SELECT of ids of tickets without RETURNING of inserted
+        # rows and release of savepoint
+        with self.assertNumQueries(
+                7 - connection.features.can_return_rows_from_bulk_insert):
+            sell_tickets(self.flight, self.users, 'Иван')
+
+
+class DailyFlightsTests(TestCase):
+    """Test class for daily flights generation and sale on date"""
+
+    def setUp(self):
+        self.flight = create_test_flight(FREE_PLACES_AMOUNT)
+
+        weekend_route = Route.objects.create(
+            name='Маршрут №2',
+            regularity='Сб;Вс',
+            departure_time='12:00',
+            price=300,
+            bus_station=self.flight.route.bus_station
+        )
+        self.weekend_flight = Flight.objects.create(
+            route=weekend_route,
+            departure_time='12:00',
+            arrival_time='14:00',
+            bus=self.flight.bus
+        )
+
+    def test_generate_daily_flights(self):
+        """Test that flights are created on days of route schedule"""
+
+        created_amount = generate_daily_flights(START_DATE, DAYS_AMOUNT)
+
+        self.assertEqual(created_amount, DAYS_AMOUNT + 4)
+        self.assertEqual(
+            list(self.weekend_flight.daily_flights.values_list(
+                'departure_date', flat=True
+            )),
+            [
+                START_DATE + timedelta(days=day)
+                for day in (5, 6, 12, 13)
+            ]
+        )
+        self.assertEqual(
+            self.flight.daily_flights.first().amount_of_free_places,
+            self.flight.bus.amount_of_places
+        )
+
+    def test_regenerate_daily_flights(self):
+        """Test that regeneration keeps sold places and adds new days"""
+
+        generate_daily_flights(START_DATE, DAYS_AMOUNT)
+        with self.captureOnCommitCallbacks(execute=True):
+            sell_ticket(self.flight.pk, 'Евгений', 'Иван', START_DATE)
+
+        created_amount = generate_daily_flights(START_DATE, DAYS_AMOUNT + 1)
+
+        self.assertEqual(created_amount, 1)
+        self.assertEqual(
+            DailyFlight.objects.get(
+                flight=self.flight, departure_date=START_DATE
+            ).amount_of_free_places,
+            FREE_PLACES_AMOUNT - 1
+        )
+
+    def test_generated_daily_flights_get_seats(self):
+        """Test that every generated daily flight has seats of it's bus"""
+
+        generate_daily_flights(START_DATE, DAYS_AMOUNT)
+
+        self.assertEqual(
+            Seat.objects.count(),
+            (DAYS_AMOUNT + 4) * self.flight.bus.amount_of_places
+        )
+
+    def test_prune_daily_flights(self):
+        """Test that daily flights and free seats before date are deleted"""
+
+        generate_daily_flights(START_DATE, DAYS_AMOUNT)
+        ticket = sell_ticket(self.flight.pk, 'Евгений', 'Иван', START_DATE)
+        pruned_amount = prune_daily_flights(START_DATE + timedelta(days=7))
+
+        self.assertEqual(pruned_amount, 7 + 2)
+        self.assertEqual(DailyFlight.objects.count(), 7 + 2)
+        self.assertEqual(
+            Seat.objects.filter(
+                departure_date__lt=START_DATE + timedelta(days=7)
+            ).get(),
+            ticket.seat
+        )
+
+    def test_sell_and_delete_ticket_on_date(self):
+        """Test that ticket on date uses free places of that date only"""
+
+        generate_daily_flights(START_DATE, DAYS_AMOUNT)
+        with self.captureOnCommitCallbacks(execute=True):
+            ticket = sell_ticket(
+                self.flight.pk, 'Евгений', 'Иван', START_DATE
+            )
+
+        daily_flights = self.flight.daily_flights.values_list(
+            'amount_of_free_places', flat=True
+        )
+        self.flight.refresh_from_db()
+
+        self.assertEqual(daily_flights[0], FREE_PLACES_AMOUNT - 1)
+        self.assertEqual(daily_flights[1], FREE_PLACES_AMOUNT)
+        self.assertEqual(
+            self.flight.amount_of_free_places, FREE_PLACES_AMOUNT
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            delete_ticket(ticket)
+
+        self.assertEqual(daily_flights.first(), FREE_PLACES_AMOUNT)
+
+    def test_sell_ticket_on_not_generated_date(self):
+        """Test that flight without daily flight doesn't depart on date"""
+
+        with self.assertRaisesMessage(
+                NoDepartureError, 'Рейс не отправляется'):
+            sell_ticket(self.flight.pk, 'Евгений', 'Иван', START_DATE)
+
+    def test_free_places_on_date(self):
+        """Test free places of flights with and without daily flights"""
+
+        generate_daily_flights(START_DATE, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            sell_ticket(self.flight.pk, 'Евгений', 'Иван', START_DATE)
+        Flight.objects.filter(pk=self.weekend_flight.pk).update(
+            amount_of_free_places=3
+        )
+
+        free_places = dict(Flight.objects.annotate(
+            free_places=get_free_places(START_DATE)
+        ).values_list('pk', 'free_places'))
+
+        self.assertEqual(free_places, {
+            self.flight.pk: FREE_PLACES_AMOUNT - 1,
+            self.weekend_flight.pk: 3,
+        })
+
+        free_places = dict(Flight.objects.annotate(
+            free_places=get_free_places(START_DATE + timedelta(days=1))
+        ).values_list('pk', 'free_places'))
+
+        self.assertEqual(free_places[self.flight.pk], None)
+
+    def test_generate_daily_flights_command(self):
+        """Test that command creates daily flights from today"""
+
+        output = StringIO()
+        call_command(
+            'generate_daily_flights', days=DAYS_AMOUNT, prune=True,
+            stdout=output
+        )
+
+        self.assertIn(
+            f'Created daily flights: {DAYS_AMOUNT + 4}', output.getvalue()
+        )
+
+
+class ParallelSellTicketTests(TransactionTestCase):
+    """Stress test of sell_ticket from many threads"""
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest(
+                'In-memory SQLite database locks tables '
+                'for parallel connections'
+            )
+
+        self.flight = create_test_flight(FREE_PLACES_AMOUNT)
+
+    def sell_ticket_in_thread(self, sale_index):
+        """Sell ticket in own connection, True if ticket was sold
+
+        SQLite locks the whole database and fails transaction which reads
+        seats while another one writes, such sale is repeated after delay
+        at most SALE_ATTEMPTS times. Free places are counted after commit, sale
+        failed by them is sold.
+        """
+
+        user = f'Покупатель №{sale_index}'
+
+        try:
+            for attempt in range(SALE_ATTEMPTS):
+                try:
+                    sell_ticket(self.flight.pk, user, 'Иван')
+                except OperationalError:
+                    if connection.vendor != 'sqlite':
+                        raise
+                    if Ticket.objects.filter(user=user).exists():
+                        return True
+                    sleep(SALE_RETRY_DELAY * attempt)
+                else:
+                    return True
+        except FlightSoldOutError:
+            return False
+        finally:
+            connection.close()
+
+        self.fail(f'Sale №{sale_index} failed {SALE_ATTEMPTS} times')
+
+    def test_parallel_sales_do_not_oversell(self):
+        """Test that parallel sales sell exactly all free places"""
+
+        with ThreadPoolExecutor(THREADS_AMOUNT) as executor:
+            sales_results = list(executor.map(
+                self.sell_ticket_in_thread, range(PARALLEL_SALES_AMOUNT)
+            ))
+
+        self.flight.refresh_from_db()
+
+        self.assertEqual(sales_results.count(True), FREE_PLACES_AMOUNT)
+        self.assertEqual(self.flight.amount_of_free_places, 0)
+        self.assertEqual(
+            Ticket.objects.filter(flight=self.flight).count(),
+            FREE_PLACES_AMOUNT
+        )
@@ -0,0 +1,285 @@
+"""Tests for bulk import of timetable"""
+
+import csv
+import json
+import os
+from datetime import time
+from io import StringIO
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from bus_stations.models import Route, RouteDeparture, Flight, Bus, Driver
+from bus_stations.tests.test_services import create_test_flight
+from bus_stations.timetable import (
+    TimetableError, import_timetable, REQUIRED_COLUMNS, BUS_COLUMNS
+)
+
+
+def get_timetable_rows(bus_station, bus, routes_amount, flights_amount):
+    """Rows with flights_amount flights for every route"""
+
+    return [
+        {
+            'bus_station': bus_station.name,
+            'route': f'Город №{route_index}',
+            'regularity': 'Пн; Ср',
+            'price': 100 + route_index,
+            'departure_time': f'{flight_index:02}:00',
+            'arrival_time': f'{flight_index:02}:30',
+            'bus': bus.pk,
+        }
+        for route_index in range(routes_amount)
+        for flight_index in range(flights_amount)
+    ]
+
+
+class ImportTimetableTests(TestCase):
+    """Test class for import_timetable function"""
+
+    def setUp(self):
+        flight = create_test_flight(amount_of_free_places=10)
+        self.bus_station = flight.route.bus_station
+        self.bus = flight.bus
+
+    def test_import_creates_routes_and_flights(self):
+        """Test that routes, flights and departures are created"""
+
+        stats = import_timetable(
+            get_timetable_rows(self.bus_station, self.bus, 3, 4)
+        )
+
+        self.assertEqual(stats['created_routes'], 3)
+        self.assertEqual(stats['created_flights'], 12)
+
+        route = Route.objects.get(name='Город №1')
+        self.assertEqual(route.price, 101)
+        self.assertEqual(route.departure_time, '00:00; 01:00; 02:00; 03:00')
+        self.assertEqual(
+            sorted(set(route.departures.values_list(
+                'departure_time', flat=True
+            ))),
+            [time(0), time(1), time(2), time(3)]
+        )
+        self.assertEqual(route.departures.count(), 8)
+        self.assertEqual(
+            route.flights.get(departure_time=time(2)).amount_of_free_places,
+            self.bus.amount_of_places
+        )
+
+    def test_second_import_updates_flights(self):
+        """Test that repeated import updates flights without duplicates"""
+
+        rows = get_timetable_rows(self.bus_station, self.bus, 2, 2)
+        import_timetable(rows)
+
+        for row in rows:
+            row['arrival_time'] = '23:00'
+        stats = import_timetable(rows, batch_size=3)
+
+        self.assertEqual(stats['created_flights'], 0)
+        self.assertEqual(stats['updated_flights'], 4)
+        self.assertEqual(
+            Flight.objects.filter(arrival_time=time(23)).count(), 4
+        )
+
+    def test_import_creates_buses(self):
+        """Test that missing bus is created with given driver"""
+
+        driver = Driver.objects.create(
+            passport_number='4321 5678',
+            name='Пётр',
+            second_name='Петров',
+            middle_name='Петрович',
+            phone_number=89000000000,
+            age=40
+        )
+        rows = get_timetable_rows(self.bus_station, self.bus, 1, 1)
+        rows[0].update({
+            'bus': 'А001АА',
+            'bus_mark': 'ПАЗ',
+            'bus_amount_of_places': 20,
+            'driver_passport_number': driver.passport_number,
+        })
+
+        import_timetable(rows)
+
+        self.assertEqual(Bus.objects.get(pk='А001АА').driver, driver)
+        self.assertEqual(
+            Flight.objects.get(bus='А001АА').amount_of_free_places, 20
+        )
+
+    def test_invalid_rows(self):
+        """Test that nothing is imported when some rows are invalid"""
+
+        rows = get_timetable_rows(self.bus_station, self.bus, 2, 2)
+        rows[1]['departure_time'] = '25:00'
+        rows[3]['price'] = -1
+
+        with self.assertRaises(TimetableError) as error:
+            import_timetable(rows, batch_size=2)
+
+        self.assertEqual(len(error.exception.errors), 2)
+        self.assertEqual(Route.objects.count(), 1)
+
+    def test_route_with_many_flights(self):
+        """Test that departures of route aren't limited by it's text"""
+
+        rows = [
+            {
+                'bus_station': self.bus_station.name,
+                'route': 'Город',
+                'regularity': 'Еж',
+                'price': 100,
+                'departure_time': f'{minute // 60:02}:{minute % 60:02}',
+                'arrival_time': '23:59',
+                'bus': self.bus.pk,
+            }
+            for minute in range(0, 24 * 60, 10)
+        ]
+
+        import_timetable(rows)
+
+        route = Route.objects.get(name='Город')
+        self.assertTrue(route.departure_time.startswith('00:00; 00:10; '))
+        self.assertTrue(route.departure_time.endswith('; …'))
+        self.assertLessEqual(len(route.departure_time), 255)
+        self.assertEqual(route.departures.count(), 7 * 144)
+
+        route.save()
+        self.assertEqual(route.departures.count(), 7 * 144)
+
+    def test_import_keeps_times_of_route_text(self):
+        """Test that times of route text are kept with times of flights"""
+
+        route = Route.objects.get()
+        rows = get_timetable_rows(self.bus_station, self.bus, 1, 1)
+        rows[0]['route'] = route.name
+
+        stats = import_timetable(rows)
+        route.refresh_from_db()
+
+        self.assertEqual(route.departure_time, '00:00; 10:00')
+        self.assertEqual(stats['updated_routes'], 1)
+
+    def test_too_long_values(self):
+        """Test that values longer than their fields are row errors"""
+
+        rows = get_timetable_rows(self.bus_station, self.bus, 1, 4)
+        rows[0]['route'] = 'Г' * 101
+        rows[1]['regularity'] = 'Пн; ' * 6
+        rows[2]['bus'] = 'А' * 11
+        rows[3].update({
+            'bus': 'А001АА',
+            'bus_mark': 'П' * 101,
+            'bus_amount_of_places': 20,
+            'driver_passport_number': '4321 5678',
+        })
+
+        with self.assertRaises(TimetableError) as error:
+            import_timetable(rows)
+
+        self.assertEqual(error.exception.errors, [
+            'Строка 1: route длиннее 100 символов',
+            'Строка 2: regularity длиннее 20 символов',
+            'Строка 3: bus длиннее 10 символов',
+            'Строка 4: bus_mark длиннее 100 символов',
+        ])
+
+    def test_dry_run(self):
+        """Test that dry run counts changes without saving them"""
+
+        stats = import_timetable(
+            get_timetable_rows(self.bus_station, self.bus, 2, 2),
+            dry_run=True
+        )
+
+        self.assertEqual(stats['created_flights'], 4)
+        self.assertEqual(Flight.objects.count(), 1)
+        self.assertEqual(RouteDeparture.objects.count(), 7)
+
+    def test_lookups_amount_per_batch(self):
+        """Test that lookups of batch don't depend on amount of rows
+
+        Only SELECT queries are counted, because SQLite splits bulk
+        inserts by limit of query parameters.
+        """
+
+        lookups_amounts = []
+
+        for routes_amount in (1, 20):
+            Route.objects.filter(name__startswith='Город').delete()
+
+            with CaptureQueriesContext(connection) as queries:
+                import_timetable(get_timetable_rows(
+                    self.bus_station, self.bus, routes_amount, 10
+                ))
+
+            lookups_amounts.append(len([
+                query for query in queries.captured_queries
+                if query['sql'].startswith('SELECT')
+            ]))
+
+        self.assertEqual(lookups_amounts[0], lookups_amounts[1])
+
+
+class ImportTimetableCommandTests(TestCase):
+    """Test class for import_timetable command"""
+
+    def setUp(self):
+        flight = create_test_flight(amount_of_free_places=10)
+        self.rows = get_timetable_rows(
+            flight.route.bus_station, flight.bus, 2, 3
+        )
+
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_import_csv(self):
+        """Test that command imports CSV and reports progress"""
+
+        path = os.path.join(self.directory, 'timetable.csv')
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(
+                file, REQUIRED_COLUMNS + BUS_COLUMNS
+            )
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+        output = StringIO()
+        call_command(
+            'import_timetable', path, '--batch-size', 4, stdout=output
+        )
+
+        self.assertIn('Rows processed: 4', output.getvalue())
+        self.assertIn('Rows processed: 6', output.getvalue())
+        self.assertEqual(Flight.objects.count(), 7)
+
+    def test_dry_run_json(self):
+        """Test that command with dry run doesn't save JSON timetable"""
+
+        path = os.path.join(self.directory, 'timetable.json')
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.rows, file)
+
+        output = StringIO()
+        call_command('import_timetable', path, '--dry-run', stdout=output)
+
+        self.assertIn('created_flights: 6', output.getvalue())
+        self.assertEqual(Flight.objects.count(), 1)
+
+    def test_invalid_file(self):
+        """Test that command reports errors of rows"""
+
+        self.rows[0]['price'] = 'бесплатно'
+        path = os.path.join(self.directory, 'timetable.ndjson')
+        with open(path, 'w', encoding='utf-8') as file:
+            file.writelines(json.dumps(row) + '\n' for row in self.rows)
+
+        with self.assertRaisesMessage(CommandError, 'Строка 1'):
+            call_command('import_timetable', path, stdout=StringIO())
@@ -0,0 +1,284 @@
+"""Tests for views from bus_stations folder"""
+
+from datetime import time, timedelta
+from tempfile import TemporaryDirectory
+
+from django.contrib.auth.models import User
+from django.test import TestCase, RequestFactory, override_settings
+from django.utils.timezone import localdate
+
+from bus_stations.models import Route, Flight, DailyFlight, Ticket
+from bus_stations.tests.test_services import create_test_flight
+from bus_stations.services import (
+    sell_ticket, get_free_places, generate_daily_flights
+)
+from bus_stations.views import (
+    FlightListView, ChequeForTicketView,
+    get_next_flight, get_next_flights, annotate_travel_time
+)
+
+
+FLIGHTS_AMOUNT = 24
+
+
+class NextFlightTests(TestCase):
+    """Test class for get_next_flight and get_next_flights functions"""
+
+    def setUp(self):
+        first_flight = create_test_flight(amount_of_free_places=10)
+        self.bus_station = first_flight.route.bus_station
+        self.bus = first_flight.bus
+
+        self.routes = [first_flight.route] + [
+            Route.objects.create(
+                name=f'Маршрут №{route_index}',
+                regularity='Еж',
+                departure_time='08:00; 12:00; 18:00',
+                price=200,
+                bus_station=self.bus_station
+            )
+            for route_index in range(2, 4)
+        ]
+
+        for route in self.routes[1:]:
+            for departure_hour, amount_of_free_places in (
+                    (8, 10), (12, 0), (18, 10)):
+                Flight.objects.create(
+                    route=route,
+                    departure_time=time(departure_hour),
+                    arrival_time=time(departure_hour + 2),
+                    amount_of_free_places=amount_of_free_places,
+                    bus=self.bus
+                )
+
+    def get_flights(self):
+        return self.routes[1].flights.annotate(
+            free_places=get_free_places(localdate())
+        )
+
+    def test_next_flight_skips_departed_and_sold_out_flights(self):
+        """Test that next flight departs later and has free places"""
+
+        next_flight = get_next_flight(self.get_flights(), time(9))
+
+        self.assertEqual(next_flight.departure_time, time(18))
+
+    def test_next_flight_after_last_departure(self):
+        """Test that there is no next flight after the last departure"""
+
+        self.assertIsNone(
+            get_next_flight(self.get_flights(), time(19))
+        )
+
+    def test_next_flights_of_routes(self):
+        """Test that next flights of all routes are found by one query"""
+
+        with self.assertNumQueries(1):
+            next_flights = get_next_flights(self.routes, time(7))
+
+        self.assertEqual(
+            {
+                route_pk: flight.departure_time
+                for route_pk, flight in next_flights.items()
+            },
+            {
+                self.routes[0].pk: time(10),
+                self.routes[1].pk: time(8),
+                self.routes[2].pk: time(8),
+            }
+        )
+
+    def test_next_flights_miss_routes_without_flights(self):
+        """Test that routes without next flights are missed"""
+
+        next_flights = get_next_flights(self.routes, time(11))
+
+        self.assertEqual(
+            set(next_flights), {self.routes[1].pk, self.routes[2].pk}
+        )
+
+
+class TravelTimeTests(TestCase):
+    """Test class for annotate_travel_time function"""
+
+    def setUp(self):
+        self.flight = create_test_flight(amount_of_free_places=10)
+
+        Flight.objects.create(
+            route=self.flight.route,
+            departure_time=time(22, 30),
+            arrival_time=time(1, 15),
+            bus=self.flight.bus
+        )
+
+    def test_travel_time_of_every_flight(self):
+        """Test that travel time is calculated for every flight"""
+
+        travel_times = [
+            flight.travel_time
+            for flight in annotate_travel_time(Flight.objects.all())
+        ]
+
+        self.assertEqual(
+            travel_times,
+            [timedelta(hours=2), timedelta(hours=2, minutes=45)]
+        )
+
+
+class FlightListViewTests(TestCase):
+    """Test class for FlightListView"""
+
+    def setUp(self):
+        self.flight = create_test_flight(amount_of_free_places=10)
+        self.flight.refresh_from_db()
+
+        for departure_hour in range(FLIGHTS_AMOUNT):
+            if departure_hour != self.flight.departure_time.hour:
+                Flight.objects.create(
+                    route=self.flight.route,
+                    departure_time=time(departure_hour),
+                    arrival_time=time((departure_hour + 2) % 24),
+                    bus=self.flight.bus
+                )
+
+        self.request = RequestFactory().get(
+            f'/index/{self.flight.route.pk}/flights/'
+        )
+        self.request.user = User.objects.create_user(
+            'cashier', password='cashier', is_staff=True
+        )
+
+    def test_queries_amount(self):
+        """Test that page costs 2 queries whatever the flight count"""
+
+        with self.assertNumQueries(2):
+            response = FlightListView.as_view()(
+                self.request, route_id=self.flight.route.pk
+            )
+            response.render()
+
+        self.assertEqual(
+            len(response.context_data['flights']), FLIGHTS_AMOUNT
+        )
+
+    def test_free_places_for_today(self):
+        """Test that page shows free places of today's daily flights"""
+
+        generate_daily_flights(localdate(), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            sell_ticket(self.flight.pk, 'Евгений', 'Иван', localdate())
+        DailyFlight.objects.exclude(flight=self.flight).delete()
+        Flight.objects.exclude(pk=self.flight.pk).update(
+            amount_of_free_places=5
+        )
+
+        response = FlightListView.as_view()(
+            self.request, route_id=self.flight.route.pk
+        )
+        response.render()
+        free_places = {
+            flight.pk: flight.free_places
+            for flight in response.context_data['flights']
+        }
+
+        self.assertEqual(free_places.pop(self.flight.pk), 9)
+        self.assertEqual(set(free_places.values()), {5})
+
+
+class SellTicketViewTests(TestCase):
+    """Test class for validation of departure date of SellTicketView"""
+
+    def setUp(self):
+        self.flight = create_test_flight(amount_of_free_places=10)
+        self.client.force_login(User.objects.create_user(
+            'cashier', password='cashier', is_staff=True
+        ))
+
+    def sell_ticket_on_date(self, departure_date):
+        return self.client.post('/index/sell_ticket/', {
+            'flight': self.flight.pk,
+            'user': 'Евгений',
+            'seller': 'Иван',
+            'departure_date': departure_date.isoformat(),
+        })
+
+    def test_past_date(self):
+        """Test that ticket can't be sold for departed date"""
+
+        response = self.sell_ticket_on_date(localdate() - timedelta(days=1))
+
+        self.assertFormError(
+            response, 'form', 'departure_date', 'Дата отправления уже прошла'
+        )
+
+    def test_date_without_departure(self):
+        """Test that date without daily flight isn't shown as sold out"""
+
+        departure_date = localdate() + timedelta(days=1)
+        response = self.sell_ticket_on_date(departure_date)
+
+        self.assertFormError(
+            response, 'form', 'departure_date',
+            f'Рейс не отправляется {departure_date:%d.%m.%Y}'
+        )
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_flight_with_dates_without_date(self):
+        """Test that flight departing by dates is sold only on date"""
+
+        generate_daily_flights(localdate(), 1)
+        response = self.client.post('/index/sell_ticket/', {
+            'flight': self.flight.pk, 'user': 'Евгений', 'seller': 'Иван',
+        })
+
+        self.assertFormError(
+            response, 'form', 'departure_date',
+            'Рейс продаётся по датам, укажите дату'
+        )
+        self.assertFalse(Ticket.objects.exists())
+
+
+class ChequeForTicketViewTests(TestCase):
+    """Test class for ChequeForTicketView"""
+
+    def setUp(self):
+        self.flight = create_test_flight(amount_of_free_places=10)
+        self.cashier = User.objects.create_user(
+            'cashier', password='cashier', is_staff=True
+        )
+
+    def test_sale_redirects_to_cheque_of_sold_ticket(self):
+        """Test that cheque of sold ticket is shown after sale"""
+
+        self.client.force_login(self.cashier)
+
+        with TemporaryDirectory() as cheques_root, \
+                override_settings(CHEQUES_ROOT=cheques_root):
+            response = self.client.post('/index/sell_ticket/', {
+                'flight': self.flight.pk,
+                'user': 'Евгений',
+                'seller': 'Иван',
+            })
+
+        ticket = Ticket.objects.get()
+        self.assertRedirects(
+            response, f'/index/cheque_for_ticket/{ticket.pk}/'
+        )
+
+    def test_cheque_is_rendered_by_one_query(self):
+        """Test that cheque costs one query and shows the ticket"""
+
+        sell_ticket(self.flight.pk, 'Евгений', 'Иван')
+        ticket = sell_ticket(self.flight.pk, 'Пётр', 'Иван')
+        sell_ticket(self.flight.pk, 'Семён', 'Иван')
+
+        request = RequestFactory().get(
+            f'/index/cheque_for_ticket/{ticket.pk}/'
+        )
+        request.user = self.cashier
+
+        with self.assertNumQueries(1):
+            response = ChequeForTicketView.as_view()(request, pk=ticket.pk)
+            response.render()
+
+        self.assertContains(response, 'Покупатель: Пётр')
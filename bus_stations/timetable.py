@@ -0,0 +1,585 @@
+"""Bulk import of routes, flights and buses from timetable rows
+
+Every row of timetable is a flight:
+
+    bus_station, route, regularity, price, departure_time, arrival_time,
+    bus[, bus_mark, bus_amount_of_places, driver_passport_number]
+
+Routes are found by bus station and name, flights by route and
+departure time, buses by registration number. Missing buses are created
+when their mark, amount of places and driver are given. Rows are
+validated and written by batches with one lookup of every model per
+batch. Departure time text and departures of routes are rebuilt from
+their regularity and times of their flights.
+"""
+
+import csv
+import json
+from datetime import time
+from io import StringIO
+from itertools import islice
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from .cache import invalidate_routes, invalidate_route_flights
+from .labels import get_route_label, get_flight_label
+from .models import (
+    BusStation, Route, RouteDeparture, Flight, Bus, Driver,
+    bump_collection_versions
+)
+from .schedule import (
+    format_departure_time, get_route_departures, parse_departure_time
+)
+
+
+IMPORT_BATCH_SIZE = 5000
+
+REQUIRED_COLUMNS = (
+    'bus_station', 'route', 'regularity', 'price',
+    'departure_time', 'arrival_time', 'bus',
+)
+
+BUS_COLUMNS = ('bus_mark', 'bus_amount_of_places', 'driver_passport_number')
+
+# Max value of PositiveSmallIntegerField
+MAX_SMALL_INTEGER = 32767
+
+# Fields limiting length of text columns
+TEXT_COLUMNS_FIELDS = {
+    'bus_station': BusStation._meta.get_field('name'),
+    'route': Route._meta.get_field('name'),
+    'regularity': Route._meta.get_field('regularity'),
+    'bus': Bus._meta.get_field('registration_number'),
+    'bus_mark': Bus._meta.get_field('mark'),
+    'driver_passport_number': Driver._meta.get_field('passport_number'),
+}
+
+
+class TimetableError(Exception):
+    """Timetable has invalid rows, nothing is imported"""
+
+    def __init__(self, errors):
+        super().__init__('\n'.join(errors))
+        self.errors = errors
+
+
+def read_csv_rows(file):
+    """Dicts of timetable rows from CSV file with header"""
+
+    return csv.DictReader(file)
+
+
+def read_json_rows(file):
+    """Dicts of timetable rows from JSON list or NDJSON file"""
+
+    first_character = file.read(1)
+    file.seek(0)
+
+    if first_character == '[':
+        return iter(json.load(file))
+
+    return (json.loads(line) for line in file if line.strip())
+
+
+TIMETABLE_READERS = {
+    'csv': read_csv_rows,
+    'json': read_json_rows,
+}
+
+
+def parse_time(value):
+    """Time from text like '10:00' or '10:00:00'"""
+
+    return time.fromisoformat(str(value).strip())
+
+
+def parse_amount(value, max_value):
+    """Non negative integer not greater than max_value"""
+
+    amount = int(value)
+
+    if not 0 <= amount <= max_value:
+        raise ValueError(f'{amount} не в пределах 0..{max_value}')
+
+    return amount
+
+
+def parse_text(row, column):
+    """Text of the column not longer than it's field allows"""
+
+    text = str(row[column]).strip()
+    max_length = TEXT_COLUMNS_FIELDS[column].max_length
+
+    if len(text) > max_length:
+        raise ValueError(f'{column} длиннее {max_length} символов')
+
+    return text
+
+
+def clean_row(row):
+    """Cleaned copy of timetable row, raise ValueError for invalid row"""
+
+    missing_columns = [
+        column for column in REQUIRED_COLUMNS
+        if str(row.get(column) or '').strip() == ''
+    ]
+    if missing_columns:
+        raise ValueError(f'нет значений {", ".join(missing_columns)}')
+
+    cleaned_row = {
+        column: parse_text(row, column)
+        for column in ('bus_station', 'route', 'regularity', 'bus')
+    }
+    cleaned_row['price'] = parse_amount(row['price'], MAX_SMALL_INTEGER)
+    cleaned_row['departure_time'] = parse_time(row['departure_time'])
+    cleaned_row['arrival_time'] = parse_time(row['arrival_time'])
+
+    if all(str(row.get(column) or '').strip() for column in BUS_COLUMNS):
+        cleaned_row['bus_mark'] = parse_text(row, 'bus_mark')
+        cleaned_row['bus_amount_of_places'] = parse_amount(
+            row['bus_amount_of_places'], MAX_SMALL_INTEGER
+        )
+        cleaned_row['driver_passport_number'] = \
+            parse_text(row, 'driver_passport_number')
+
+    return cleaned_row
+
+
+def clean_rows(rows, first_row_number):
+    """Cleaned rows and list of errors with row numbers"""
+
+    cleaned_rows, errors = [], []
+
+    for row_number, row in enumerate(rows, first_row_number):
+        try:
+            cleaned_rows.append(clean_row(row))
+        except (ValueError, TypeError, KeyError) as error:
+            errors.append(f'Строка {row_number}: {error}')
+
+    return cleaned_rows, errors
+
+
+def prepare_rows(fields, rows, database):
+    """Rows with values converted for database by the fields
+
+    Timetable repeats the same routes and times, so every distinct value
+    of a field is converted once.
+    """
+
+    prepared_values = [{} for field in fields]
+    prepared_rows = []
+
+    for row in rows:
+        prepared_row = []
+
+        for field, field_values, value in zip(fields, prepared_values, row):
+            if value not in field_values:
+                field_values[value] = field.get_db_prep_save(value, database)
+            prepared_row.append(field_values[value])
+
+        prepared_rows.append(prepared_row)
+
+    return prepared_rows
+
+
+def copy_rows(database, table, columns, rows):
+    """Load rows to Postgres table by COPY"""
+
+    data = StringIO()
+    csv.writer(data).writerows(rows)
+    data.seek(0)
+
+    with database.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {table} ({", ".join(columns)}) '
+            'FROM STDIN WITH (FORMAT csv)',
+            data
+        )
+
+
+def insert_rows(model, field_names, rows):
+    """Insert tuples of values of the fields without model instances
+
+    Postgres loads them by COPY, other databases by one executemany.
+    """
+
+    if not rows:
+        return
+
+    database = connections[DEFAULT_DB_ALIAS]
+    fields = [model._meta.get_field(name) for name in field_names]
+    columns = [field.column for field in fields]
+    table = model._meta.db_table
+
+    if database.vendor == 'postgresql':
+        copy_rows(database, table, columns, rows)
+        return
+
+    with database.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {table} ({", ".join(columns)}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))})',
+            prepare_rows(fields, rows, database)
+        )
+
+
+def update_rows(model, field_names, rows):
+    """Update the fields from tuples of primary key and values
+
+    Postgres loads rows by COPY to temporary table and updates model
+    table from it, other databases run one executemany.
+    """
+
+    if not rows:
+        return
+
+    database = connections[DEFAULT_DB_ALIAS]
+    fields = [model._meta.get_field(name) for name in field_names]
+    pk_column = model._meta.pk.column
+    table = model._meta.db_table
+
+    if database.vendor == 'postgresql':
+        columns = [pk_column] + [field.column for field in fields]
+        temporary_table = f'{table}_import'
+
+        with database.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE {temporary_table} AS '
+                f'SELECT {", ".join(columns)} FROM {table} WITH NO DATA'
+            )
+            copy_rows(database, temporary_table, columns, rows)
+            cursor.execute(
+                f'UPDATE {table} SET ' + ', '.join(
+                    f'{field.column} = {temporary_table}.{field.column}'
+                    for field in fields
+                ) + f' FROM {temporary_table} '
+                f'WHERE {table}.{pk_column} = {temporary_table}.{pk_column}'
+            )
+            cursor.execute(f'DROP TABLE {temporary_table}')
+
+        return
+
+    # Primary key is the last parameter of UPDATE
+    with database.cursor() as cursor:
+        cursor.executemany(
+            f'UPDATE {table} SET ' + ', '.join(
+                f'{field.column} = %s' for field in fields
+            ) + f' WHERE {pk_column} = %s',
+            prepare_rows(
+                fields + [model._meta.pk],
+                [values + [pk] for pk, *values in rows],
+                database
+            )
+        )
+
+
+class TimetableImport:
+    """Import of timetable rows keeping found objects between batches"""
+
+    def __init__(self):
+        self.bus_stations = {}
+        self.routes = {}
+
+        # Regularity, price and departure time of routes before import
+        self.original_routes = {}
+        self.created_routes_ids = set()
+        self.buses = set()
+        self.stats = {
+            'rows': 0,
+            'created_routes': 0,
+            'updated_routes': 0,
+            'created_buses': 0,
+            'created_flights': 0,
+            'updated_flights': 0,
+        }
+
+    def import_batch(self, rows):
+        """Write cleaned rows, return errors of rows referring unknown data"""
+
+        errors = self.find_bus_stations(rows) + self.save_buses(rows)
+        if errors:
+            return errors
+
+        self.save_routes(rows)
+        self.save_flights(rows)
+        self.stats['rows'] += len(rows)
+
+        return []
+
+    def find_bus_stations(self, rows):
+        names = {row['bus_station'] for row in rows} - set(self.bus_stations)
+
+        self.bus_stations.update(
+            BusStation.objects.filter(name__in=names).values_list(
+                'name', 'pk'
+            )
+        )
+
+        return [
+            f'Нет автовокзала {name}'
+            for name in sorted(names - set(self.bus_stations))
+        ]
+
+    def save_buses(self, rows):
+        registration_numbers = {row['bus'] for row in rows} - self.buses
+
+        self.buses.update(Bus.objects.filter(
+            pk__in=registration_numbers
+        ).values_list('pk', flat=True))
+
+        # Row of new bus with it's mark, places and driver
+        new_buses = {}
+        for row in rows:
+            if row['bus'] not in self.buses and (
+                    row['bus'] not in new_buses
+                    or 'driver_passport_number' in row):
+                new_buses[row['bus']] = row
+
+        drivers = dict(Driver.objects.filter(passport_number__in=[
+            row.get('driver_passport_number') for row in new_buses.values()
+        ]).values_list('passport_number', 'pk'))
+
+        errors = [
+            f'Нет автобуса {registration_number} и его водителя'
+            for registration_number, row in sorted(new_buses.items())
+            if row.get('driver_passport_number') not in drivers
+        ]
+        if errors:
+            return errors
+
+        Bus.objects.bulk_create(
+            Bus(
+                registration_number=registration_number,
+                mark=row['bus_mark'],
+                amount_of_places=row['bus_amount_of_places'],
+                driver_id=drivers[row['driver_passport_number']],
+            )
+            for registration_number, row in new_buses.items()
+        )
+        self.buses.update(new_buses)
+        self.stats['created_buses'] += len(new_buses)
+
+        return []
+
+    def save_routes(self, rows):
+        routes_rows = {
+            (self.bus_stations[row['bus_station']], row['route']): row
+            for row in rows
+        }
+        keys = set(routes_rows) - set(self.routes)
+
+        self.find_routes(keys)
+
+        new_keys = keys - set(self.routes)
+        Route.objects.bulk_create(
+            Route(
+                bus_station_id=bus_station_id,
+                name=name,
+                regularity=routes_rows[bus_station_id, name]['regularity'],
+                price=routes_rows[bus_station_id, name]['price'],
+                departure_time='',
+                label=get_route_label(
+                    routes_rows[bus_station_id, name]['bus_station'], name
+                ),
+            )
+            for bus_station_id, name in new_keys
+        )
+        self.find_routes(new_keys)
+
+        self.created_routes_ids.update(
+            self.routes[key].pk for key in new_keys
+        )
+        self.stats['created_routes'] += len(new_keys)
+
+        # Regularity and price of route are taken from it's last row
+        for key, row in routes_rows.items():
+            self.routes[key].regularity = row['regularity']
+            self.routes[key].price = row['price']
+
+    def find_routes(self, keys):
+        if not keys:
+            return
+
+        for route in Route.objects.filter(
+                bus_station__in={bus_station_id for bus_station_id, _ in keys},
+                name__in={name for _, name in keys},
+        ).only(
+            'pk', 'bus_station_id', 'name', 'regularity', 'price',
+            'departure_time', 'label'
+        ):
+            key = (route.bus_station_id, route.name)
+            if key in keys and key not in self.routes:
+                self.routes[key] = route
+                self.original_routes[route.pk] = (
+                    route.regularity, route.price, route.departure_time
+                )
+
+    def save_flights(self, rows):
+        flights_rows = {
+            (
+                self.routes[
+                    self.bus_stations[row['bus_station']], row['route']
+                ].pk,
+                row['departure_time']
+            ): row
+            for row in rows
+        }
+
+        existing_flights = {
+            (route_id, departure_time): (pk, arrival_time, bus_id)
+            for pk, route_id, departure_time, arrival_time, bus_id in
+            Flight.objects.filter(
+                route__in={route_id for route_id, _ in flights_rows}
+            ).values_list(
+                'pk', 'route_id', 'departure_time', 'arrival_time', 'bus_id'
+            )
+        }
+
+        buses_places = dict(Bus.objects.filter(pk__in={
+            row['bus'] for key, row in flights_rows.items()
+            if key not in existing_flights
+        }).values_list('pk', 'amount_of_places'))
+
+        route_labels = {
+            route.pk: route.label for route in self.routes.values()
+        }
+        now = timezone.now()
+        new_flights, updated_flights = [], []
+
+        for (route_id, departure_time), row in flights_rows.items():
+            flight = existing_flights.get((route_id, departure_time))
+
+            if flight is None:
+                new_flights.append((
+                    route_id, departure_time, row['arrival_time'],
+                    buses_places[row['bus']], row['bus'], now,
+                    get_flight_label(route_labels[route_id], departure_time),
+                ))
+            elif flight[1:] != (row['arrival_time'], row['bus']):
+                updated_flights.append((
+                    flight[0], row['arrival_time'], row['bus'], now
+                ))
+
+        insert_rows(Flight, (
+            'route', 'departure_time', 'arrival_time',
+            'amount_of_free_places', 'bus', 'updated_at', 'label',
+        ), new_flights)
+        update_rows(
+            Flight, ('arrival_time', 'bus', 'updated_at'), updated_flights
+        )
+
+        self.stats['created_flights'] += len(new_flights)
+        self.stats['updated_flights'] += len(updated_flights)
+
+    def finish(self):
+        """Rebuild schedules of imported routes from their flights
+
+        Text of route departure time gets times of all it's flights which
+        fit in it, departures get all of them.
+        """
+
+        routes = {route.pk: route for route in self.routes.values()}
+        departure_times = {}
+
+        for route_id, departure_time in Flight.objects.filter(
+                route__in=list(routes)
+        ).values_list('route_id', 'departure_time'):
+            departure_times.setdefault(route_id, []).append(departure_time)
+
+        max_length = Route._meta.get_field('departure_time').max_length
+        for route_id, route in routes.items():
+            route_times = set(departure_times.get(route_id, ()))
+            if not route_times <= set(
+                    parse_departure_time(route.departure_time)):
+                route.departure_time = format_departure_time(
+                    route_times |
+                    set(parse_departure_time(route.departure_time)),
+                    max_length
+                )
+
+        changed_routes = {
+            route_id: route for route_id, route in routes.items()
+            if self.original_routes[route_id] !=
+            (route.regularity, route.price, route.departure_time)
+        }
+
+        now = timezone.now()
+        update_rows(
+            Route,
+            ('regularity', 'price', 'departure_time', 'updated_at'),
+            [
+                (
+                    route_id, route.regularity, route.price,
+                    route.departure_time, now
+                )
+                for route_id, route in changed_routes.items()
+            ]
+        )
+        self.stats['updated_routes'] = len(
+            set(changed_routes) - self.created_routes_ids
+        )
+
+        # Bulk writes don't call Route.save(), so departures of routes
+        # are rebuilt here
+        RouteDeparture.objects.filter(route__in=list(routes)).delete()
+        insert_rows(
+            RouteDeparture,
+            ('route', 'weekday', 'departure_time'),
+            [
+                (route_id, weekday, departure_time)
+                for route_id, route in routes.items()
+                for weekday, departure_time in get_route_departures(
+                    route.regularity, route.departure_time,
+                    departure_times.get(route_id, ())
+                )
+            ]
+        )
+
+        # Bulk writes don't send signals changing versions of API lists
+        bump_collection_versions('routes', 'flights')
+
+        transaction.on_commit(invalidate_routes)
+        transaction.on_commit(lambda: invalidate_route_flights(list(routes)))
+
+
+def import_timetable(rows, dry_run=False, batch_size=IMPORT_BATCH_SIZE,
+                     report_progress=None):
+    """Import timetable rows in one transaction and return statistics
+
+    Raise TimetableError with all errors if any row is invalid. Dry run
+    rolls the transaction back. report_progress is called with
+    statistics after every batch.
+    """
+
+    rows = iter(rows)
+    timetable_import = TimetableImport()
+    errors = []
+    first_row_number = 1
+
+    with transaction.atomic():
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+
+            cleaned_rows, batch_errors = clean_rows(batch, first_row_number)
+            first_row_number += len(batch)
+            errors += batch_errors
+
+            # Rest of rows are only validated after first error
+            if not errors:
+                errors += timetable_import.import_batch(cleaned_rows)
+
+            if report_progress is not None:
+                report_progress(first_row_number - 1, timetable_import.stats)
+
+        if errors:
+            raise TimetableError(errors)
+
+        timetable_import.finish()
+
+        if dry_run:
+            transaction.set_rollback(True)
+
+    return timetable_import.stats
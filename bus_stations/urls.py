@@ -3,7 +3,8 @@ from django.urls import path
 from .views import (
     Index, RoutesListView, FlightListView,
     SellTicketView, TicketListView,
-    DeleteTicketView, ChequeForTicketView
+    DeleteTicketView, ChequeForTicketView, ChequeFileView,
+    TicketExportView, SeatMapView
 )
 
 app_name = 'bus_stations'
@@ -40,6 +41,20 @@ urlpatterns = [
         name='tickets',
     ),
 
+    # Free and taken seats of flight
+    path(
+        'flight/<int:flight_id>/seats/',
+        SeatMapView.as_view(),
+        name='seats',
+    ),
+
+    # Export tickets for accounting
+    path(
+        'tickets/export/',
+        TicketExportView.as_view(),
+        name='export_tickets',
+    ),
+
     # Delete ticket
     path(
         'delete_ticket/<int:pk>/',
@@ -49,8 +64,15 @@ urlpatterns = [
 
     # Cheque for ticket
     path(
-        'cheque_for_ticket/',
+        'cheque_for_ticket/<int:pk>/',
         ChequeForTicketView.as_view(),
         name='cheque_for_ticket'
     ),
+
+    # Cheque for printing as PDF or thermal printer commands
+    path(
+        'cheque_for_ticket/<int:pk>/<str:cheque_format>/',
+        ChequeFileView.as_view(),
+        name='cheque_file'
+    ),
 ]
@@ -0,0 +1,11 @@
+"""Validators of data entered by cashiers and API clients"""
+
+from django.core.exceptions import ValidationError
+from django.utils.timezone import localdate
+
+
+def validate_not_past_date(value):
+    """Date of departure isn't earlier than today"""
+
+    if value is not None and value < localdate():
+        raise ValidationError('Дата отправления уже прошла')
@@ -1,25 +1,55 @@
-from time import gmtime
+from datetime import timedelta
+from hmac import compare_digest
 
 from .models import (
-    BusStation, Route, Flight,
+    Route, Flight, DailyFlight,
     Bus, Driver, Ticket
 )
+from django.views.generic.detail import DetailView
 from django.views.generic.list import ListView
-from django.views.generic.base import TemplateView
+from django.views.generic.base import View
 from django.contrib.auth.mixins import (
     LoginRequiredMixin, UserPassesTestMixin
 )
 from django.urls import reverse_lazy
 from django.views.generic.edit import CreateView, DeleteView
 from django.forms import ValidationError
+from django.conf import settings
+from django.http import (
+    Http404, HttpResponse, HttpResponseRedirect, HttpResponseBadRequest,
+    FileResponse, StreamingHttpResponse
+)
+from django.shortcuts import get_object_or_404
+from django.db.models import (
+    OuterRef, Subquery, F, Q, Value, Case, When,
+    ExpressionWrapper, DurationField, Count, Max, Sum
+)
+from django.utils.timezone import localdate, localtime
 
-from .forms import SellTicketForm
+from .cache import (
+    CACHE_TIMEOUT, get_bus_stations, get_bus_station_with_routes,
+    get_route_flights_version
+)
+from .cheques import (
+    CHEQUE_FORMATS, get_cheque_storage, get_rendered_cheque,
+    render_ticket_cheques
+)
+from .conditional import condition_on_stamp
+from .export import EXPORT_FORMATS, get_tickets_for_export
+from .forms import SellTicketForm, SeatMapForm, TicketExportForm
+from .metrics import render_metrics
+from .services import (
+    FlightSoldOutError, NoDepartureError, SeatTakenError, sell_ticket,
+    delete_ticket, check_departure, get_seat_map, get_free_places
+)
 
 
 class Index(LoginRequiredMixin, ListView):
     template_name = 'bus_stations/index.html'
     context_object_name = 'bus_stations'
-    queryset = BusStation.objects.all()
+
+    def get_queryset(self):
+        return get_bus_stations()
 
 
 class RoutesListView(LoginRequiredMixin, ListView):
@@ -27,15 +57,20 @@ class RoutesListView(LoginRequiredMixin, ListView):
     context_object_name = 'routes'
 
     def get_queryset(self):
-        return Route.objects.filter(
-            bus_station=self.kwargs['bus_station_id']
+        self.bus_station, routes = get_bus_station_with_routes(
+            self.kwargs['bus_station_id']
         )
 
+        return routes
+
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
-        context['bus_station'] = BusStation.objects.get(
-            pk=self.kwargs['bus_station_id']
-        )
+        context['bus_station'] = self.bus_station
+
+        # Next flight of every route
+        next_flights = get_next_flights(context['routes'])
+        for route in context['routes']:
+            route.next_flight = next_flights.get(route.pk)
 
         return context
 
@@ -44,36 +79,83 @@ class FlightListView(LoginRequiredMixin, ListView):
     template_name = 'bus_stations/route_flights.html'
     context_object_name = 'flights'
 
+    def get_stamp(self, request, *args, **kwargs):
+        today_tickets = Ticket.objects.filter(
+            flight__route=OuterRef('pk'), departure_date=localdate()
+        ).order_by().values('flight__route')
+
+        # Route is loaded with stamp of it's flights and used for the page
+        self.route = get_object_or_404(
+            Route.objects.select_related('bus_station').annotate(
+                flights_updated_at=Max('flights__updated_at'),
+                flights_amount=Count('flights'),
+
+                # Next flight changes after departure of flight
+                departed_flights_amount=Count(
+                    'flights',
+                    filter=Q(flights__departure_time__lt=localtime().time())
+                ),
+
+                # Sales and returns of tickets for today
+                today_tickets_amount=Subquery(
+                    today_tickets.annotate(amount=Count('pk')).values('amount')
+                ),
+                today_last_ticket=Subquery(
+                    today_tickets.annotate(last=Max('pk')).values('last')
+                ),
+
+                # Free places for today are counted after commit of sale
+                today_free_places=Subquery(
+                    DailyFlight.objects.filter(
+                        flight__route=OuterRef('pk'),
+                        departure_date=localdate()
+                    ).order_by().values('flight__route').annotate(
+                        amount=Sum('amount_of_free_places')
+                    ).values('amount')
+                ),
+            ),
+            pk=kwargs['route_id']
+        )
+
+        return {
+            'route_updated_at': self.route.updated_at,
+            'bus_station_updated_at': self.route.bus_station.updated_at,
+            'flights_updated_at': self.route.flights_updated_at,
+            'flights_amount': self.route.flights_amount,
+            'departed_flights_amount': self.route.departed_flights_amount,
+            'today_tickets_amount': self.route.today_tickets_amount,
+            'today_last_ticket': self.route.today_last_ticket,
+            'today_free_places': self.route.today_free_places,
+        }
+
+    @condition_on_stamp(get_stamp)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
-        return Flight.objects.filter(
-            route=self.kwargs['route_id']
-        ).select_related('route', 'bus', 'route__bus_station')
+        # Free places are shown for today
+        flights = list(annotate_travel_time(
+            Flight.objects.filter(route=self.route).select_related(
+                'bus'
+            ).annotate(free_places=get_free_places(localdate()))
+        ))
+
+        # All flights share already loaded route
+        for flight in flights:
+            flight.route = self.route
+
+        return flights
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
-        context['route'] = Route.objects.get(
-            pk=self.kwargs['route_id']
-        )
-
-        # Next flight
-        context['next_flight'] = get_next_flight(
-            Flight.objects.filter(
-                route=context['route']
-            )
-        )
+        context['route'] = self.route
 
-        context['tickets'] = Ticket.objects.filter(
-            flight__route=context['route']
-        )
+        # Flights table is cached without free places
+        context['cache_timeout'] = CACHE_TIMEOUT
+        context['flights_version'] = get_route_flights_version(self.route.pk)
 
-        context['travel_time'] = get_travel_time(
-            Flight.objects.filter(
-                route=self.kwargs['route_id']
-            ).first().departure_time,
-            Flight.objects.filter(
-                route=self.kwargs['route_id']
-            ).first().arrival_time
-        )
+        # Next flight
+        context['next_flight'] = get_next_flight(context['flights'])
 
         return context
 
@@ -81,30 +163,87 @@ class FlightListView(LoginRequiredMixin, ListView):
 class SellTicketView(UserPassesTestMixin, CreateView):
     form_class = SellTicketForm
     template_name = 'bus_stations/sell_ticket.html'
-    success_url = reverse_lazy('bus_stations:cheque_for_ticket')
 
-    def form_valid(self, SellTicketForm):
-        sell_ticket_flight = Flight.objects.get(
-            pk=self.get_form_kwargs()['data']['flight']
+    def form_valid(self, form):
+        try:
+            self.object = sell_ticket(
+                form.cleaned_data['flight'].pk,
+                form.cleaned_data['user'],
+                form.cleaned_data['seller'],
+                form.cleaned_data['departure_date'],
+                form.cleaned_data['seat_number'],
+            )
+        except SeatTakenError as error:
+            form.add_error('seat_number', str(error))
+
+            return self.form_invalid(form)
+        except FlightSoldOutError as error:
+            form.add_error('flight', str(error))
+
+            return self.form_invalid(form)
+        except NoDepartureError as error:
+            form.add_error('departure_date', str(error))
+
+            return self.form_invalid(form)
+
+        # Cheques are ready to print when cashier opens them
+        render_ticket_cheques(
+            ChequeForTicketView.queryset.get(pk=self.object.pk)
         )
 
-        sell_ticket_flight.amount_of_free_places -= 1
-        sell_ticket_flight.save()
+        return HttpResponseRedirect(self.get_success_url())
 
-        return super().form_valid(SellTicketForm)
+    def get_initial(self):
+        # Flight and seat chosen on seat map
+        return self.request.GET.dict()
+
+    def get_success_url(self):
+        return reverse_lazy(
+            'bus_stations:cheque_for_ticket',
+            args=[self.object.pk]
+        )
 
     def test_func(self):
         return self.request.user.is_staff
 
 
-class ChequeForTicketView(TemplateView):
+class ChequeForTicketView(UserPassesTestMixin, DetailView):
     template_name = 'bus_stations/cheque_for_ticket.html'
+    context_object_name = 'ticket'
+    queryset = Ticket.objects.select_related(
+        'flight__route__bus_station', 'flight__bus', 'seat'
+    )
 
-    def get_context_data(self, *args, **kwargs):
-        context = super().get_context_data(*args, **kwargs)
-        context['ticket'] = Ticket.objects.latest()
+    def test_func(self):
+        return self.request.user.is_staff
 
-        return context
+
+class ChequeFileView(ChequeForTicketView):
+    def get(self, request, *args, **kwargs):
+        cheque_format = self.kwargs['cheque_format']
+        if cheque_format not in CHEQUE_FORMATS:
+            raise Http404('Неизвестный формат чека')
+
+        self.object = self.get_object()
+        name = get_rendered_cheque(
+            self.object, cheque_format, settings.CHEQUE_RENDER_TIMEOUT
+        )
+
+        # Cheque is still rendering in background
+        if name is None:
+            response = HttpResponse(
+                'Чек готовится, повторите запрос', status=202
+            )
+            response['Retry-After'] = '1'
+
+            return response
+
+        return FileResponse(
+            get_cheque_storage().open(name),
+            content_type=CHEQUE_FORMATS[cheque_format][1],
+            filename=f'cheque_{self.object.pk}.'
+            f'{CHEQUE_FORMATS[cheque_format][2]}',
+        )
 
 
 class TicketListView(UserPassesTestMixin, ListView):
@@ -117,7 +256,7 @@ class TicketListView(UserPassesTestMixin, ListView):
     def get_queryset(self):
         return Ticket.objects.filter(
             flight=self.kwargs['flight_id'],
-        )
+        ).select_related('flight__route', 'seat')
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
@@ -128,6 +267,93 @@ class TicketListView(UserPassesTestMixin, ListView):
         return context
 
 
+class SeatMapView(UserPassesTestMixin, DetailView):
+    template_name = 'bus_stations/seats.html'
+    context_object_name = 'flight'
+    pk_url_kwarg = 'flight_id'
+    queryset = Flight.objects.select_related('bus')
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get_context_data(self, *args, **kwargs):
+        context = super().get_context_data(*args, **kwargs)
+
+        form = SeatMapForm(self.request.GET)
+        if not form.is_valid():
+            raise Http404('Неверная дата отправления')
+
+        context['departure_date'] = form.cleaned_data['departure_date']
+
+        try:
+            check_departure(self.object.pk, context['departure_date'])
+        except NoDepartureError as error:
+            raise Http404(error)
+
+        context['seats'] = get_seat_map(
+            self.object.pk, context['departure_date']
+        )
+
+        return context
+
+
+class TicketExportView(UserPassesTestMixin, View):
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        form = TicketExportForm(request.GET)
+
+        if not form.is_valid():
+            return HttpResponseBadRequest(form.errors.as_text())
+
+        make_lines, content_type, extension = EXPORT_FORMATS[
+            form.cleaned_data['format']
+        ]
+
+        response = StreamingHttpResponse(
+            make_lines(get_tickets_for_export(
+                form.cleaned_data['date_from'],
+                form.cleaned_data['date_to'],
+                form.cleaned_data['bus_station'],
+                form.cleaned_data['route'],
+                form.cleaned_data['flight'],
+            )),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = \
+            f'attachment; filename="tickets.{extension}"'
+
+        return response
+
+
+class MetricsView(View):
+    def has_access(self, request):
+        """Staff or scraper with METRICS_TOKEN can read metrics
+
+        Address of client isn't checked, behind proxy it's address of the
+        proxy for every request.
+        """
+
+        token = settings.METRICS_TOKEN
+
+        # Strings with not ASCII characters can't be compared by
+        # compare_digest
+        return request.user.is_staff or bool(token) and compare_digest(
+            request.META.get('HTTP_AUTHORIZATION', '').encode(),
+            f'Bearer {token}'.encode()
+        )
+
+    def get(self, request, *args, **kwargs):
+        if not self.has_access(request):
+            raise Http404('Метрики доступны только персоналу и по токену')
+
+        return HttpResponse(
+            render_metrics(),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+
 class DeleteTicketView(UserPassesTestMixin, DeleteView):
     template_name = 'bus_stations/delete_ticket.html'
     model = Ticket
@@ -136,82 +362,95 @@ class DeleteTicketView(UserPassesTestMixin, DeleteView):
     def test_func(self):
         return self.request.user.is_staff
 
-    def get_success_url(self):
-        delete_ticket_flight = Flight.objects.get(
-            pk=Ticket.objects.get(pk=self.kwargs['pk']).flight.pk
-        )
-        delete_ticket_flight.amount_of_free_places += 1
-        delete_ticket_flight.save()
+    def delete(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        success_url = self.get_success_url()
+        delete_ticket(self.object)
 
+        return HttpResponseRedirect(success_url)
+
+    def get_success_url(self):
         return reverse_lazy(
             'bus_stations:tickets',
-            args=[delete_ticket_flight.pk]
+            args=[self.object.flight_id]
         )
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
-        context[
-            'flight'
-        ] = Flight.objects.get(
-            pk=Ticket.objects.get(pk=self.kwargs['pk']).flight.pk
-        )
+        context['flight'] = self.object.flight
+
         return context
 
 
-def get_travel_time(departure_time, arrival_time):
-    departure_hours_in_minute = int(str(departure_time)[:2]) * 60
-    arrival_hours_in_minute = int(str(arrival_time)[:2]) * 60
+def annotate_travel_time(flights):
+    """Annotate every flight with it's travel_time
+
+    Flight arriving earlier than it departs arrives on the next day.
+    """
+
+    travel_time = ExpressionWrapper(
+        F('arrival_time') - F('departure_time'),
+        output_field=DurationField()
+    )
 
-    departure_minute = int(str(departure_time)[3:5])
-    arrival_minute = int(str(arrival_time)[3:5])
+    return flights.annotate(
+        travel_time=Case(
+            When(
+                arrival_time__lt=F('departure_time'),
+                then=travel_time + Value(timedelta(days=1)),
+            ),
+            default=travel_time,
+            output_field=DurationField(),
+        )
+    )
+
+
+def get_next_flights_queryset(current_time=None):
+    """Flights with free places today departing not earlier than time"""
 
-    travel_minute = (arrival_hours_in_minute + arrival_minute) - \
-        (departure_hours_in_minute + departure_minute)
+    return annotate_travel_time(
+        Flight.objects.annotate(
+            free_places=get_free_places(localdate())
+        ).filter(
+            departure_time__gte=current_time or localtime().time(),
+            free_places__gt=0,
+        ).order_by('departure_time')
+    )
 
-    return f'{travel_minute // 60}:{travel_minute % 60}:00'
 
+def get_next_flight(flights, current_time=None):
+    """Nearest flight with free places from flights ordered by departure
 
-def get_next_flight(flights):
-    current_hour = gmtime()[3] + 3
-    current_minute = gmtime()[4]
+    Flights are annotated with free_places. Return None if there is no
+    such flight.
+    """
+
+    current_time = current_time or localtime().time()
 
-    # Flights with departure hour more than current hour
-    flights_after_current_hour = []
     for flight in flights:
-        # If flight's departure hour more or equal than current hour
-        if int(str(flight.departure_time)[:2]) >= current_hour:
-            flights_after_current_hour.append(flight)
-    if not flights_after_current_hour:
-        return ''
-    else:
-        # Flights with departure time more than current time
-        flights_after_current_time = []
-        for flight in flights_after_current_hour:
-            # If flight's departure minute more or equal than current minute
-            if int(str(flight.departure_time)[3:5]) >= current_minute and \
-                    int(str(flight.departure_time)[:2]) == current_hour:
-                flights_after_current_time.append(flight)
-
-            if int(str(flight.departure_time)[:2]) > current_hour:
-                flights_after_current_time.append(flight)
-
-        return get_flight_with_non_zero_free_places_amount(flights_after_current_time)
-
-
-def get_flight_with_non_zero_free_places_amount(flights):
-    for i in range(len(flights)):
-        next_flight = flights[i]
-
-        if next_flight.amount_of_free_places != 0:
-            break
-        else:
-            while next_flight.amount_of_free_places == 0:
-                i += 1
-                if i >= len(flights):
-                    next_flight = ''
-                    break
-                next_flight = flights[i]
-                if next_flight.amount_of_free_places != 0:
-                    break
-
-    return next_flight
+        if flight.departure_time >= current_time and \
+                flight.free_places is not None and flight.free_places > 0:
+            return flight
+
+    return None
+
+
+def get_next_flights(routes, current_time=None):
+    """Nearest flights with free places of the routes by one query
+
+    Return dict where key is route's pk and value is it's nearest flight.
+    Routes without such flights are missed.
+    """
+
+    next_flights = get_next_flights_queryset(current_time)
+    route_next_flight_pk = next_flights.filter(
+        route=OuterRef('route')
+    ).values('pk')[:1]
+
+    return {
+        flight.route_id: flight
+        for flight in next_flights.filter(
+            route__in=routes, pk=Subquery(route_next_flight_pk)
+        )
+    }
+